@@ -0,0 +1,126 @@
+"""
+Load-test a full Rightmove crawl against the local mock site.
+
+Starts a MockRightmove with the given number of listings, latency and
+faults, then runs discovery and the crawl of every listing page through
+the real engine, as a search would. The mock is served over HTTP on a
+local port by default, or in-process with ``--in-process`` to measure the
+crawler without the network stack. The adaptive rate limiter is off
+unless ``--rate-limit`` sets its starting rate, e.g. to see how it
+settles against the mock's 429s.
+
+Usage:
+    python -m benchmarks.bench_crawl [--listings N] [--latency S]
+        [--error-rate F] [--rate-limit-rate F] [--concurrency N]
+        [--parse-workers N] [--in-process] [--rate-limit R]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from httpx import AsyncHTTPTransport
+
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.transport import Transport
+from estatesearch.search.uk.mockserver import MockRightmove, RerouteTransport
+from estatesearch.search.uk.rightmove import HEADERS, Rightmove
+
+
+async def crawl(rightmove: Rightmove) -> dict:
+    """
+    Run discovery and the crawl, timing each.
+
+    Args:
+        rightmove (Rightmove): The engine, connected to the mock.
+
+    Returns:
+        dict: The number of URLs and properties and the time of each step.
+    """
+    try:
+        start = time.perf_counter()
+        urls = await rightmove.discover()
+        discovered = time.perf_counter()
+        properties = 0
+        async for _ in rightmove.iter_properties(urls):
+            properties += 1
+        crawled = time.perf_counter()
+    finally:
+        await rightmove.aclose()
+    return {
+        "urls": len(urls),
+        "properties": properties,
+        "discovery": discovered - start,
+        "crawl": crawled - discovered,
+    }
+
+
+def main() -> None:
+    """Run the load test and print the throughput."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--listings", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--page-bytes", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    args = parser.parse_args()
+
+    site = MockRightmove(
+        listings=args.listings,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        page_bytes=args.page_bytes,
+    )
+    with tempfile.TemporaryDirectory() as cache_dir:
+        crawl_config = CrawlConfig(
+            max_concurrency=args.concurrency,
+            max_connections=args.concurrency,
+            backoff_base=0.1,
+            cache_dir=cache_dir,
+            http_cache_bytes=0,
+            parse_workers=args.parse_workers,
+            rate_limit=args.rate_limit,
+        )
+        params = SearchParams(location="Kent", buy_rent="rent")
+        if args.in_process:
+            results = asyncio.run(
+                crawl(
+                    Rightmove(
+                        params,
+                        crawl_config,
+                        Transport(crawl_config, HEADERS, site.transport()),
+                    )
+                )
+            )
+        else:
+            with site.serve() as server:
+                network = AsyncHTTPTransport(
+                    limits=Transport(crawl_config).limits
+                )
+                transport = Transport(
+                    crawl_config,
+                    HEADERS,
+                    RerouteTransport(server.url, network),
+                )
+                results = asyncio.run(
+                    crawl(Rightmove(params, crawl_config, transport))
+                )
+
+    print(f"  listings: {results['properties']} of {results['urls']} URLs")
+    print(f" discovery: {results['discovery']:8.2f} s")
+    print(
+        f"     crawl: {results['crawl']:8.2f} s, "
+        f"{results['properties'] / results['crawl']:8.1f} listings/s"
+    )
+    for (endpoint, status), count in sorted(site.requests.items()):
+        print(f"{endpoint:>10} {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
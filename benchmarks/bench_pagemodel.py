@@ -0,0 +1,73 @@
+"""
+Benchmark the PAGE_MODEL extraction of Rightmove listing pages.
+
+Compares the string search extractor with the full parsel parse on the
+example listing pages in docs/uk/example.
+
+Usage:
+    python -m benchmarks.bench_pagemodel [--repeat N]
+"""
+
+import argparse
+import pathlib
+import statistics
+import time
+from typing import Callable, List
+
+from estatesearch.search.uk.pagemodel import (
+    extract_page_model,
+    extract_page_model_parsel,
+)
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+
+
+def time_extractor(
+    extractor: Callable[[str], object], pages: List[str], repeat: int
+) -> List[float]:
+    """
+    Time an extractor over every page.
+
+    Args:
+        extractor (Callable): The extraction function.
+        pages (List[str]): The listing pages.
+        repeat (int): The number of passes over the pages.
+
+    Returns:
+        List[float]: The time of each pass, in seconds per page.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            extractor(page)
+        timings.append((time.perf_counter() - start) / len(pages))
+    return timings
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [path.read_text() for path in sorted(EXAMPLES_DIR.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No example pages found in {EXAMPLES_DIR}")
+    for page in pages:
+        assert extract_page_model(page) == extract_page_model_parsel(page)
+
+    results = {}
+    for name, extractor in (
+        ("parsel", extract_page_model_parsel),
+        ("fast", extract_page_model),
+    ):
+        results[name] = statistics.median(
+            time_extractor(extractor, pages, args.repeat)
+        )
+        print(f"{name:>8}: {results[name] * 1000:8.3f} ms/page")
+    print(f" speedup: {results['parsel'] / results['fast']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
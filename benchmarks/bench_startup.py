@@ -0,0 +1,109 @@
+"""
+Benchmark the start-up time of the package and of its command line.
+
+Each command runs in a fresh interpreter, so nothing is cached between
+runs. The median of the runs is compared with a budget, and the modules
+that must stay lazy (the HTTP client and the HTML parser) are checked not
+to be loaded by the bare import or by ``--help``.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat N] [--import-budget MS]
+        [--help-budget MS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+# Modules that the bare import and --help must not load
+HEAVY_MODULES = ("httpx", "requests", "parsel", "lxml", "jmespath", "numpy")
+
+COMMANDS = {
+    "import": [sys.executable, "-c", "import estatesearch"],
+    "--help": [sys.executable, "-m", "estatesearch.cli", "--help"],
+}
+
+# Code doing the same work as each command, run to list the loaded modules
+PROBES = {
+    "import": "import estatesearch",
+    "--help": (
+        "from estatesearch.cli import build_parser; "
+        "build_parser().format_help()"
+    ),
+}
+
+
+def time_command(command: List[str], repeat: int) -> List[float]:
+    """
+    Time a command in fresh interpreters.
+
+    Args:
+        command (List[str]): The command.
+        repeat (int): The number of runs.
+
+    Returns:
+        List[float]: The wall time of each run, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def loaded_heavy_modules(name: str) -> List[str]:
+    """
+    Get the heavy modules a command loads.
+
+    Args:
+        name (str): The name of the command, ``import`` or ``--help``.
+
+    Returns:
+        List[str]: The heavy modules found in ``sys.modules``.
+    """
+    code = (
+        f"import sys; {PROBES[name]}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return [module for module in result.stdout.strip().split(",") if module]
+
+
+def main() -> None:
+    """Run the benchmark and exit with an error if a budget is exceeded."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--import-budget", type=float, default=150.0)
+    parser.add_argument("--help-budget", type=float, default=250.0)
+    args = parser.parse_args()
+
+    baseline = statistics.median(
+        time_command([sys.executable, "-c", "pass"], args.repeat)
+    )
+    print(f"{'python':>8}: {baseline * 1000:8.1f} ms")
+    budgets = {"import": args.import_budget, "--help": args.help_budget}
+    failures = []
+    for name, command in COMMANDS.items():
+        median = statistics.median(time_command(command, args.repeat))
+        heavy = loaded_heavy_modules(name)
+        print(
+            f"{name:>8}: {median * 1000:8.1f} ms "
+            f"(budget {budgets[name]:.0f} ms, "
+            f"{(median - baseline) * 1000:+.1f} ms over python)"
+        )
+        if median * 1000 > budgets[name]:
+            failures.append(f"{name} took {median * 1000:.1f} ms")
+        if heavy:
+            failures.append(f"{name} loaded {', '.join(heavy)}")
+    if failures:
+        raise SystemExit("Over budget: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
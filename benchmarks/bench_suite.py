@@ -0,0 +1,241 @@
+"""
+Benchmark the parse and serialize hot paths against a stored baseline.
+
+Runs offline on the committed fixtures: the example listing page and
+PAGE_MODEL in docs/uk/example, and the Kent search results in results/.
+Each case is timed with timeit, keeping the best of several runs of
+enough calls to last about 0.2 s, then called once more under tracemalloc
+for its peak memory. The results are compared with
+benchmarks/baseline.json and the run fails if a case is slower or uses
+more memory than the baseline allows.
+
+Timings depend on the machine; regenerate the baseline with
+``--save-baseline`` when moving to another one.
+
+Usage:
+    python -m benchmarks.bench_suite [--repeat N] [--time-tolerance F]
+        [--memory-tolerance F] [--save-baseline] [--case NAME ...]
+"""
+
+import argparse
+import asyncio
+import json
+import pathlib
+import tempfile
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import httpx
+
+from estatesearch.download.download import DownloadManager
+from estatesearch.search.search import SearchManager
+from estatesearch.search.searchConfig import SearchParams
+from estatesearch.search.uk.mapping import parse_page_model
+from estatesearch.search.uk.rightmove import Rightmove
+
+ROOT = pathlib.Path(__file__).parent.parent
+EXAMPLES_DIR = ROOT / "docs" / "uk" / "example"
+RESULTS_DIR = ROOT / "results"
+BASELINE = pathlib.Path(__file__).parent / "baseline.json"
+
+
+class Measurement(NamedTuple):
+    """
+    Cost of a benchmark case.
+
+    Attributes:
+        time_ms (float): The best time of a call, in milliseconds.
+        peak_kib (float): The peak memory allocated by a call, in KiB.
+    """
+
+    time_ms: float
+    peak_kib: float
+
+
+class ReplayEngine:
+    """Search engine yielding stored properties, to time the assembly."""
+
+    def __init__(self, properties: List[Any]) -> None:
+        self.properties = properties
+
+    async def stream_properties(self, resume: bool = False):
+        for property_details in self.properties:
+            yield property_details
+
+    async def aclose(self) -> None:
+        pass
+
+
+def load_fixtures() -> Dict[str, Any]:
+    """
+    Load the committed fixtures.
+
+    Returns:
+        dict: The listing page, its PAGE_MODEL and the Kent search results.
+    """
+    (page,) = EXAMPLES_DIR.glob("*.html")
+    (kent,) = RESULTS_DIR.glob("search_results_Kent_rent_*.json")
+    return {
+        "html": page.read_text(),
+        "page_model": json.loads((EXAMPLES_DIR / "pageMODEL.json").read_text()),
+        "kent": json.loads(kent.read_text()),
+    }
+
+
+def build_cases(
+    fixtures: Dict[str, Any], tmp_dir: pathlib.Path
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the benchmark cases.
+
+    Args:
+        fixtures (dict): The fixtures of load_fixtures.
+        tmp_dir (Path): A directory for the files written by the cases.
+
+    Returns:
+        Dict[str, Callable]: The cases, by name.
+    """
+    html = fixtures["html"]
+    content = html.encode()
+    url = "https://www.rightmove.co.uk/properties/1"
+    page_model = fixtures["page_model"]
+    kent = fixtures["kent"]
+    properties = [
+        parse_page_model({"propertyData": record}, url, origin="Rightmove")
+        for engine_results in kent["SearchResults"].values()
+        for record in engine_results["properties"]
+    ]
+
+    def search_manager():
+        manager = SearchManager(SearchParams(location="Kent"), [])
+        manager.search_engines = {"Rightmove": ReplayEngine(properties)}
+        return asyncio.run(manager.search_async())
+
+    return {
+        "find_json_objects": lambda: list(Rightmove.find_json_objects(html)),
+        # A new response per run, so the decoding of the body is included
+        "extract_property": lambda: Rightmove.extract_property(
+            httpx.Response(
+                200, content=content, request=httpx.Request("GET", url)
+            )
+        ),
+        "parse_property": lambda: Rightmove.parse_property(page_model, url),
+        "search_manager": search_manager,
+        "to_json": lambda: DownloadManager(
+            kent, filename="kent.json", filepath=str(tmp_dir)
+        ).to_json(),
+    }
+
+
+def measure(case: Callable[[], Any], repeat: int) -> Measurement:
+    """
+    Measure a benchmark case.
+
+    Args:
+        case (Callable): The case.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        Measurement: The best time and the peak memory of a call.
+    """
+    timer = timeit.Timer(case)
+    # Also warms up caches and lazy imports
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat, number)) / number
+    # Traced separately, tracemalloc slows every allocation down
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(best * 1000, peak / 1024)
+
+
+def compare(
+    results: Dict[str, Measurement],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: Measurement,
+) -> List[str]:
+    """
+    Compare the results with the baseline.
+
+    Args:
+        results (Dict[str, Measurement]): The measurements, by case.
+        baseline (dict): The stored measurements, by case.
+        tolerance (Measurement): The allowed relative increase of each
+            metric, e.g. 0.5 for 50 %.
+
+    Returns:
+        List[str]: The regressions, empty if there is none.
+    """
+    regressions = []
+    for name, measurement in results.items():
+        if name not in baseline:
+            continue
+        for metric, value in measurement._asdict().items():
+            limit = baseline[name][metric] * (1 + getattr(tolerance, metric))
+            if value > limit:
+                regressions.append(
+                    f"{name} {metric}: {value:.2f} > {limit:.2f} "
+                    f"(baseline {baseline[name][metric]:.2f})"
+                )
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks, then compare with or save the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    # Timings are noisy, allocations are not
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--case", action="append", help="Run only these cases.")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = build_cases(load_fixtures(), pathlib.Path(tmp_dir))
+        results = {}
+        for name, case in cases.items():
+            if args.case and name not in args.case:
+                continue
+            measurement = results[name] = measure(case, args.repeat)
+            line = (
+                f"{name:>18}: {measurement.time_ms:9.3f} ms "
+                f"{measurement.peak_kib:10.1f} KiB"
+            )
+            if name in baseline:
+                time_ratio = measurement.time_ms / baseline[name]["time_ms"]
+                memory_ratio = measurement.peak_kib / baseline[name]["peak_kib"]
+                line += (
+                    f"  ({time_ratio:.2f}x time, {memory_ratio:.2f}x memory)"
+                )
+            print(line)
+
+    if args.save_baseline:
+        baseline.update(
+            {
+                name: {
+                    metric: round(value, 3)
+                    for metric, value in measurement._asdict().items()
+                }
+                for name, measurement in results.items()
+            }
+        )
+        BASELINE.write_text(json.dumps(baseline, indent=4) + "\n")
+        print(f"Saved the baseline to {BASELINE}")
+        return
+    regressions = compare(
+        results,
+        baseline,
+        Measurement(args.time_tolerance, args.memory_tolerance),
+    )
+    if regressions:
+        raise SystemExit("Regressions:\n  " + "\n  ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
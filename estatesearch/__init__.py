@@ -1,5 +1,41 @@
 """
 estatesearch - A package for searching for real estate properties in the UK.
+
+The subpackages and the search engines are imported on first use, so
+``import estatesearch`` does not load the HTTP and HTML parsing libraries.
 """
-from .search import Rightmove
-__all__ = ['Rightmove']
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .search.uk.rightmove import Rightmove
+
+__all__ = ['Rightmove']
+
+# Public names, and the module they are imported from on first access
+_LAZY = {'Rightmove': 'estatesearch.search.uk.rightmove'}
+_SUBPACKAGES = frozenset(
+    {
+        'analyze',
+        'download',
+        'export',
+        'process',
+        'search',
+        'select',
+        'visualize',
+    }
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f'{__name__}.{name}')
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY, *_SUBPACKAGES})
@@ -0,0 +1,374 @@
+"""
+Command line interface of the estate search application.
+
+    estatesearch search Kent --buy-rent rent --max-days-since-added 1
+    estatesearch batch searches.jsonl --format sqlite
+    estatesearch --metrics run.prom search Kent
+    estatesearch version
+
+Only argparse and the configuration are imported to build the parser; the
+search engines, HTTP client and exporters are imported by the command that
+needs them, so ``--help`` and scheduled jobs that fail early start fast.
+"""
+
+import argparse
+import datetime
+import logging
+import pathlib
+import sys
+from typing import List, Optional
+
+from estatesearch.search.searchConfig import (
+    CASSETTE_MODES,
+    DONT_SHOW,
+    MAX_DAYS_SINCE_ADDED,
+    MUST_HAVE,
+    PROPERTY_TYPES,
+    CrawlConfig,
+    SearchParams,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("json", "jsonl", "sqlite", "parquet")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser of the command line interface.
+
+    Returns:
+        argparse.ArgumentParser: The parser, with one subparser per command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="estatesearch",
+        description="Search and store real estate listings.",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+        help="The logging level (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--log-file",
+        type=pathlib.Path,
+        help="Append the logs to this file instead of the standard error.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=pathlib.Path,
+        help="Write the metrics of the run to this file: a JSON summary if "
+        "it ends in .json, the Prometheus text format otherwise.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser(
+        "search", help="Search for properties and save the results."
+    )
+    search.add_argument("location", help="A location, postcode or station.")
+    search.add_argument("--buy-rent", choices=("buy", "rent"), default="buy")
+    search.add_argument("--radius", type=float, help="In miles.")
+    search.add_argument(
+        "--property-type",
+        action="append",
+        choices=sorted(PROPERTY_TYPES),
+        help="Repeat to search several property types.",
+    )
+    search.add_argument("--min-price", type=int)
+    search.add_argument("--max-price", type=int)
+    search.add_argument("--min-bedrooms", type=int)
+    search.add_argument("--max-bedrooms", type=int)
+    search.add_argument(
+        "--max-days-since-added", type=int, choices=MAX_DAYS_SINCE_ADDED
+    )
+    search.add_argument(
+        "--include-sstc",
+        action="store_true",
+        default=None,
+        help="Include properties sold subject to contract.",
+    )
+    search.add_argument(
+        "--must-have", action="append", choices=sorted(MUST_HAVE)
+    )
+    search.add_argument(
+        "--dont-show", action="append", choices=sorted(DONT_SHOW)
+    )
+    search.add_argument(
+        "--engine",
+        action="append",
+        dest="engines",
+        help="Repeat to use several search engines (default: all of them).",
+    )
+    search.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted search from its checkpoint.",
+    )
+    search.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch the listings that changed since the last search.",
+    )
+    search.add_argument(
+        "--cassette",
+        help="Record the HTTP responses to this file, or replay them from it.",
+    )
+    search.add_argument(
+        "--cassette-mode",
+        choices=CASSETTE_MODES,
+        default="replay",
+        help="Whether to record, replay, or replay and record what is "
+        "missing (default: %(default)s).",
+    )
+    add_output_arguments(search)
+    search.set_defaults(handler=run_search)
+
+    batch = commands.add_parser(
+        "batch",
+        help="Run the searches of a JSON Lines file, fetching each listing "
+        "once.",
+    )
+    batch.add_argument(
+        "searches",
+        type=pathlib.Path,
+        help="One object of search parameters per line.",
+    )
+    batch.add_argument(
+        "--engine",
+        action="append",
+        dest="engines",
+        help="Repeat to use several search engines (default: all of them).",
+    )
+    add_output_arguments(batch)
+    batch.set_defaults(handler=run_batch)
+
+    version = commands.add_parser("version", help="Show the version.")
+    version.set_defaults(handler=run_version)
+    return parser
+
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the output format and directory arguments to a command.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser of the command.
+    """
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="json",
+        help="The output format (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=pathlib.Path("results"),
+        help="The results directory (default: %(default)s).",
+    )
+
+
+def save_results(
+    search_results: dict,
+    fmt: str,
+    output: pathlib.Path,
+    index: Optional[int] = None,
+) -> int:
+    """
+    Save the results of a search.
+
+    Args:
+        search_results (dict): The results of ``SearchManager.search``.
+        fmt (str): The output format, one of FORMATS.
+        output (Path): The results directory.
+        index (int): The position of the search in a batch, added to the
+            file name so searches of the same location do not collide.
+
+    Returns:
+        int: The number of properties saved.
+    """
+    from estatesearch.download.download import DownloadManager
+    from estatesearch.download.jsonl import JSONLWriter
+
+    params = search_results["SearchParams"]
+    name = (
+        f"search_results_{params['location']}_{params['buy_rent']}_"
+        f"{datetime.datetime.now().date()}"
+    )
+    if index is not None:
+        name = f"{name}_{index}"
+    found = sum(
+        len(engine_results["properties"])
+        for engine_results in search_results["SearchResults"].values()
+    )
+    if fmt == "jsonl":
+        metadata = {
+            key: value
+            for key, value in search_results.items()
+            if key != "SearchResults"
+        }
+        with JSONLWriter(f"{name}.jsonl", str(output), metadata) as sink:
+            results = search_results["SearchResults"]
+            for engine, engine_results in results.items():
+                for record in engine_results["properties"]:
+                    sink.write(record, engine)
+        return found
+    download = DownloadManager(
+        search_results, filename=f"{name}.json", filepath=str(output)
+    )
+    if fmt == "json":
+        download.to_json()
+    elif fmt == "sqlite":
+        download.to_sqlite()
+    else:
+        download.to_parquet()
+    return found
+
+
+def search_params(args: argparse.Namespace) -> SearchParams:
+    """
+    Get the search parameters of the ``search`` command.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        SearchParams: The search parameters.
+    """
+    return SearchParams(
+        location=args.location,
+        buy_rent=args.buy_rent,
+        radius=args.radius,
+        property_type=args.property_type,
+        min_price=args.min_price,
+        max_price=args.max_price,
+        min_bedrooms=args.min_bedrooms,
+        max_bedrooms=args.max_bedrooms,
+        max_days_since_added=args.max_days_since_added,
+        include_sstc=args.include_sstc,
+        must_have=args.must_have,
+        dont_show=args.dont_show,
+    )
+
+
+def run_search(args: argparse.Namespace) -> int:
+    """
+    Run the ``search`` command.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The exit status, 1 if no property was found.
+    """
+    from estatesearch.download.jsonl import JSONLWriter
+    from estatesearch.search.search import SearchManager
+
+    params = search_params(args)
+    crawl_config = CrawlConfig(
+        incremental=args.incremental,
+        cassette=args.cassette,
+        cassette_mode=args.cassette_mode,
+    )
+    manager = SearchManager(params, args.engines, crawl_config)
+    logger.info(f"Search parameters: {params}")
+    if args.format == "jsonl":
+        # Stream the properties to the file as they are parsed
+        name = (
+            f"search_results_{params.location}_{params.buy_rent}_"
+            f"{datetime.datetime.now().date()}"
+        )
+        with JSONLWriter(
+            f"{name}.jsonl", str(args.output), manager.metadata()
+        ) as sink:
+            manager.search(sink, resume=args.resume)
+        found = sink.count
+    else:
+        search_results = manager.search(resume=args.resume)
+        found = save_results(search_results, args.format, args.output)
+    logger.info(f"Search completed. Found {found} properties.")
+    return 0 if found else 1
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Run the ``batch`` command, saving one file per search.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The exit status, 1 if no property was found.
+    """
+    from estatesearch.search.batch import BatchSearch, load_searches
+
+    batch = BatchSearch(load_searches(args.searches), args.engines)
+    found = 0
+    for index, search_results in enumerate(batch.search()):
+        found += save_results(search_results, args.format, args.output, index)
+    logger.info(
+        f"Batch completed. Fetched {batch.fetched} listing pages for "
+        f"{batch.discovered} search results; saved {found} properties."
+    )
+    return 0 if found else 1
+
+
+def run_version(args: argparse.Namespace) -> int:
+    """Print the version of the package."""
+    from estatesearch.version import __title__, __version__
+
+    print(f"{__title__} {__version__}")
+    return 0
+
+
+def configure_logging(
+    level: str = "INFO", filename: Optional[pathlib.Path] = None
+) -> None:
+    """
+    Configure the logging of the application.
+
+    Args:
+        level (str): The logging level.
+        filename (Path): The file the logs are appended to, the standard
+            error if None.
+    """
+    if filename is not None:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=level,
+        filename=filename,
+        filemode="a",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the command line interface.
+
+    Args:
+        argv (List[str]): The arguments, those of the process if None.
+
+    Returns:
+        int: The exit status.
+    """
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level, args.log_file)
+    if args.metrics is None:
+        return args.handler(args)
+
+    from estatesearch import metrics
+
+    metrics.REGISTRY.reset()
+    try:
+        return args.handler(args)
+    finally:
+        # Also written when the run fails, which is when they matter most
+        path = metrics.REGISTRY.write(args.metrics)
+        logger.info(f"Metrics saved to {path}.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
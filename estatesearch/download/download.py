@@ -6,6 +6,11 @@ import pathlib
 from datetime import datetime
 from typing import Any, Optional
 
+from estatesearch import metrics
+
+from .records import CATEGORICAL_COLUMNS, flatten_properties
+from .sqlite import PropertyStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,5 +51,99 @@ class DownloadManager:
         logger.info(f"Saving search results to {file_path}...")
         file_path.parent.mkdir(parents=True, exist_ok=True)
         with open(file_path, "w") as f:
-            json.dump(self.search_results, f, indent=4)
+            # Encoded as it is written, so both count as writing
+            with metrics.STAGE_SECONDS.time(stage="write"):
+                json.dump(self.search_results, f, indent=4)
         logger.info(f"Search results saved to {file_path}.")
+
+    def to_arrow(self) -> Any:
+        """
+        Build an Arrow table of the search results, one row per property.
+
+        Columns with few distinct values (postcodes, property types,
+        agents...) are dictionary encoded.
+
+        Returns:
+            pyarrow.Table: The properties.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        pa = _import_pyarrow()
+        table = pa.Table.from_pylist(
+            list(flatten_properties(self.search_results))
+        )
+        for name in CATEGORICAL_COLUMNS:
+            index = table.schema.get_field_index(name)
+            if index == -1 or pa.types.is_null(table.schema.field(index).type):
+                continue
+            table = table.set_column(
+                index, name, table.column(index).dictionary_encode()
+            )
+        return table
+
+    def to_parquet(
+        self, filename: Optional[str] = None, compression: str = "zstd"
+    ) -> pathlib.Path:
+        """
+        Save the search results to a compressed Parquet file.
+
+        Args:
+            filename (str): The name of the file to save the results to.
+                If not provided, the default filename with a .parquet
+                extension will be used.
+            compression (str): The Parquet compression codec.
+
+        Returns:
+            Path: The path of the saved file.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        with metrics.STAGE_SECONDS.time(stage="serialize"):
+            table = self.to_arrow()
+        import pyarrow.parquet as pq
+
+        if filename is None:
+            filename = pathlib.Path(self.filename).with_suffix(".parquet").name
+        file_path = self.results_dir / filename
+        logger.info(f"Saving search results to {file_path}...")
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with metrics.STAGE_SECONDS.time(stage="write"):
+            pq.write_table(table, file_path, compression=compression)
+        logger.info(f"Search results saved to {file_path}.")
+        return file_path
+
+    def to_sqlite(self, filename: str = "properties.sqlite") -> pathlib.Path:
+        """
+        Upsert the search results into the SQLite property store.
+
+        Unlike the other exports the database is shared by every search:
+        properties are updated in place and price or status changes are
+        appended to the price history.
+
+        Args:
+            filename (str): The name of the database file.
+
+        Returns:
+            Path: The path of the database.
+        """
+        file_path = self.results_dir / filename
+        logger.info(f"Saving search results to {file_path}...")
+        with metrics.STAGE_SECONDS.time(stage="write"):
+            with PropertyStore(file_path) as store:
+                store.upsert_search_results(self.search_results)
+        logger.info(f"Search results saved to {file_path}.")
+        return file_path
+
+
+def _import_pyarrow() -> Any:
+    """Import pyarrow, which is only needed for the columnar exports."""
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is required for Arrow and Parquet exports. "
+            "Install it with: pip install 'estatesearch[parquet]'"
+        ) from exc
+    return pyarrow
@@ -0,0 +1,160 @@
+"""Append-only JSON Lines sink for the estate search application.
+
+Properties are written one per line as soon as they are parsed, so a search
+never holds its whole result set in memory and an interrupted run keeps
+everything found so far. The file starts with a header record holding the
+search metadata and ends with a footer record holding the totals:
+
+    {"type": "header", "Version": "1.0", "SearchParams": {...}, ...}
+    {"type": "property", "engine": "Rightmove", "data": {...}}
+    ...
+    {"type": "footer", "count": 2, "status": "complete", ...}
+"""
+
+import json
+import logging
+import os
+import pathlib
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from estatesearch import metrics
+
+logger = logging.getLogger(__name__)
+
+# Bound once, they are updated for every line
+SERIALIZE_SECONDS = metrics.STAGE_SECONDS.labels(stage="serialize")
+WRITE_SECONDS = metrics.STAGE_SECONDS.labels(stage="write")
+
+
+class JSONLWriter:
+    """
+    Stream search results to a JSON Lines file.
+
+    Lines are flushed to the operating system as they are written, and the
+    file is fsync'ed every ``fsync_every`` properties and when it is closed,
+    which bounds how much can be lost on a crash without paying for a disk
+    sync per property.
+
+    Use it as a context manager; the footer records whether the block
+    finished normally or raised.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        filepath: str = "results",
+        metadata: Optional[Dict[str, Any]] = None,
+        fsync_every: int = 100,
+    ) -> None:
+        """
+        Initialize the writer.
+
+        Args:
+            filename (str): The name of the JSON Lines file.
+            filepath (str): The directory to save the file in.
+            metadata (dict): The search metadata written in the header.
+            fsync_every (int): The number of properties between disk syncs.
+        """
+        self.file_path = pathlib.Path(filepath) / filename
+        self.metadata = metadata or {}
+        self.fsync_every = max(fsync_every, 1)
+        self.count = 0
+        self._file = None
+        self._unsynced = 0
+
+    def open(self) -> "JSONLWriter":
+        """Create the file and write the header record."""
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Streaming search results to {self.file_path}...")
+        self._file = open(self.file_path, "w", encoding="utf-8")
+        self._write_line({"type": "header", **self.metadata})
+        self._sync()
+        return self
+
+    def write(self, record: Dict[str, Any], engine: str) -> None:
+        """
+        Append a property.
+
+        Args:
+            record (dict): The property details.
+            engine (str): The search engine the property was found on.
+        """
+        self._write_line({"type": "property", "engine": engine, "data": record})
+        self.count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self._sync()
+
+    def close(self, status: str = "complete") -> None:
+        """
+        Write the footer record and close the file.
+
+        Args:
+            status (str): The outcome of the search ("complete" or "failed").
+        """
+        if self._file is None:
+            return
+        self._write_line(
+            {
+                "type": "footer",
+                "count": self.count,
+                "status": status,
+                "finished": datetime.now().isoformat(),
+            }
+        )
+        self._sync()
+        self._file.close()
+        self._file = None
+        logger.info(f"{self.count} properties saved to {self.file_path}.")
+
+    def __enter__(self) -> "JSONLWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close("complete" if exc_type is None else "failed")
+
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        line = json.dumps(record) + "\n"
+        serialized = time.perf_counter()
+        self._file.write(line)
+        self._file.flush()
+        SERIALIZE_SECONDS.inc(serialized - start)
+        WRITE_SECONDS.inc(time.perf_counter() - serialized)
+
+    def _sync(self) -> None:
+        with metrics.STAGE_SECONDS.time(stage="write"):
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+
+def read_jsonl(file_path: Union[str, pathlib.Path]) -> Dict[str, Any]:
+    """
+    Load a JSON Lines file back into the search results structure.
+
+    Args:
+        file_path (Union[str, Path]): The JSON Lines file.
+
+    Returns:
+        dict: The search results, as built by SearchManager, with the footer
+        under "Footer" (None if the run never finished).
+    """
+    search_results: Dict[str, Any] = {"SearchResults": {}, "Footer": None}
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record_type = record.pop("type")
+            if record_type == "header":
+                search_results.update(record)
+            elif record_type == "property":
+                engine_results = search_results["SearchResults"].setdefault(
+                    record["engine"], {"properties": []}
+                )
+                engine_results["properties"].append(record["data"])
+            elif record_type == "footer":
+                search_results["Footer"] = record
+    return search_results
@@ -0,0 +1,114 @@
+"""Flat, one-row-per-property view of the search results.
+
+Columnar exports and stores need one flat record per property. Scalar
+PropertyDetails fields are kept as they are, nested fields (images, rooms,
+features...) are kept as JSON strings, and a few derived columns are added
+for the questions asked most often: the asking price as a number and the
+agent's name.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, Optional
+
+from estatesearch.search.uk.details import PropertyDetails
+from estatesearch.search.uk.mapping import parse_page_model
+
+# Columns with few distinct values, worth dictionary encoding.
+CATEGORICAL_COLUMNS = (
+    "engine",
+    "origin",
+    "postcode",
+    "propertyType",
+    "propertySubType",
+    "transactionType",
+    "tenureType",
+    "agent",
+)
+
+_digits = re.compile(r"[^\d.]")
+
+
+def parse_price(price: Optional[str]) -> Optional[float]:
+    """
+    Get the amount of a display price such as "£1,250 pcm".
+
+    Args:
+        price (Optional[str]): The display price.
+
+    Returns:
+        Optional[float]: The amount, None if the price has no number.
+    """
+    if not price:
+        return None
+    amount = _digits.sub("", price.split(" ")[0])
+    try:
+        return float(amount)
+    except ValueError:
+        return None
+
+
+def as_property_details(record: dict, origin: str) -> dict:
+    """
+    Get a stored property as a PropertyDetails dict.
+
+    Results saved before the PropertyDetails mapping hold the raw
+    ``propertyData`` object of each listing; those are mapped on the fly.
+
+    Args:
+        record (dict): The stored property.
+        origin (str): The engine the property was found on.
+
+    Returns:
+        dict: The property with the PropertyDetails fields.
+    """
+    if "prices" not in record or "primaryPrice" in record:
+        return record
+    details = parse_page_model({"propertyData": record}, origin=origin)
+    details = details._asdict()
+    # The full postcode lives outside propertyData, rebuild it from parts
+    address = record.get("address") or {}
+    parts = [address.get("outcode"), address.get("incode")]
+    details["postcode"] = " ".join(part for part in parts if part) or None
+    return details
+
+
+def flatten_property(record: dict, engine: str = "") -> Dict[str, Any]:
+    """
+    Flatten a property into a single row.
+
+    Args:
+        record (dict): The property, as stored in the search results.
+        engine (str): The engine the property was found on.
+
+    Returns:
+        Dict[str, Any]: The row, with a column per PropertyDetails field
+        plus ``engine``, ``price`` and ``agent``.
+    """
+    record = as_property_details(record, engine)
+    row: Dict[str, Any] = {"engine": engine}
+    for field in PropertyDetails._fields:
+        value = record.get(field)
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        row[field] = value
+    if row["id"] is not None:
+        row["id"] = str(row["id"])
+    row["price"] = parse_price(record.get("primaryPrice"))
+    row["agent"] = (record.get("sellerInfo") or {}).get("branchDisplayName")
+    return row
+
+
+def flatten_properties(search_results: dict) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten every property of the search results.
+
+    Args:
+        search_results (dict): The search results, as built by SearchManager.
+
+    Yields:
+        Dict[str, Any]: One row per property.
+    """
+    for engine, results in search_results.get("SearchResults", {}).items():
+        for record in results.get("properties", []):
+            yield flatten_property(record, engine)
@@ -0,0 +1,236 @@
+"""Indexed SQLite store of the properties found by every search.
+
+JSON snapshots keep each run apart, so telling what changed between runs
+means loading all of them. The store keeps one row per property instead,
+upserted on every run, with indexes on the columns searched most often,
+and an append-only history of asking prices and statuses:
+
+    properties     one row per (engine, id), last values seen
+    price_history  one row per change of price or status
+
+The database runs in WAL mode so it can be read while a crawl writes to it.
+"""
+
+import json
+import logging
+import pathlib
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from estatesearch.search.uk.details import PropertyDetails
+
+from .records import flatten_properties
+
+logger = logging.getLogger(__name__)
+
+# Column types other than TEXT; numbers are stored as numbers so that
+# range queries use the indexes.
+COLUMN_TYPES = {
+    "price": "REAL",
+    "latitude": "REAL",
+    "longitude": "REAL",
+    "bedrooms": "INTEGER",
+    "bathrooms": "INTEGER",
+    "yearsRemainingOnLease": "INTEGER",
+}
+
+COLUMNS = ("engine",) + PropertyDetails._fields + ("price", "agent", "status")
+
+INDEXES = {
+    "properties_id": "properties (id)",
+    "properties_postcode": "properties (postcode)",
+    "properties_price": "properties (price)",
+    "properties_bedrooms": "properties (bedrooms)",
+    "properties_location": "properties (latitude, longitude)",
+    "price_history_property": "price_history (engine, id, seen)",
+}
+
+
+def property_status(row: Dict[str, Any]) -> str:
+    """
+    Get the status of a property row.
+
+    Args:
+        row (dict): A flattened property.
+
+    Returns:
+        str: The first tag of the listing (e.g. SOLD_STC), else whether it
+        is archived, published or unpublished.
+    """
+    tags = json.loads(row["tags"]) if row.get("tags") else None
+    if tags:
+        return str(tags[0])
+    if row.get("archived"):
+        return "archived"
+    return "published" if row.get("published") else "unpublished"
+
+
+class PropertyStore:
+    """
+    SQLite database of properties and their price history.
+
+    Use it as a context manager, or call ``close`` when done.
+    """
+
+    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+        """
+        Open the database, creating the tables and indexes if needed.
+
+        Args:
+            path (Union[str, Path]): The database file.
+        """
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        columns = ", ".join(
+            f'"{name}" {COLUMN_TYPES.get(name, "TEXT")}' for name in COLUMNS
+        )
+        with self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS properties ({columns}, "
+                "first_seen TEXT, last_seen TEXT, PRIMARY KEY (engine, id))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS price_history ("
+                "engine TEXT, id TEXT, seen TEXT, price REAL, "
+                "primaryPrice TEXT, status TEXT)"
+            )
+            # Columns added to PropertyDetails after the database was created
+            existing = {
+                row["name"]
+                for row in self.connection.execute(
+                    "PRAGMA table_info(properties)"
+                )
+            }
+            for name in COLUMNS:
+                if name not in existing:
+                    self.connection.execute(
+                        f'ALTER TABLE properties ADD COLUMN "{name}" '
+                        f'{COLUMN_TYPES.get(name, "TEXT")}'
+                    )
+            for index, target in INDEXES.items():
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index} ON {target}"
+                )
+
+    def upsert(
+        self, rows: Iterable[Dict[str, Any]], seen: Optional[str] = None
+    ) -> int:
+        """
+        Insert or update properties in a single transaction.
+
+        A price history row is appended for every property that is new or
+        whose price or status changed since it was last stored.
+
+        Args:
+            rows (Iterable[dict]): Flattened properties, see flatten_property.
+            seen (str): The ISO time the properties were seen, now if None.
+
+        Returns:
+            int: The number of properties stored.
+        """
+        seen = seen or datetime.now().isoformat()
+        by_key: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            if row.get("id") is None:
+                logger.warning("Skipping a property without an id.")
+                continue
+            record = {name: row.get(name) for name in COLUMNS}
+            record["status"] = property_status(row)
+            record["seen"] = seen
+            # A property listed twice in one search is stored once
+            by_key[(record["engine"], record["id"])] = record
+        records = list(by_key.values())
+
+        names = ", ".join(f'"{name}"' for name in COLUMNS)
+        values = ", ".join(f":{name}" for name in COLUMNS)
+        updates = ", ".join(
+            f'"{name}" = excluded."{name}"'
+            for name in COLUMNS
+            if name not in ("engine", "id")
+        )
+        with self.connection:
+            # Compare with the stored row before it is overwritten
+            self.connection.executemany(
+                "INSERT INTO price_history "
+                "SELECT :engine, :id, :seen, :price, :primaryPrice, :status "
+                "WHERE NOT EXISTS (SELECT 1 FROM properties "
+                "WHERE engine = :engine AND id = :id "
+                "AND price IS :price AND status IS :status)",
+                records,
+            )
+            self.connection.executemany(
+                f"INSERT INTO properties ({names}, first_seen, last_seen) "
+                f"VALUES ({values}, :seen, :seen) "
+                f"ON CONFLICT (engine, id) DO UPDATE SET {updates}, "
+                "last_seen = excluded.last_seen",
+                records,
+            )
+        logger.info(f"{len(records)} properties stored in {self.path}.")
+        return len(records)
+
+    def upsert_search_results(self, search_results: dict) -> int:
+        """
+        Store the properties of a search.
+
+        Args:
+            search_results (dict): The search results, as built by
+                SearchManager.
+
+        Returns:
+            int: The number of properties stored.
+        """
+        return self.upsert(
+            flatten_properties(search_results),
+            seen=search_results.get("SearchDate"),
+        )
+
+    def query(self, sql: str, parameters: Any = ()) -> List[sqlite3.Row]:
+        """
+        Run a read query.
+
+        Args:
+            sql (str): The query.
+            parameters: The query parameters.
+
+        Returns:
+            List[sqlite3.Row]: The rows, indexable by column name.
+        """
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def price_history(
+        self, id: str, engine: str = "Rightmove"
+    ) -> List[sqlite3.Row]:
+        """
+        Get the price and status changes of a property, oldest first.
+
+        Args:
+            id (str): The property id.
+            engine (str): The engine the property was found on.
+
+        Returns:
+            List[sqlite3.Row]: The changes, with seen, price, primaryPrice
+            and status columns.
+        """
+        return self.query(
+            "SELECT seen, price, primaryPrice, status FROM price_history "
+            "WHERE engine = ? AND id = ? ORDER BY seen",
+            (engine, str(id)),
+        )
+
+    def close(self) -> None:
+        """Close the database."""
+        self.connection.close()
+
+    def __enter__(self) -> "PropertyStore":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
@@ -6,10 +6,11 @@ It serves as the entry point for the application and coordinates the various com
 """
 
 import datetime
-import json
 import logging
 import pathlib
 
+from estatesearch.cli import configure_logging
+
 # Download / Save
 from estatesearch.download.download import DownloadManager
 
@@ -17,15 +18,6 @@ from estatesearch.download.download import DownloadManager
 from estatesearch.search.search import SearchManager
 from estatesearch.search.searchConfig import SearchParams
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    filename=pathlib.Path("logs") / f"app_{datetime.datetime.now().date()}.log",
-    filemode="a",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
-
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +27,12 @@ def main():
     This function will orchestrate the various components of the application,
     including loading configuration, searching for properties, and saving results.
     """
+    # Configure logging here, not on import, so importing the module has no
+    # side effects
+    configure_logging(
+        "INFO",
+        pathlib.Path("logs") / f"app_{datetime.datetime.now().date()}.log",
+    )
     # Search / Fetch the data
     params = SearchParams(
         location="Kent",
@@ -44,7 +42,7 @@ def main():
     )
     logger.info(f"Searching for properties in {params.location}...")
     logger.info(f"Search parameters: {params}")
-    search_results = json.loads(SearchManager(params).search())
+    search_results = SearchManager(params).search()
     logger.info(
         f"Search completed. Found {sum(len(v['properties']) for v in search_results['SearchResults'].values())} properties."
     )
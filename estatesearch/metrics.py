@@ -0,0 +1,530 @@
+"""
+Metrics of the estate search application.
+
+Counters, gauges and histograms are kept in a process-wide Registry and
+updated by the search pipeline: the latency, status codes, bytes and
+retries of the HTTP requests by endpoint, the parse time of the listing
+pages, the depth of the queues and the time spent in each stage. At the
+end of a run the registry is written as a Prometheus text file or as a
+JSON summary:
+
+    from estatesearch import metrics
+    metrics.REGISTRY.write("metrics.prom")
+
+Only the standard library is used, so importing this module stays cheap.
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from urllib.parse import urlsplit
+
+PREFIX = "estatesearch_"
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+T = TypeVar("T")
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(
+    labels: Labels, extra: Optional[Tuple[str, str]] = None
+) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric:
+    """Base class of the metrics: a value per set of labels."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, lock: threading.Lock) -> None:
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): The name, without the package prefix.
+            help (str): The description exported with the metric.
+            lock (threading.Lock): The lock of the registry.
+        """
+        self.name = PREFIX + name
+        self.help = help
+        self._lock = lock
+        self._values: Dict[Labels, Any] = {}
+
+    def reset(self) -> None:
+        """Forget every value."""
+        with self._lock:
+            self._values.clear()
+
+    def labels(self, **labels: Any) -> "Child":
+        """
+        Get a series with its labels bound once, for hot paths.
+
+        Args:
+            **labels: The labels of the series.
+
+        Returns:
+            Child: The series, updated without looking its labels up again.
+        """
+        return Child(self, _labels(labels))
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Any]]:
+        """Yield the (name, labels, value) samples in Prometheus form."""
+        for labels, value in sorted(self._values.items()):
+            yield self.name, labels, value
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Get the values as JSON-ready records."""
+        return [
+            {"labels": dict(labels), "value": value}
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Counter(Metric):
+    """A value that only goes up, such as a number of responses."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount (float): The increase.
+            **labels: The labels of the series.
+        """
+        self._inc(_labels(labels), amount)
+
+    def _inc(self, key: Labels, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Add the seconds spent in the block to the counter."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.inc(time.perf_counter() - start, **labels)
+
+    def value(self, **labels: Any) -> float:
+        """Get the value of a series, 0 if it was never increased."""
+        return self._values.get(_labels(labels), 0)
+
+
+class Gauge(Metric):
+    """A value that goes up and down, such as the depth of a queue."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        """
+        Set the gauge.
+
+        Args:
+            value (float): The new value.
+            **labels: The labels of the series.
+        """
+        self._set(_labels(labels), value)
+
+    def _set(self, key: Labels, value: float) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Increase the gauge; decrease it with a negative amount."""
+        self._inc(_labels(labels), amount)
+
+    def _inc(self, key: Labels, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Get the value of a series, 0 if it was never set."""
+        return self._values.get(_labels(labels), 0)
+
+
+class _Series:
+    """Bucket counts and totals of one histogram series."""
+
+    __slots__ = ("buckets", "count", "sum", "min", "max")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.buckets = [0] * (n_buckets + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+
+class Histogram(Metric):
+    """The distribution of observed values, such as request latencies."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        lock: threading.Lock,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): The name, without the package prefix.
+            help (str): The description exported with the metric.
+            lock (threading.Lock): The lock of the registry.
+            buckets (Tuple[float, ...]): The sorted upper bounds of the
+                buckets; a +Inf bucket is added.
+        """
+        super().__init__(name, help, lock)
+        self.bounds = tuple(buckets)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value.
+            **labels: The labels of the series.
+        """
+        self._observe(_labels(labels), value)
+
+    def _observe(self, key: Labels, value: float) -> None:
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = _Series(len(self.bounds))
+            series.buckets[bisect.bisect_left(self.bounds, value)] += 1
+            series.count += 1
+            series.sum += value
+            series.min = min(series.min, value)
+            series.max = max(series.max, value)
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the seconds spent in the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        """Get the number of observations of a series."""
+        series = self._values.get(_labels(labels))
+        return series.count if series else 0
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """
+        Estimate a quantile of a series from its buckets.
+
+        The value is interpolated linearly inside the bucket holding the
+        quantile, as Prometheus' histogram_quantile does, and bounded by
+        the smallest and largest observations.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+            **labels: The labels of the series.
+
+        Returns:
+            Optional[float]: The estimate, None if nothing was observed.
+        """
+        series = self._values.get(_labels(labels))
+        if not series:
+            return None
+        rank = q * series.count
+        cumulative = 0
+        for i, bucket_count in enumerate(series.buckets):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else series.min
+                upper = self.bounds[i] if i < len(self.bounds) else series.max
+                lower, upper = max(lower, series.min), min(upper, series.max)
+                fraction = (rank - cumulative) / bucket_count
+                return lower + (upper - lower) * fraction
+            cumulative += bucket_count
+        return series.max
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Any]]:
+        for labels, series in sorted(self._values.items()):
+            cumulative = 0
+            bounds = [repr(bound) for bound in self.bounds] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, series.buckets):
+                cumulative += bucket_count
+                yield self.name + "_bucket", labels + (
+                    ("le", bound),
+                ), cumulative
+            yield self.name + "_sum", labels, series.sum
+            yield self.name + "_count", labels, series.count
+
+    def summary(self) -> List[Dict[str, Any]]:
+        records = []
+        for labels, series in sorted(self._values.items()):
+            kwargs = dict(labels)
+            records.append(
+                {
+                    "labels": kwargs,
+                    "count": series.count,
+                    "sum": series.sum,
+                    "mean": series.sum / series.count,
+                    "min": series.min,
+                    "max": series.max,
+                    "p50": self.quantile(0.5, **kwargs),
+                    "p95": self.quantile(0.95, **kwargs),
+                    "p99": self.quantile(0.99, **kwargs),
+                }
+            )
+        return records
+
+
+class Child:
+    """A series of a metric, with its labels bound."""
+
+    __slots__ = ("metric", "key")
+
+    def __init__(self, metric: Metric, key: Labels) -> None:
+        self.metric = metric
+        self.key = key
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the series of a counter or gauge."""
+        self.metric._inc(self.key, amount)
+
+    def set(self, value: float) -> None:
+        """Set the series of a gauge."""
+        self.metric._set(self.key, value)
+
+    def observe(self, value: float) -> None:
+        """Record an observation in the series of a histogram."""
+        self.metric._observe(self.key, value)
+
+
+async def time_iteration(
+    iterator: AsyncIterator[T], counter: Counter, **labels: Any
+) -> AsyncIterator[T]:
+    """
+    Yield the items of an async iterator, timing only the wait for them.
+
+    The time the consumer spends on each item is left out, so the stage
+    producing the items is not charged for the stages consuming them.
+
+    Args:
+        iterator (AsyncIterator): The producer.
+        counter (Counter): The counter the seconds are added to, once the
+            iteration ends.
+        **labels: The labels of the series.
+
+    Yields:
+        The items of the iterator.
+    """
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        counter.inc(elapsed, **labels)
+
+
+class Registry:
+    """The metrics of a process, exported together."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        """Register a counter."""
+        return self._register(Counter(name, help, self._lock))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        """Register a gauge."""
+        return self._register(Gauge(name, help, self._lock))
+
+    def histogram(
+        self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Register a histogram."""
+        return self._register(Histogram(name, help, self._lock, buckets))
+
+    def reset(self) -> None:
+        """Forget the values of every metric, e.g. at the start of a run."""
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, ready for the node exporter textfile collector.
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Export the metrics as a JSON-ready summary.
+
+        Histograms are summarised by their count, sum, mean, extremes and
+        estimated 50th, 95th and 99th percentiles.
+
+        Returns:
+            dict: The type, description and series of each metric, by name.
+        """
+        return {
+            metric.name: {
+                "type": metric.type,
+                "help": metric.help,
+                "series": metric.summary(),
+            }
+            for metric in self.metrics.values()
+        }
+
+    def write(self, path: Union[str, pathlib.Path]) -> pathlib.Path:
+        """
+        Write the metrics to a file.
+
+        Args:
+            path (Union[str, Path]): The file; a ``.json`` file gets the JSON
+                summary, any other the Prometheus text format.
+
+        Returns:
+            Path: The path of the file.
+        """
+        path = pathlib.Path(path)
+        if path.suffix == ".json":
+            text = json.dumps(self.summary(), indent=4)
+        else:
+            text = self.to_prometheus()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Collectors may read the file at any time, never show a partial one
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(text)
+        os.replace(tmp_path, path)
+        return path
+
+    def _register(self, metric: Metric) -> Any:
+        if metric.name in self.metrics:
+            raise UserWarning(f"Metric {metric.name} is already registered.")
+        self.metrics[metric.name] = metric
+        return metric
+
+
+def endpoint(url: str) -> str:
+    """
+    Get the endpoint of a URL, used to label the HTTP metrics.
+
+    Args:
+        url (str): The requested URL.
+
+    Returns:
+        str: The host and the first path segment, e.g.
+        "www.rightmove.co.uk/properties".
+    """
+    parts = urlsplit(url)
+    return f"{parts.hostname}/{parts.path.lstrip('/').split('/', 1)[0]}"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "Latency of the HTTP requests, by endpoint."
+)
+HTTP_RESPONSES = REGISTRY.counter(
+    "http_responses_total",
+    "HTTP responses by endpoint and status code; status is 'error' when "
+    "no response was received.",
+)
+HTTP_DOWNLOADED_BYTES = REGISTRY.counter(
+    "http_downloaded_bytes_total", "Bytes downloaded, by endpoint."
+)
+HTTP_RETRIES = REGISTRY.counter(
+    "http_retries_total", "HTTP requests retried, by endpoint."
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests waiting for a response."
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "parse_seconds",
+    "Time to parse a listing page, by engine.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "queue_depth", "Items waiting in a queue, by queue."
+)
+PROPERTIES = REGISTRY.counter(
+    "properties_total", "Properties found, by search engine."
+)
+RATE_LIMIT = REGISTRY.gauge(
+    "rate_limit_requests_per_second", "Current request rate, by host."
+)
+RATE_LIMIT_BACKOFFS = REGISTRY.counter(
+    "rate_limit_backoffs_total",
+    "Rate cuts by host and reason: a status code, 'slow' or 'timeout'.",
+)
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.counter(
+    "rate_limit_wait_seconds_total",
+    "Time requests waited for the rate limiter, by host.",
+)
+STAGE_SECONDS = REGISTRY.counter(
+    "stage_seconds_total",
+    "Wall time spent in each stage: search, scrape, serialize and write.",
+)
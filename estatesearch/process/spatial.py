@@ -0,0 +1,281 @@
+"""Distances and spatial queries over stored listings.
+
+Great-circle distances are computed with a NumPy-vectorised haversine over
+whole result sets. A GridIndex buckets listings into cells of a fixed
+size in degrees, so radius and bounding-box queries only look at the
+listings in nearby cells instead of every stored listing. With it a
+question like "everything within 2 miles of X" is answered from stored
+listings, without searching the site again with a new radius:
+
+    rows = store.query("SELECT id, latitude, longitude FROM properties")
+    index = GridIndex.from_records(rows)
+    ids, miles = index.within(51.46, 0.14, 2)
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Mean Earth radius by distance unit
+EARTH_RADIUS = {"mi": 3958.7613, "km": 6371.0088}
+
+
+def _earth_radius(unit: str) -> float:
+    try:
+        return EARTH_RADIUS[unit]
+    except KeyError:
+        raise UserWarning(
+            f"Invalid distance unit: {unit}.\n"
+            f"Options: {', '.join(EARTH_RADIUS)}."
+        ) from None
+
+
+def haversine(
+    latitudes: Any,
+    longitudes: Any,
+    latitude: float,
+    longitude: float,
+    unit: str = "mi",
+) -> np.ndarray:
+    """
+    Get the great-circle distances from many points to one point.
+
+    Args:
+        latitudes (array_like): The latitudes of the points, in degrees.
+        longitudes (array_like): The longitudes of the points, in degrees.
+        latitude (float): The latitude of the reference point.
+        longitude (float): The longitude of the reference point.
+        unit (str): The distance unit ("mi" or "km").
+
+    Returns:
+        np.ndarray: The distances, NaN where a coordinate is missing.
+    """
+    radius = _earth_radius(unit)
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    lat0 = math.radians(latitude)
+    lon0 = math.radians(longitude)
+    a = (
+        np.sin((lat - lat0) / 2) ** 2
+        + np.cos(lat) * math.cos(lat0) * np.sin((lon - lon0) / 2) ** 2
+    )
+    return 2 * radius * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def add_distances(
+    properties: List[Dict[str, Any]],
+    latitude: float,
+    longitude: float,
+    unit: str = "mi",
+) -> List[Dict[str, Any]]:
+    """
+    Set the distance to a search point on every property.
+
+    Fills the ``distanceToSearchPoint`` and ``distanceUnit`` fields of
+    PropertyInfo; properties without coordinates get None.
+
+    Args:
+        properties (List[dict]): Properties with latitude and longitude.
+        latitude (float): The latitude of the search point.
+        longitude (float): The longitude of the search point.
+        unit (str): The distance unit ("mi" or "km").
+
+    Returns:
+        List[dict]: The properties, updated in place.
+    """
+    latitudes, longitudes = _coordinates(properties)
+    distances = haversine(latitudes, longitudes, latitude, longitude, unit)
+    for property_info, distance in zip(properties, distances.tolist()):
+        property_info["distanceToSearchPoint"] = (
+            None if math.isnan(distance) else distance
+        )
+        property_info["distanceUnit"] = unit
+    return properties
+
+
+def _coordinates(records: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the latitudes and longitudes of records, NaN when missing."""
+    latitudes = []
+    longitudes = []
+    for record in records:
+        latitudes.append(_as_float(record["latitude"]))
+        longitudes.append(_as_float(record["longitude"]))
+    return np.array(latitudes, dtype=float), np.array(longitudes, dtype=float)
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class GridIndex:
+    """
+    Grid index of points for radius and bounding-box queries.
+
+    Points are sorted by grid cell so that the points of a cell are one
+    contiguous slice. A query reads the slices of the cells it overlaps and
+    filters them exactly.
+    """
+
+    def __init__(
+        self,
+        latitudes: Any,
+        longitudes: Any,
+        ids: Optional[Iterable[Any]] = None,
+        cell_size: float = 0.02,
+    ) -> None:
+        """
+        Build the index.
+
+        Points with a missing coordinate are left out.
+
+        Args:
+            latitudes (array_like): The latitudes of the points, in degrees.
+            longitudes (array_like): The longitudes of the points, in degrees.
+            ids (Iterable): The id of each point; the position if None.
+            cell_size (float): The side of a grid cell, in degrees.
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        ids = np.arange(len(latitudes)) if ids is None else list(ids)
+        ids = np.asarray(ids, dtype=object)
+        valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+
+        self.cell_size = cell_size
+        rows = np.floor(latitudes[valid] / cell_size).astype(np.int64)
+        cols = np.floor(longitudes[valid] / cell_size).astype(np.int64)
+        order = np.lexsort((cols, rows))
+        self.latitudes = latitudes[valid][order]
+        self.longitudes = longitudes[valid][order]
+        self.ids = ids[valid][order]
+
+        # Start and end of the slice of each cell
+        self.cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        rows, cols = rows[order], cols[order]
+        if len(rows):
+            change = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0))
+            starts = np.concatenate(([0], change + 1))
+            ends = np.concatenate((change + 1, [len(rows)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.cells[(int(rows[start]), int(cols[start]))] = (start, end)
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Any], id_field: str = "id", **kwargs
+    ) -> "GridIndex":
+        """
+        Build the index of records with latitude and longitude fields.
+
+        Args:
+            records (Iterable): Dicts or sqlite3 rows, e.g. from the
+                property store.
+            id_field (str): The field holding the id of a record.
+            **kwargs: Passed to the constructor.
+
+        Returns:
+            GridIndex: The index.
+        """
+        records = list(records)
+        latitudes, longitudes = _coordinates(records)
+        ids = [record[id_field] for record in records]
+        return cls(latitudes, longitudes, ids, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _candidates(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> np.ndarray:
+        """Get the positions of the points in the cells a box overlaps."""
+        rows = range(
+            math.floor(min_lat / self.cell_size),
+            math.floor(max_lat / self.cell_size) + 1,
+        )
+        cols = range(
+            math.floor(min_lon / self.cell_size),
+            math.floor(max_lon / self.cell_size) + 1,
+        )
+        if len(rows) * len(cols) > len(self.cells):
+            # Large box, cheaper to go through the occupied cells
+            slices = [
+                self.cells[cell]
+                for cell in self.cells
+                if cell[0] in rows and cell[1] in cols
+            ]
+        else:
+            slices = [
+                self.cells[(row, col)]
+                for row in rows
+                for col in cols
+                if (row, col) in self.cells
+            ]
+        if not slices:
+            return np.array([], dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in slices])
+
+    def bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> np.ndarray:
+        """
+        Get the ids of the points inside a bounding box.
+
+        Args:
+            min_lat (float): The southern edge, in degrees.
+            min_lon (float): The western edge, in degrees.
+            max_lat (float): The northern edge, in degrees.
+            max_lon (float): The eastern edge, in degrees.
+
+        Returns:
+            np.ndarray: The ids of the points.
+        """
+        candidates = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lat = self.latitudes[candidates]
+        lon = self.longitudes[candidates]
+        inside = (
+            (lat >= min_lat)
+            & (lat <= max_lat)
+            & (lon >= min_lon)
+            & (lon <= max_lon)
+        )
+        return self.ids[candidates[inside]]
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        unit: str = "mi",
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the points within a radius, nearest first.
+
+        Args:
+            latitude (float): The latitude of the centre, in degrees.
+            longitude (float): The longitude of the centre, in degrees.
+            radius (float): The radius of the search.
+            unit (str): The distance unit of the radius ("mi" or "km").
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The ids of the points and their
+            distances to the centre.
+        """
+        dlat = math.degrees(radius / _earth_radius(unit))
+        cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+        dlon = min(dlat / cos_lat, 180.0)
+        candidates = self._candidates(
+            latitude - dlat, longitude - dlon, latitude + dlat, longitude + dlon
+        )
+        distances = haversine(
+            self.latitudes[candidates],
+            self.longitudes[candidates],
+            latitude,
+            longitude,
+            unit,
+        )
+        inside = distances <= radius
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self.ids[candidates[order]], distances[order]
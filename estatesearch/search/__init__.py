@@ -1,7 +1,23 @@
 """
 Search module for estate search
+
+Rightmove is imported on first access, so the configuration and the other
+light modules of the package can be used without loading the engines.
 """
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .uk.rightmove import Rightmove
+
+__all__ = ['Rightmove']
+
+_LAZY = {'Rightmove': 'estatesearch.search.uk.rightmove'}
 
-from .uk import Rightmove
 
-__all__ = ['Rightmove']
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
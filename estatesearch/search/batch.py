@@ -0,0 +1,240 @@
+"""Batch searches for the estate search application.
+
+Saved searches overlap: neighbouring towns searched with a radius return
+many of the same listings. A BatchSearch runs the discovery of every
+search concurrently, fetches and parses the union of the listing pages
+once per engine, and routes each property back to every search that found
+it. The instances of an engine share their connections, request slots and
+caches, so the batch keeps to the concurrency budget of a single search.
+The searches are read from a JSON Lines file with one object of
+SearchParams fields per line:
+
+    {"location": "Kent", "buy_rent": "rent", "radius": 5}
+    {"location": "Canterbury", "buy_rent": "rent", "radius": 3}
+"""
+
+import asyncio
+import json
+import logging
+import pathlib
+from typing import Any, Dict, List, Optional, Union
+
+from estatesearch.search.engine import SearchEngine
+from estatesearch.search.search import SearchManager
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.uk.details import PropertyDetails
+
+logger = logging.getLogger(__name__)
+
+
+def load_searches(path: Union[str, pathlib.Path]) -> List[SearchParams]:
+    """
+    Read the searches of a batch from a JSON Lines file.
+
+    Args:
+        path (Union[str, Path]): The file, one object of SearchParams fields
+            per line. Blank lines are skipped.
+
+    Returns:
+        List[SearchParams]: The searches, in file order.
+
+    Raises:
+        UserWarning: If a line is not an object of SearchParams fields.
+    """
+    searches = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                fields = json.loads(line)
+            except ValueError as exc:
+                raise UserWarning(
+                    f"Invalid JSON on line {line_number} of {path}: {exc}"
+                ) from None
+            if not isinstance(fields, dict):
+                raise UserWarning(
+                    f"Line {line_number} of {path} is not a JSON object."
+                )
+            unknown = set(fields) - set(SearchParams._fields)
+            if unknown:
+                raise UserWarning(
+                    f"Unknown search parameters on line {line_number} of "
+                    f"{path}: {sorted(unknown)}. "
+                    f"Options: {list(SearchParams._fields)}."
+                )
+            searches.append(SearchParams(**fields))
+    return searches
+
+
+class BatchSearch:
+    """
+    Run many searches, fetching each listing page once.
+
+    Every search gets its own engines, used for discovery, sharing the
+    connections, request slots and caches of the engines of the first
+    search, which fetch and parse the pages. The results of each search
+    have the layout of ``SearchManager.search``.
+    """
+
+    def __init__(
+        self,
+        searches: List[SearchParams],
+        engines: Optional[List[str]] = None,
+        crawl_config: CrawlConfig = CrawlConfig(),
+    ) -> None:
+        """
+        Initialize the batch.
+
+        Args:
+            searches (List[SearchParams]): The search parameters.
+            engines (List[str]): Names of the registered search engines to
+                use. All of them by default.
+            crawl_config (CrawlConfig): The crawl settings of the engines.
+                The incremental mode is not supported and is turned off.
+        """
+        if crawl_config.incremental:
+            # Unchanged listings are never fetched, so they could not be
+            # routed to the other searches
+            logger.warning("Incremental mode is not supported in batches.")
+            crawl_config = crawl_config._replace(incremental=False)
+        self.managers: List[SearchManager] = [
+            SearchManager(params, engines, crawl_config) for params in searches
+        ]
+        first: Dict[str, SearchEngine] = {}
+        for manager in self.managers:
+            for engine, engine_instance in manager.search_engines.items():
+                if engine in first:
+                    engine_instance.share(first[engine])
+                else:
+                    first[engine] = engine_instance
+        # Listing pages found by the searches, and fetched once
+        self.discovered = 0
+        self.fetched = 0
+
+    async def search_async(self) -> List[Dict[str, Any]]:
+        """
+        Perform the searches.
+
+        Returns:
+            List[dict]: The results of each search, in the order of the
+            searches, ready to be saved with DownloadManager.
+        """
+        try:
+            # URLs of the listing pages, by search and engine. The searches
+            # share the request slots of their engines' transport, so
+            # together they keep to max_concurrency
+            urls: List[Dict[str, List[str]]] = await asyncio.gather(
+                *(self._discover(manager) for manager in self.managers)
+            )
+
+            # Each engine fetches the union of the URLs of every search
+            fetchers: Dict[str, SearchEngine] = {}
+            union: Dict[str, Dict[str, None]] = {}
+            for manager, search_urls in zip(self.managers, urls):
+                for engine, engine_instance in manager.search_engines.items():
+                    fetchers.setdefault(engine, engine_instance)
+                    union.setdefault(engine, {}).update(
+                        dict.fromkeys(search_urls[engine])
+                    )
+            self.discovered = sum(
+                len(engine_urls)
+                for search_urls in urls
+                for engine_urls in search_urls.values()
+            )
+            self.fetched = sum(
+                len(engine_urls) for engine_urls in union.values()
+            )
+            logger.info(
+                f"{len(self.managers)} searches found {self.discovered} "
+                f"listing pages, {self.fetched} of them distinct."
+            )
+            scraped = await asyncio.gather(
+                *(
+                    self._scrape(engine, fetchers[engine], list(engine_urls))
+                    for engine, engine_urls in union.items()
+                )
+            )
+            properties = dict(zip(union, scraped))
+        finally:
+            await asyncio.gather(
+                *(
+                    engine_instance.aclose()
+                    for manager in self.managers
+                    for engine_instance in manager.search_engines.values()
+                ),
+                return_exceptions=True,
+            )
+        return [
+            self._results(manager, search_urls, properties)
+            for manager, search_urls in zip(self.managers, urls)
+        ]
+
+    def search(self) -> List[Dict[str, Any]]:
+        """
+        Perform the searches.
+
+        Returns:
+            List[dict]: The results of each search, in the order of the
+            searches, ready to be saved with DownloadManager.
+        """
+        return asyncio.run(self.search_async())
+
+    @staticmethod
+    async def _discover(manager: SearchManager) -> Dict[str, List[str]]:
+        """Find the distinct listing pages of a search, by engine."""
+
+        async def discover(engine: str, engine_instance: SearchEngine):
+            try:
+                return list(dict.fromkeys(await engine_instance.discover()))
+            except Exception:
+                logger.exception(
+                    f"Discovery on {engine} failed for "
+                    f"{manager.params.location}."
+                )
+                return []
+
+        found = await asyncio.gather(
+            *(
+                discover(engine, engine_instance)
+                for engine, engine_instance in manager.search_engines.items()
+            )
+        )
+        return dict(zip(manager.search_engines, found))
+
+    @staticmethod
+    async def _scrape(
+        engine: str, engine_instance: SearchEngine, urls: List[str]
+    ) -> Dict[str, PropertyDetails]:
+        """Fetch and parse listing pages, returning the properties by URL."""
+        properties: Dict[str, PropertyDetails] = {}
+        async for result in engine_instance.fetch(urls):
+            if not result.ok:
+                continue
+            try:
+                property_details = engine_instance.parse(result)
+            except Exception:
+                logger.exception(f"Failed to parse {result.url}")
+                continue
+            if property_details is not None:
+                properties[result.url] = property_details
+        logger.info(f"Parsed {len(properties)} properties on {engine}.")
+        return properties
+
+    @staticmethod
+    def _results(
+        manager: SearchManager,
+        urls: Dict[str, List[str]],
+        properties: Dict[str, Dict[str, PropertyDetails]],
+    ) -> Dict[str, Any]:
+        """Assemble the results of one search, in discovery order."""
+        results: Dict[str, Any] = {}
+        for engine, engine_urls in urls.items():
+            matched = [
+                properties[engine][url]._asdict()
+                for url in engine_urls
+                if url in properties[engine]
+            ]
+            if matched:
+                results[engine] = {"properties": matched}
+        return {"SearchResults": results, **manager.metadata()}
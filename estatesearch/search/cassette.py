@@ -0,0 +1,202 @@
+"""Record and replay HTTP traffic for the estate search application.
+
+A CassetteTransport sits under the HTTP client. In ``record`` mode it sends
+every request to the network and writes the response to a cassette, a JSON
+Lines file with one interaction per line:
+
+    {"method": "GET", "url": "...", "status": 200, "headers": [], "body": ""}
+
+In ``replay`` mode the responses are served from the cassette and nothing
+is sent, so a crawl can be reproduced offline. ``once`` replays what was
+recorded and records what was not. Responses are matched on method and
+URL; a URL requested several times gets its recorded responses in order,
+then the last one again. 304 Not Modified responses are never recorded,
+since without the cached body they stand for they replay as empty pages.
+"""
+
+import base64
+import json
+import logging
+import pathlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncHTTPTransport,
+    Request,
+    Response,
+    TransportError,
+)
+
+from estatesearch.search.searchConfig import CASSETTE_MODES
+
+logger = logging.getLogger(__name__)
+
+# Headers describing the encoding on the wire, which the stored, decoded,
+# body no longer has
+_WIRE_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+Key = Tuple[str, str]
+
+
+class CassetteTransport(AsyncBaseTransport):
+    """Transport recording responses to, or replaying them from, a file."""
+
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path],
+        mode: str = "replay",
+        transport: Optional[AsyncBaseTransport] = None,
+    ) -> None:
+        """
+        Initialize the transport.
+
+        Args:
+            path (Union[str, Path]): The cassette file.
+            mode (str): "record" to start a new cassette from the network,
+                "replay" to only serve recorded responses, "once" to replay
+                the recorded ones and record the others.
+            transport (AsyncBaseTransport): The transport the requests are
+                sent to when recording, a new HTTP transport if None.
+
+        Raises:
+            UserWarning: If the mode is unknown.
+        """
+        if mode not in CASSETTE_MODES:
+            raise UserWarning(
+                f"Unknown cassette mode: {mode}. Options: {CASSETTE_MODES}."
+            )
+        self.path = pathlib.Path(path)
+        self.mode = mode
+        self.transport = transport
+        self._interactions: Optional[Dict[Key, List[Dict[str, Any]]]] = None
+        self._played: Dict[Key, int] = {}
+        self._file = None
+        # A new recording replaces the cassette once, then appends to it
+        self._truncate = mode == "record"
+        # Requests served from the cassette and sent to the network
+        self.replayed = 0
+        self.recorded = 0
+
+    @property
+    def interactions(self) -> Dict[Key, List[Dict[str, Any]]]:
+        """The recorded interactions by method and URL, loaded on first use."""
+        if self._interactions is None:
+            self._interactions = {}
+            if self.mode != "record" and self.path.exists():
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            self._add(json.loads(line))
+                logger.info(
+                    f"Replaying {len(self._interactions)} requests from "
+                    f"{self.path}."
+                )
+        return self._interactions
+
+    async def handle_async_request(self, request: Request) -> Response:
+        """
+        Serve a request from the cassette or the network.
+
+        Args:
+            request (Request): The request.
+
+        Returns:
+            Response: The recorded or the live response.
+
+        Raises:
+            TransportError: In replay mode, if nothing was recorded for the
+                request.
+        """
+        key = (request.method, str(request.url))
+        recorded = self.interactions.get(key)
+        if recorded and self.mode != "record":
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+            self.replayed += 1
+            return _response(recorded[min(played, len(recorded) - 1)], request)
+        if self.mode == "replay":
+            raise TransportError(
+                f"No recorded response for {request.method} {request.url} "
+                f"in {self.path}",
+                request=request,
+            )
+
+        if self.transport is None:
+            self.transport = AsyncHTTPTransport()
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        if response.status_code == 304:
+            # Bodiless, it would be replayed as an empty page
+            logger.warning(
+                f"Not recording the 304 response to {request.method} "
+                f"{request.url}."
+            )
+            return response
+        self._record(
+            {
+                "method": request.method,
+                "url": str(request.url),
+                "status": response.status_code,
+                "headers": [
+                    [name, value]
+                    for name, value in response.headers.multi_items()
+                    if name.lower() not in _WIRE_HEADERS
+                ],
+                **_encode_body(content),
+            }
+        )
+        return response
+
+    async def aclose(self) -> None:
+        """
+        Close the cassette file and the network transport.
+
+        The recorded interactions are kept, so the cassette can be used
+        again with a new network transport.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.transport is not None:
+            await self.transport.aclose()
+
+    def _add(self, interaction: Dict[str, Any]) -> None:
+        key = (interaction["method"], interaction["url"])
+        self.interactions.setdefault(key, []).append(interaction)
+
+    def _record(self, interaction: Dict[str, Any]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(
+                self.path, "w" if self._truncate else "a", encoding="utf-8"
+            )
+            self._truncate = False
+        self._file.write(json.dumps(interaction) + "\n")
+        self._file.flush()
+        self._add(interaction)
+        self.recorded += 1
+
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    """Store text bodies as they are and binary ones in base64."""
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(content).decode("ascii")}
+
+
+def _response(interaction: Dict[str, Any], request: Request) -> Response:
+    """Rebuild a recorded response."""
+    if "body_base64" in interaction:
+        content = base64.b64decode(interaction["body_base64"])
+    else:
+        content = interaction["body"].encode("utf-8")
+    return Response(
+        interaction["status"],
+        headers=interaction["headers"],
+        content=content,
+        request=request,
+    )
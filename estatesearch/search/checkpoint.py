@@ -0,0 +1,144 @@
+"""Crawl checkpoints for the estate search application.
+
+A checkpoint is an append-only JSON Lines file. The first line holds the
+URLs the crawl has to fetch, then one line is appended, and flushed, per
+completed property:
+
+    {"type": "urls", "urls": [...]}
+    {"type": "done", "url": "...", "data": {...}}
+
+A crawl that stops halfway can be resumed from it: the completed
+properties are read back and only the pending URLs are fetched. A line cut
+short by a crash is ignored.
+"""
+
+import hashlib
+import json
+import logging
+import pathlib
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from estatesearch.search.searchConfig import SearchParams
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointState(NamedTuple):
+    """
+    Progress of an interrupted crawl.
+
+    Attributes:
+        urls (List[str]): Every URL the crawl has to fetch.
+        done (Dict[str, dict]): The completed properties, by URL.
+    """
+
+    urls: List[str]
+    done: Dict[str, Dict[str, Any]]
+
+    @property
+    def pending(self) -> List[str]:
+        """The URLs not completed yet."""
+        return [url for url in self.urls if url not in self.done]
+
+
+def checkpoint_path(
+    cache_dir: Union[str, pathlib.Path], engine: str, params: SearchParams
+) -> pathlib.Path:
+    """
+    Get the checkpoint file of a search.
+
+    Args:
+        cache_dir (Union[str, Path]): The cache directory.
+        engine (str): The name of the search engine.
+        params (SearchParams): The search parameters.
+
+    Returns:
+        Path: The checkpoint file, named after a hash of the parameters.
+    """
+    key = json.dumps(params._asdict(), sort_keys=True, default=str)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return pathlib.Path(cache_dir) / "checkpoints" / f"{engine}-{digest}.jsonl"
+
+
+class Checkpoint:
+    """Record and reload the progress of a crawl."""
+
+    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+        """
+        Initialize the checkpoint.
+
+        Args:
+            path (Union[str, Path]): The checkpoint file.
+        """
+        self.path = pathlib.Path(path)
+        self._file = None
+
+    def load(self) -> Optional[CheckpointState]:
+        """
+        Read the progress of a previous crawl.
+
+        Returns:
+            Optional[CheckpointState]: The progress, None if there is no
+            usable checkpoint.
+        """
+        if not self.path.exists():
+            return None
+        urls: Optional[List[str]] = None
+        done: Dict[str, Dict[str, Any]] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Cut short by a crash
+                    continue
+                if record["type"] == "urls":
+                    urls = record["urls"]
+                elif record["type"] == "done":
+                    done[record["url"]] = record["data"]
+        if urls is None:
+            return None
+        return CheckpointState(urls, done)
+
+    def start(self, urls: List[str]) -> None:
+        """
+        Start a new checkpoint, replacing any previous one.
+
+        Args:
+            urls (List[str]): Every URL the crawl has to fetch.
+        """
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._write({"type": "urls", "urls": urls})
+
+    def resume(self) -> None:
+        """Reopen an existing checkpoint to append to it."""
+        self.close()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def record(self, url: str, data: Dict[str, Any]) -> None:
+        """
+        Record a completed property.
+
+        Args:
+            url (str): The URL the property was fetched from.
+            data (dict): The property details.
+        """
+        self._write({"type": "done", "url": url, "data": data})
+
+    def finish(self) -> None:
+        """Delete the checkpoint of a crawl that completed."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Close the checkpoint file, keeping it on disk."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        # A line cut short by a crash must not glue onto the next one
+        self._file.write("\n" + json.dumps(record) + "\n")
+        self._file.flush()
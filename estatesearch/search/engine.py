@@ -0,0 +1,156 @@
+"""Search engine interface and registry for the estate search application.
+
+Every property portal or auction house is a SearchEngine split in three
+steps: ``discover`` finds the URLs of the listing pages, ``fetch`` downloads
+them and ``parse`` turns each page into a PropertyDetails record. Engines
+register themselves by name so the SearchManager can pick them from a list
+of names and run them side by side on one event loop. The bundled engines
+are imported on the first lookup of the registry, not with the package.
+"""
+
+import abc
+import importlib
+import logging
+from typing import AsyncIterator, ClassVar, Dict, List, Optional, Type
+
+from estatesearch.search.scraper import ScrapeResult
+from estatesearch.search.uk.details import PropertyDetails
+
+logger = logging.getLogger(__name__)
+
+# Registered search engines, by name
+ENGINES: Dict[str, Type["SearchEngine"]] = {}
+
+# Modules of the bundled engines, imported by load_engines
+BUILTIN_ENGINES = ("estatesearch.search.uk.rightmove",)
+
+
+class SearchEngine(abc.ABC):
+    """
+    Base class of the search engines.
+
+    Subclasses set ``name``, take ``(params, crawl_config)`` in their
+    constructor and implement discover, fetch and parse;
+    ``stream_properties`` chains the three.
+    """
+
+    name: ClassVar[str]
+
+    @abc.abstractmethod
+    async def discover(self) -> List[str]:
+        """
+        Find the listing pages matching the search.
+
+        Returns:
+            List[str]: The URLs of the listing pages.
+        """
+
+    @abc.abstractmethod
+    def fetch(self, urls: List[str]) -> AsyncIterator[ScrapeResult]:
+        """
+        Download listing pages.
+
+        Args:
+            urls (List[str]): The URLs of the listing pages.
+
+        Yields:
+            ScrapeResult: One result per URL, in completion order.
+        """
+
+    @abc.abstractmethod
+    def parse(self, result: ScrapeResult) -> Optional[PropertyDetails]:
+        """
+        Parse a downloaded listing page.
+
+        Args:
+            result (ScrapeResult): The successful fetch of a listing page.
+
+        Returns:
+            Optional[PropertyDetails]: The property, None if the page is
+            not a listing.
+        """
+
+    async def stream_properties(
+        self, resume: bool = False
+    ) -> AsyncIterator[PropertyDetails]:
+        """
+        Search for properties and yield their details as they are parsed.
+
+        Args:
+            resume (bool): Continue from the checkpoint of an interrupted
+                run, for engines that keep one; ignored by the others.
+
+        Yields:
+            PropertyDetails: The property details.
+        """
+        urls = await self.discover()
+        async for result in self.fetch(urls):
+            if not result.ok:
+                continue
+            property_details = self.parse(result)
+            if property_details is not None:
+                yield property_details
+
+    def share(self, other: "SearchEngine") -> None:
+        """
+        Reuse the connections and caches of another instance of the engine.
+
+        Used when several searches run together, so they keep to one
+        concurrency budget and do not overwrite each other's caches;
+        nothing is shared by default.
+
+        Args:
+            other (SearchEngine): An instance of the same engine.
+        """
+
+    async def aclose(self) -> None:
+        """Release the connections of the engine; nothing by default."""
+
+
+def register_engine(cls: Type[SearchEngine]) -> Type[SearchEngine]:
+    """
+    Register a search engine under its name.
+
+    Use as a class decorator.
+
+    Args:
+        cls (Type[SearchEngine]): The search engine class.
+
+    Returns:
+        Type[SearchEngine]: The class, unchanged.
+    """
+    ENGINES[cls.name] = cls
+    return cls
+
+
+def load_engines() -> Dict[str, Type[SearchEngine]]:
+    """
+    Import the bundled search engines so they register themselves.
+
+    Returns:
+        Dict[str, Type[SearchEngine]]: The registered search engines.
+    """
+    for module in BUILTIN_ENGINES:
+        importlib.import_module(module)
+    return ENGINES
+
+
+def get_engine(name: str) -> Type[SearchEngine]:
+    """
+    Get a registered search engine by name.
+
+    Args:
+        name (str): The name of the search engine.
+
+    Returns:
+        Type[SearchEngine]: The search engine class.
+
+    Raises:
+        KeyError: If no engine is registered under that name.
+    """
+    try:
+        return load_engines()[name]
+    except KeyError:
+        raise KeyError(
+            f"Unknown search engine: {name}. Options: {sorted(ENGINES)}."
+        ) from None
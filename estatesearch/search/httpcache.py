@@ -0,0 +1,284 @@
+"""Disk-backed conditional HTTP cache for the estate search application.
+
+Most listing pages do not change from one day to the next. The cache keeps
+the body of every response that carries a validator (ETag or Last-Modified)
+and revalidates it on the next request with If-None-Match /
+If-Modified-Since. A ``304 Not Modified`` is then answered from disk, so
+an unchanged ~400 KB page costs a few hundred bytes of headers.
+
+The cache sits under the httpx client as a transport, so the scraper and
+the parsers see ordinary ``200`` responses. Its files are read and written
+in worker threads, off the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+from httpx import AsyncBaseTransport, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with the cached body
+STORED_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+
+class HTTPCache:
+    """
+    Store of response bodies and their validators, bounded in size.
+
+    Each URL is stored as two files named after the hash of the URL: the
+    body and a small JSON file with its headers. When the bodies take more
+    than ``max_bytes`` the least recently used entries are evicted. A hit
+    touches the JSON file, whose modification time is the last use of the
+    entry when the cache is loaded again, so recency survives restarts.
+
+    The methods may be called from several threads at once.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path] = "cache/http",
+        max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            path (Union[str, Path]): The directory of the cache.
+            max_bytes (int): The maximum total size of the cached bodies.
+        """
+        self.path = pathlib.Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._index: Optional[Dict[str, dict]] = None
+        self._size = 0
+        self._lock = threading.RLock()
+
+    @property
+    def index(self) -> Dict[str, dict]:
+        """The metadata of every entry by key, read from disk on first use."""
+        with self._lock:
+            if self._index is None:
+                self._index = self._load()
+                self._size = sum(meta["size"] for meta in self._index.values())
+            return self._index
+
+    @property
+    def size(self) -> int:
+        """The total size of the cached bodies, in bytes."""
+        with self._lock:
+            self.index  # loaded with the total size
+            return self._size
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Get the file name stem of a URL."""
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def get(self, url: str) -> Optional[Tuple[dict, bytes]]:
+        """
+        Get the stored metadata and body of a URL.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            Optional[Tuple[dict, bytes]]: The metadata and body, None if the
+            URL is not cached.
+        """
+        key = self.key(url)
+        with self._lock:
+            meta = self.index.get(key)
+        if meta is None:
+            return None
+        try:
+            body = (self.path / f"{key}.body").read_bytes()
+            os.utime(self.path / f"{key}.json")
+        except OSError:
+            with self._lock:
+                self._remove(key)
+            return None
+        meta["used"] = time.time()
+        return meta, body
+
+    async def aget(self, url: str) -> Optional[Tuple[dict, bytes]]:
+        """Like get, reading the files in a worker thread."""
+        return await asyncio.to_thread(self.get, url)
+
+    def put(self, url: str, response: Response, body: bytes) -> None:
+        """
+        Store the body of a response, evicting old entries if needed.
+
+        Args:
+            url (str): The requested URL.
+            response (Response): The response, for its headers.
+            body (bytes): The decoded body.
+        """
+        if len(body) > self.max_bytes:
+            return
+        key = self.key(url)
+        meta = {
+            "url": url,
+            "headers": {
+                name: response.headers[name]
+                for name in STORED_HEADERS
+                if name in response.headers
+            },
+            "size": len(body),
+            "stored": time.time(),
+            "used": time.time(),
+        }
+        self.path.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.path / f"{key}.body", body)
+        _write_atomic(self.path / f"{key}.json", json.dumps(meta).encode())
+        with self._lock:
+            old = self.index.get(key)
+            self._size += meta["size"] - (old["size"] if old else 0)
+            self.index[key] = meta
+            self.stores += 1
+            self.evict()
+
+    async def aput(self, url: str, response: Response, body: bytes) -> None:
+        """Like put, writing the files in a worker thread."""
+        await asyncio.to_thread(self.put, url, response, body)
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits."""
+        with self._lock:
+            if self.size <= self.max_bytes:
+                return
+            for key in sorted(self.index, key=lambda k: self.index[k]["used"]):
+                self._remove(key)
+                self.evictions += 1
+                if self._size <= self.max_bytes:
+                    break
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit, miss, store and eviction counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(self.index),
+            "bytes": self.size,
+        }
+
+    def _load(self) -> Dict[str, dict]:
+        index = {}
+        if not self.path.exists():
+            return index
+        for meta_path in self.path.glob("*.json"):
+            try:
+                meta = json.loads(meta_path.read_text())
+                # Hits touch the file instead of rewriting it
+                meta["used"] = max(meta["used"], meta_path.stat().st_mtime)
+            except (OSError, ValueError, KeyError):
+                logger.warning(f"Ignoring unreadable {meta_path}.")
+                continue
+            index[meta_path.stem] = meta
+        return index
+
+    def _remove(self, key: str) -> None:
+        meta = self.index.pop(key, None)
+        if meta is not None:
+            self._size -= meta["size"]
+        for suffix in (".body", ".json"):
+            try:
+                (self.path / f"{key}{suffix}").unlink()
+            except FileNotFoundError:
+                pass
+
+
+class CachingTransport(AsyncBaseTransport):
+    """
+    httpx transport that revalidates cached responses.
+
+    GET requests for cached URLs are sent with the stored validators; a
+    ``304`` is turned back into a ``200`` with the cached body. Responses
+    with a validator are stored for next time. Everything else is passed
+    through unchanged.
+    """
+
+    def __init__(self, transport: AsyncBaseTransport, cache: HTTPCache) -> None:
+        """
+        Initialize the transport.
+
+        Args:
+            transport (AsyncBaseTransport): The transport sending the requests.
+            cache (HTTPCache): The cache to read from and update.
+        """
+        self.transport = transport
+        self.cache = cache
+
+    async def handle_async_request(self, request: Request) -> Response:
+        if request.method != "GET":
+            return await self.transport.handle_async_request(request)
+        url = str(request.url)
+        cached = await self.cache.aget(url)
+        if cached is not None:
+            headers = cached[0]["headers"]
+            if "etag" in headers:
+                request.headers["If-None-Match"] = headers["etag"]
+            if "last-modified" in headers:
+                request.headers["If-Modified-Since"] = headers["last-modified"]
+
+        response = await self.transport.handle_async_request(request)
+
+        if response.status_code == 304 and cached is not None:
+            await response.aclose()
+            self.cache.hits += 1
+            meta, body = cached
+            return Response(
+                200,
+                headers=meta["headers"],
+                content=body,
+                request=request,
+                extensions={"from_cache": True},
+            )
+        self.cache.misses += 1
+        if response.status_code != 200 or not (
+            "etag" in response.headers or "last-modified" in response.headers
+        ):
+            return response
+
+        body = await response.aread()
+        await response.aclose()
+        await self.cache.aput(url, response, body)
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length")
+        }
+        return Response(
+            response.status_code,
+            headers=headers,
+            content=body,
+            request=request,
+            # The rebuilt response downloads nothing, keep the wire bytes
+            extensions={
+                **response.extensions,
+                "num_bytes_downloaded": response.num_bytes_downloaded,
+            },
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """Write a file so readers never see it half written."""
+    # One temporary file per thread, two may store the same URL at once
+    tmp_path = path.with_suffix(f"{path.suffix}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,279 @@
+"""Adaptive per-host rate limiter for the estate search application.
+
+Every request to a host takes a slot from that host's token bucket, which
+spaces requests out at the host's current rate. The rate follows the
+responses, AIMD style, like TCP congestion control:
+
+- a fast, successful response raises it additively, by about ``increase``
+  requests per second for every second of successful traffic;
+- a throttled (403, 429 or 503), slow or timed out response cuts it
+  multiplicatively by ``decrease``, at most once per ``cooldown``, so the
+  requests already in flight when the server pushed back do not cut it
+  again;
+- a Retry-After header pauses the host for every request, not only the
+  one that was refused.
+
+The rate settles just under the point where the server starts refusing
+requests. The RateLimitedTransport sits under the HTTP cache and the
+cassette, so only requests that reach the network are limited.
+
+Every Transport of a process shares the limiters in HOSTS, so the engines
+of a batch, or several searches run side by side, stay within one budget
+per host instead of one budget each. A later configuration updates the
+bounds of a shared host; the worker processes of ``crawl_distributed``
+each get a share of the rate instead.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set
+
+from httpx import AsyncBaseTransport, Request, Response, TimeoutException
+
+from estatesearch import metrics
+from estatesearch.search.searchConfig import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+# Status codes servers answer with when a client goes too fast
+THROTTLE_STATUS_CODES = frozenset({403, 429, 503})
+
+
+class HostLimiter:
+    """
+    Token bucket of one host, with an AIMD-adjusted rate.
+
+    The bucket holds one token, so requests are evenly spaced at the
+    current rate. Slots are reserved without awaiting, so the limiter needs
+    no lock and can be shared by the event loops of successive runs.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float = 5.0,
+        min_rate: float = 0.5,
+        max_rate: float = 20.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        slow: float = 5.0,
+        cooldown: float = 2.0,
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            host (str): The host, used in the logs and metrics.
+            rate (float): The starting rate, in requests per second.
+            min_rate (float): The lowest rate backing off can reach.
+            max_rate (float): The highest rate speeding up can reach.
+            increase (float): The rate added per second of successes.
+            decrease (float): The factor applied to the rate on a back-off.
+            slow (float): The response time above which a response counts
+                as a sign of overload, in seconds.
+            cooldown (float): The minimum time between two back-offs, in
+                seconds.
+        """
+        self.host = host
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.slow = slow
+        self.cooldown = cooldown
+        # When the next request may be sent, and the end of a Retry-After
+        self._next = 0.0
+        self._paused_until = 0.0
+        self._last_backoff = float("-inf")
+        metrics.RATE_LIMIT.set(self.rate, host=host)
+
+    def reserve(self) -> float:
+        """
+        Take the next free slot.
+
+        Returns:
+            float: The time to wait before sending the request, in seconds.
+        """
+        now = time.monotonic()
+        start = max(now, self._next, self._paused_until)
+        self._next = start + 1 / self.rate
+        return start - now
+
+    async def acquire(self) -> None:
+        """Wait for a slot, and for the end of a pause set meanwhile."""
+        delay = self.reserve()
+        while delay > 0:
+            metrics.RATE_LIMIT_WAIT_SECONDS.inc(delay, host=self.host)
+            await asyncio.sleep(delay)
+            delay = self._paused_until - time.monotonic()
+
+    def feedback(self, response: Response, elapsed: float) -> None:
+        """
+        Adjust the rate to a response.
+
+        Args:
+            response (Response): The response of the host.
+            elapsed (float): The time the response took, in seconds.
+        """
+        status = response.status_code
+        if status in THROTTLE_STATUS_CODES:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + int(retry_after)
+                )
+            self.back_off(str(status))
+        elif elapsed > self.slow:
+            self.back_off("slow")
+        elif status < 400:
+            # Additive per second of traffic, whatever the rate
+            self.set_rate(self.rate + self.increase / self.rate)
+
+    def back_off(self, reason: str) -> None:
+        """
+        Cut the rate, unless it was cut less than ``cooldown`` ago.
+
+        Args:
+            reason (str): Why: a status code, "slow" or "timeout".
+        """
+        now = time.monotonic()
+        if now - self._last_backoff < self.cooldown:
+            return
+        self._last_backoff = now
+        metrics.RATE_LIMIT_BACKOFFS.inc(host=self.host, reason=reason)
+        self.set_rate(self.rate * self.decrease)
+        logger.info(
+            f"Backing off {self.host} ({reason}): "
+            f"{self.rate:.2f} requests per second."
+        )
+
+    def set_rate(self, rate: float) -> None:
+        """Set the rate, within the bounds."""
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        metrics.RATE_LIMIT.set(self.rate, host=self.host)
+
+    def configure(self, min_rate: float, max_rate: float, slow: float) -> None:
+        """
+        Apply new bounds and slow response threshold, keeping the rate.
+
+        Args:
+            min_rate (float): The lowest rate backing off can reach.
+            max_rate (float): The highest rate speeding up can reach.
+            slow (float): The response time above which a response counts
+                as a sign of overload, in seconds.
+        """
+        if (min_rate, max_rate, slow) == (
+            self.min_rate,
+            self.max_rate,
+            self.slow,
+        ):
+            return
+        logger.info(
+            f"Limits of {self.host} changed to {min_rate:.2f}-{max_rate:.2f} "
+            f"requests per second, slow after {slow:.1f}s."
+        )
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.slow = slow
+        # The learned rate is kept, within the new bounds
+        self.set_rate(self.rate)
+
+
+class RateLimiter:
+    """The limiters of every host, created on the first request to each."""
+
+    def __init__(
+        self,
+        crawl_config: CrawlConfig = CrawlConfig(),
+        hosts: Optional[Dict[str, HostLimiter]] = None,
+    ) -> None:
+        """
+        Initialize the rate limiter.
+
+        Args:
+            crawl_config (CrawlConfig): The starting rate, bounds and slow
+                response threshold of the hosts it creates.
+            hosts (dict): The limiters by host, shared with other rate
+                limiters; a new, private registry by default.
+        """
+        self.crawl_config = crawl_config
+        self.hosts: Dict[str, HostLimiter] = {} if hosts is None else hosts
+        # Shared hosts this limiter has applied its configuration to
+        self._configured: Set[str] = set()
+
+    def host(self, host: str) -> HostLimiter:
+        """
+        Get the limiter of a host.
+
+        A limiter created with another configuration, by another rate
+        limiter sharing the hosts, takes the bounds of this one on its
+        first lookup here; its learned rate is kept.
+
+        Args:
+            host (str): The host.
+
+        Returns:
+            HostLimiter: The limiter, shared by every request to the host.
+        """
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            # setdefault keeps the first limiter if threads race for a host
+            limiter = self.hosts.setdefault(
+                host,
+                HostLimiter(
+                    host,
+                    rate=self.crawl_config.rate_limit,
+                    min_rate=self.crawl_config.rate_limit_min,
+                    max_rate=self.crawl_config.rate_limit_max,
+                    slow=self.crawl_config.slow_response,
+                ),
+            )
+            self._configured.add(host)
+        elif host not in self._configured:
+            limiter.configure(
+                self.crawl_config.rate_limit_min,
+                self.crawl_config.rate_limit_max,
+                self.crawl_config.slow_response,
+            )
+            self._configured.add(host)
+        return limiter
+
+
+# The limiters of the process, by host, shared by every Transport
+HOSTS: Dict[str, HostLimiter] = {}
+
+
+class RateLimitedTransport(AsyncBaseTransport):
+    """Transport waiting for the rate limiter before sending each request."""
+
+    def __init__(
+        self, transport: AsyncBaseTransport, limiter: RateLimiter
+    ) -> None:
+        """
+        Initialize the transport.
+
+        Args:
+            transport (AsyncBaseTransport): The transport sending the
+                requests.
+            limiter (RateLimiter): The limiter, shared across event loops.
+        """
+        self.transport = transport
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: Request) -> Response:
+        host = self.limiter.host(request.url.host)
+        await host.acquire()
+        start = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except TimeoutException:
+            host.back_off("timeout")
+            raise
+        # Time to the response headers, the body is still to be read
+        host.feedback(response, time.monotonic() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
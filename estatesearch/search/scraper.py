@@ -0,0 +1,202 @@
+"""Bounded-concurrency page fetcher for the estate search application.
+
+The Scraper keeps a fixed number of requests in flight, retries throttled or
+failed requests with exponential backoff and jitter, and reports failures as
+a ScrapeResult per URL instead of raising, so one bad listing never aborts
+a whole crawl. The latency, status, size and retries of every request are
+recorded in the metrics registry.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator, Iterable, NamedTuple, Optional
+
+from httpx import AsyncClient, HTTPError, Response
+
+from estatesearch import metrics
+from estatesearch.search.searchConfig import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: throttling and transient server errors.
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class ScrapeResult(NamedTuple):
+    """
+    Outcome of fetching a single URL.
+
+    Attributes:
+        url (str): The requested URL.
+        response (Optional[Response]): The successful response, None on failure.
+        error (Optional[str]): Description of the last failure, None on success.
+        attempts (int): The number of requests made for this URL.
+        status (Optional[int]): The status code of the last failed attempt,
+            None on success or if no response was received.
+    """
+
+    url: str
+    response: Optional[Response] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    status: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the URL was fetched successfully."""
+        return self.error is None
+
+
+class Scraper:
+    """
+    Fetch many URLs through a shared client with a concurrency cap.
+
+    A fixed pool of workers pulls URLs from a queue, so no more than
+    ``max_concurrency`` requests are ever open at the same time, whatever
+    the number of URLs. Scrapers given the same slots share that budget.
+    """
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        config: CrawlConfig = CrawlConfig(),
+        slots: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        """
+        Initialize the scraper.
+
+        Args:
+            client (AsyncClient): The HTTP client used for every request.
+            config (CrawlConfig): Concurrency, retry and backoff settings.
+            slots (asyncio.Semaphore): Held by every request, shared with
+                other scrapers; ``max_concurrency`` slots of its own if None.
+        """
+        self.client = client
+        self.config = config
+        self.slots = slots or asyncio.Semaphore(max(config.max_concurrency, 1))
+
+    def backoff(
+        self, attempt: int, response: Optional[Response] = None
+    ) -> float:
+        """
+        Get the delay before the next attempt.
+
+        Uses "full jitter": a random delay between zero and the exponential
+        bound, which spreads retries out instead of sending them in waves.
+        A numeric Retry-After header from the server takes precedence.
+
+        Args:
+            attempt (int): The number of attempts made so far (1 or more).
+            response (Optional[Response]): The last response, if any.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.config.backoff_max)
+        bound = min(
+            self.config.backoff_max,
+            self.config.backoff_base * 2 ** (attempt - 1),
+        )
+        return random.uniform(0, bound)
+
+    async def fetch(self, url: str) -> ScrapeResult:
+        """
+        Fetch one URL, retrying transient failures.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            ScrapeResult: The response, or the error after the last attempt.
+        """
+        attempts = 0
+        error = None
+        status = None
+        endpoint = metrics.endpoint(url)
+        while attempts <= self.config.max_retries:
+            attempts += 1
+            response = None
+            status = None
+            # Released before the backoff, a retry waits for a free slot
+            await self.slots.acquire()
+            metrics.HTTP_IN_FLIGHT.inc()
+            start = time.perf_counter()
+            try:
+                response = await self.client.get(url)
+            except HTTPError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                metrics.HTTP_RESPONSES.inc(endpoint=endpoint, status="error")
+            except Exception as exc:  # never let one URL abort the crawl
+                metrics.HTTP_RESPONSES.inc(endpoint=endpoint, status="error")
+                return ScrapeResult(
+                    url, error=f"{type(exc).__name__}: {exc}", attempts=attempts
+                )
+            else:
+                metrics.HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start, endpoint=endpoint
+                )
+                metrics.HTTP_RESPONSES.inc(
+                    endpoint=endpoint, status=response.status_code
+                )
+                if not response.extensions.get("from_cache"):
+                    # Bytes read off the wire, before decompression; a
+                    # response rebuilt by the HTTP cache carries them along
+                    metrics.HTTP_DOWNLOADED_BYTES.inc(
+                        response.extensions.get(
+                            "num_bytes_downloaded",
+                            response.num_bytes_downloaded,
+                        ),
+                        endpoint=endpoint,
+                    )
+                if response.status_code < 400:
+                    return ScrapeResult(url, response, attempts=attempts)
+                status = response.status_code
+                error = f"HTTP {status}"
+                if status not in RETRY_STATUS_CODES:
+                    break
+            finally:
+                metrics.HTTP_IN_FLIGHT.inc(-1)
+                self.slots.release()
+            if attempts <= self.config.max_retries:
+                metrics.HTTP_RETRIES.inc(endpoint=endpoint)
+                delay = self.backoff(attempts, response)
+                logger.debug(f"Retrying {url} in {delay:.2f}s ({error}).")
+                await asyncio.sleep(delay)
+        return ScrapeResult(url, error=error, attempts=attempts, status=status)
+
+    async def scrape(self, urls: Iterable[str]) -> AsyncIterator[ScrapeResult]:
+        """
+        Fetch the URLs and yield a result for each one as it completes.
+
+        Args:
+            urls (Iterable[str]): The URLs to fetch.
+
+        Yields:
+            ScrapeResult: One result per URL, in completion order.
+        """
+        pending: asyncio.Queue[str] = asyncio.Queue()
+        for url in urls:
+            pending.put_nowait(url)
+        total = pending.qsize()
+        done: asyncio.Queue[ScrapeResult] = asyncio.Queue()
+
+        async def worker() -> None:
+            while not pending.empty():
+                url = pending.get_nowait()
+                metrics.QUEUE_DEPTH.set(pending.qsize(), queue="scrape")
+                await done.put(await self.fetch(url))
+
+        n_workers = min(max(self.config.max_concurrency, 1), total)
+        workers = [asyncio.create_task(worker()) for _ in range(n_workers)]
+        try:
+            for _ in range(total):
+                yield await done.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
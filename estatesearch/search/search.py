@@ -1,12 +1,15 @@
 """Search manager for the estate search application."""
 
+import asyncio
 import datetime
-import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from estatesearch.search.searchConfig import SearchParams
-from estatesearch.search.uk.rightmove import Rightmove
+from estatesearch import metrics
+from estatesearch.download.jsonl import JSONLWriter
+from estatesearch.search.engine import SearchEngine, load_engines
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.uk.details import PropertyDetails
 
 # Set up logging
 # logging.basicConfig(
@@ -15,6 +18,11 @@ from estatesearch.search.uk.rightmove import Rightmove
 # )
 logger = logging.getLogger(__name__)
 
+# Properties waiting to be consumed before the engines are paused
+ENGINE_QUEUE_SIZE = 100
+# The depth of the queue is sampled every this many properties
+QUEUE_DEPTH_SAMPLE = 16
+
 
 class SearchManager:
     """
@@ -25,61 +33,178 @@ class SearchManager:
     """
 
     def __init__(
-        self, params: SearchParams, engines: Optional[List[str]] = None
+        self,
+        params: SearchParams,
+        engines: Optional[List[str]] = None,
+        crawl_config: CrawlConfig = CrawlConfig(),
     ) -> None:
         """
         Initialize the SearchManager with search parameters.
 
         Args:
             params (SearchParams): The search parameters for the search.
-            engines (List[str]): List of search engines to use. 'Rightmove' is the only one implemented so far.
+            engines (List[str]): Names of the registered search engines to use. All of them by default.
+            crawl_config (CrawlConfig): Concurrency and retry settings shared by the engines.
         """
         self.params: SearchParams = params
-        search_engines: Dict[str, Any] = {
-            "Rightmove": Rightmove(params),
-            # Add other search engines here
-        }
+        registered = load_engines()
         if not engines:
-            engines = list(search_engines.keys())
-        self.search_engines: Dict[str, Any] = {
-            engine: search_engines[engine]
+            engines = list(registered)
+        unknown = [engine for engine in engines if engine not in registered]
+        if unknown:
+            logger.warning(f"Ignoring unknown search engines: {unknown}.")
+        self.search_engines: Dict[str, SearchEngine] = {
+            engine: registered[engine](params, crawl_config)
             for engine in engines
-            if engine in search_engines
+            if engine in registered
         }
 
-    def search(self) -> str:
+    def metadata(self) -> Dict[str, Any]:
         """
-        Perform the search using the configured search engines.
+        Get the information stored with the search results.
 
         Returns:
-            str: The search results as a JSON object.
+            dict: The version, search parameters and date of the search.
         """
-        results: Dict[str, Any] = {}
-        # Loop through each search engine and get the properties details
-        for engine in self.search_engines:
-            logger.info(f"Searching for properties on {engine}...")
-            # Create an instance of the search engine
-            engine_instance = self.search_engines[engine]
-            # Perform the search
-            search_results = engine_instance.get_properties_details()
-            # Check if the search was successful
-            if not search_results:
-                logger.warning(f"No properties found on {engine}.")
-                continue
-            else:
-                logger.info(
-                    f"Found {len(search_results)} properties on {engine}."
-                )
-            # Store the search results with the engine name and the date of search
-            results[engine] = {
-                "properties": search_results,
-            }
-        # Add additional information to the search [e.g. country, dateOfSearch, etc.]
-        search_results = {
+        return {
             "Version": "1.0",
-            "SearchResults": results,
             "SearchParams": self.params._asdict(),
             "SearchDate": datetime.datetime.now().isoformat(),
         }
-        # Return the search results as a JSON object
-        return json.dumps(search_results, indent=4)
+
+    async def search_stream(
+        self, sink: Optional[JSONLWriter] = None, resume: bool = False
+    ) -> AsyncIterator[PropertyDetails]:
+        """
+        Perform the search, yielding each property as soon as it is parsed.
+
+        All the engines run concurrently on the current event loop and their
+        properties are yielded in arrival order. An engine that fails is
+        logged and does not stop the others.
+
+        Args:
+            sink (JSONLWriter): If given, each property is also appended to it.
+            resume (bool): Continue each engine from the checkpoint of an
+                interrupted run instead of searching again.
+
+        Yields:
+            PropertyDetails: The property details; ``origin`` names the
+            search engine the property was found on.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=ENGINE_QUEUE_SIZE)
+        tasks = [
+            asyncio.create_task(
+                _run_engine(engine, engine_instance, queue, resume)
+            )
+            for engine, engine_instance in self.search_engines.items()
+        ]
+        running = len(tasks)
+        depth = metrics.QUEUE_DEPTH.labels(queue="engines")
+        received = 0
+        try:
+            while running:
+                item = await queue.get()
+                received += 1
+                if received % QUEUE_DEPTH_SAMPLE == 0:
+                    depth.set(queue.qsize())
+                if item is None:
+                    running -= 1
+                    continue
+                engine, property_details = item
+                if sink is not None:
+                    sink.write(property_details._asdict(), engine)
+                yield property_details
+        finally:
+            depth.set(queue.qsize())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Connection pools belong to this event loop, close them with it
+            await asyncio.gather(
+                *(engine.aclose() for engine in self.search_engines.values()),
+                return_exceptions=True,
+            )
+
+    async def search_async(
+        self, sink: Optional[JSONLWriter] = None, resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Perform the search and collect the results.
+
+        Args:
+            sink (JSONLWriter): If given, each property is appended to it
+                as soon as it is parsed and is not kept in memory.
+            resume (bool): Continue from the checkpoints of an interrupted run.
+
+        Returns:
+            dict: The search results, grouped by search engine; with a sink
+            only the metadata, the properties being in the sink.
+        """
+        results: Dict[str, Any] = {}
+        if sink is not None:
+            # Memory stays flat however large the search
+            async for _ in self.search_stream(sink, resume):
+                pass
+            return {"SearchResults": results, **self.metadata()}
+        async for property_details in self.search_stream(sink, resume):
+            # Store the search results with the engine name
+            engine_results = results.setdefault(
+                property_details.origin, {"properties": []}
+            )
+            engine_results["properties"].append(property_details._asdict())
+        # Add additional information to the search [e.g. country, dateOfSearch, etc.]
+        return {"SearchResults": results, **self.metadata()}
+
+    def search(
+        self, sink: Optional[JSONLWriter] = None, resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Perform the search using the configured search engines.
+
+        Args:
+            sink (JSONLWriter): If given, each property is appended to it
+                as soon as it is parsed, instead of being returned.
+            resume (bool): Continue from the checkpoints of an interrupted
+                run, so only the pages not fetched yet are requested.
+
+        Returns:
+            dict: The search results, ready to be saved with DownloadManager;
+            without the properties if a sink was given.
+        """
+        return asyncio.run(self.search_async(sink, resume))
+
+
+async def _run_engine(
+    engine: str,
+    engine_instance: SearchEngine,
+    queue: asyncio.Queue,
+    resume: bool = False,
+) -> None:
+    """
+    Put the properties found by an engine on the queue, then None.
+
+    Args:
+        engine (str): The name of the search engine.
+        engine_instance (SearchEngine): The search engine.
+        queue (asyncio.Queue): The queue shared by all the engines.
+        resume (bool): Continue from the engine's checkpoint.
+    """
+    logger.info(f"Searching for properties on {engine}...")
+    found = 0
+    try:
+        async for property_details in engine_instance.stream_properties(resume):
+            found += 1
+            await queue.put((engine, property_details))
+    except asyncio.CancelledError:
+        # The consumer stopped early, nobody waits for the end marker
+        raise
+    except Exception:
+        logger.exception(f"Search on {engine} failed.")
+    finally:
+        # Counted once per engine, not on every property
+        metrics.PROPERTIES.inc(found, engine=engine)
+    if found:
+        logger.info(f"Found {found} properties on {engine}.")
+    else:
+        logger.warning(f"No properties found on {engine}.")
+    await queue.put(None)
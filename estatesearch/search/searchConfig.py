@@ -4,6 +4,36 @@ This module defines the parameters and settings used for searching properties.
 
 from typing import NamedTuple, Optional
 
+# Values accepted by Rightmove for the list and choice parameters.
+PROPERTY_TYPES = frozenset(
+    {
+        "bungalow",
+        "detached",
+        "flat",
+        "land",
+        "park-home",
+        "semi-detached",
+        "terraced",
+    }
+)
+MUST_HAVE = frozenset(
+    {
+        "garden",
+        "parking",
+        "newHome",
+        "retirement",
+        "sharedOwnership",
+        "auction",
+    }
+)
+DONT_SHOW = frozenset(
+    {"newHome", "retirement", "sharedOwnership", "furnishTypes"}
+)
+MAX_DAYS_SINCE_ADDED = (1, 3, 7, 14)
+
+# Modes of the HTTP cassette, see CassetteTransport.
+CASSETTE_MODES = ("record", "replay", "once")
+
 
 class SearchParams(NamedTuple):
     """
@@ -60,7 +90,128 @@ class SearchParams(NamedTuple):
     limit: Optional[int] = None  # int(0,inf) limit of properties to return
     # 0: no output, 1: some output, 2: detailed output, 3: debug output
 
+    def validate(self) -> "SearchParams":
+        """
+        Check the search parameters against the values Rightmove accepts.
+
+        Raises:
+            UserWarning: If a parameter is missing or out of range.
+
+        Returns:
+            SearchParams: The parameters, unchanged, so calls can be chained.
+        """
+        if not self.location:
+            raise UserWarning("Please provide a location.")
+        if self.buy_rent not in ("buy", "rent"):
+            raise UserWarning(
+                "Please provide a valid buy or rent option.\n"
+                "Options:  'buy' or 'rent'."
+            )
+        for name, values, allowed in (
+            ("property_type", self.property_type, PROPERTY_TYPES),
+            ("must_have", self.must_have, MUST_HAVE),
+            ("dont_show", self.dont_show, DONT_SHOW),
+        ):
+            unknown = set(values or []) - allowed
+            if unknown:
+                raise UserWarning(
+                    f"Invalid {name}: {sorted(unknown)}.\n"
+                    f"Options: {sorted(allowed)}."
+                )
+        if self.max_days_since_added and self.max_days_since_added not in (
+            MAX_DAYS_SINCE_ADDED
+        ):
+            raise UserWarning(
+                f"Invalid max_days_since_added: {self.max_days_since_added}.\n"
+                f"Options: {MAX_DAYS_SINCE_ADDED}."
+            )
+        for name in ("radius", "min_price", "max_price"):
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise UserWarning(f"Invalid {name}: {value}, must be >= 0.")
+        for name in ("min_bedrooms", "max_bedrooms"):
+            value = getattr(self, name)
+            if value is not None and not 0 <= value <= 5:
+                raise UserWarning(f"Invalid {name}: {value}, must be 0 to 5.")
+        for low, high in (
+            ("min_price", "max_price"),
+            ("min_bedrooms", "max_bedrooms"),
+        ):
+            low_value, high_value = getattr(self, low), getattr(self, high)
+            if (
+                low_value is not None
+                and high_value is not None
+                and low_value > high_value
+            ):
+                raise UserWarning(f"{low} must not be greater than {high}.")
+        return self
+
     def __str__(self):
         """Return a string representation of the search parameters."""
         return f"Search properties in {self.country} for {self.buy_rent}\n \
                 in {self.location}"
+
+
+class CrawlConfig(NamedTuple):
+    """
+    Crawl settings for the estate search application.
+
+    These settings control how pages are fetched and cached, not what is
+    searched for, so they are kept apart from SearchParams and are not
+    stored with the search results.
+
+    Attributes:
+        max_concurrency (int): The maximum number of requests in flight at once.
+        max_retries (int): The number of retries per request after the first attempt.
+        backoff_base (float): The base delay in seconds of the exponential backoff.
+        backoff_max (float): The upper bound in seconds of a single backoff delay.
+        cache_dir (str): The directory for caches kept between runs.
+        location_ttl (float): How long a resolved location ID is reused, in seconds.
+        http_cache_bytes (int): The size limit of the HTTP cache, 0 to disable it.
+        incremental (bool): Only fetch listings that are new or changed since
+            the previous crawl, reusing the stored details of the others.
+        lease_timeout (float): How long a worker process holds a queued URL before
+            another worker may take it over, in seconds.
+        parse_workers (int): The number of processes parsing listing pages off the
+            event loop, 0 to parse on the event loop.
+        parse_batch_size (int): The number of pages sent to a parse process at once.
+        max_connections (int): The maximum number of open connections.
+        max_keepalive_connections (int): The maximum number of idle connections kept open.
+        keepalive_expiry (float): How long an idle connection is kept open, in seconds.
+        timeout (float): The read, write and pool timeout of a request, in seconds.
+        connect_timeout (float): The timeout to open a connection, in seconds.
+        http2 (bool): Whether to use HTTP/2, which also lowers the chance of being blocked.
+        cassette (str): A file to record the HTTP responses to or replay them from,
+            None to use the network only.
+        cassette_mode (str): "record", "replay" or "once", see CassetteTransport.
+        rate_limit (float): The starting request rate per host, in requests per
+            second, 0 to disable the rate limiter.
+        rate_limit_min (float): The lowest rate backing off can reach.
+        rate_limit_max (float): The highest rate speeding up can reach.
+        slow_response (float): The response time above which the rate limiter
+            backs off, in seconds.
+    """
+
+    max_concurrency: int = 10
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    cache_dir: str = "cache"
+    location_ttl: float = 30 * 24 * 3600  # 30 days
+    http_cache_bytes: int = 512 * 1024 * 1024  # 512 MB
+    incremental: bool = False
+    lease_timeout: float = 300.0
+    parse_workers: int = 0
+    parse_batch_size: int = 16
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 200.0
+    connect_timeout: float = 10.0
+    http2: bool = True
+    cassette: Optional[str] = None
+    cassette_mode: str = "replay"
+    rate_limit: float = 5.0
+    rate_limit_min: float = 0.5
+    rate_limit_max: float = 20.0
+    slow_response: float = 5.0
@@ -0,0 +1,173 @@
+"""Shared HTTP connection pool for the estate search application.
+
+A Transport owns the AsyncClient of a search engine: one HTTP/2 connection
+pool with the limits, keep-alive and timeouts of the CrawlConfig, behind
+the adaptive per-host rate limiter, the conditional HTTP cache and, if one
+is configured, a cassette recording or replaying the traffic. The client
+is created on first use, so importing an engine opens nothing, and every
+request of a run goes through the same pool.
+
+An httpx connection pool belongs to the event loop it was first used on.
+When the transport is used from a new loop (each ``asyncio.run``), the
+pool of the finished loop is dropped and a new one is created.
+"""
+
+import asyncio
+import logging
+import pathlib
+from typing import Dict, Optional
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    AsyncHTTPTransport,
+    Limits,
+    Timeout,
+)
+
+from estatesearch.search.cassette import CassetteTransport
+from estatesearch.search.httpcache import CachingTransport, HTTPCache
+from estatesearch.search.ratelimit import (
+    HOSTS,
+    RateLimitedTransport,
+    RateLimiter,
+)
+from estatesearch.search.searchConfig import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+
+class Transport:
+    """
+    Lazily created, explicitly closed HTTP client shared by an engine.
+
+    Use it as an async context manager, or call ``aclose`` when done.
+    """
+
+    def __init__(
+        self,
+        crawl_config: CrawlConfig = CrawlConfig(),
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[AsyncBaseTransport] = None,
+    ) -> None:
+        """
+        Initialize the transport; no connection is opened yet.
+
+        Args:
+            crawl_config (CrawlConfig): The pool limits, timeouts and cache
+                settings.
+            headers (Dict[str, str]): The headers sent with every request.
+            transport (AsyncBaseTransport): The transport sending the
+                requests, instead of an HTTP connection pool (e.g. a mock
+                or a recording).
+        """
+        self.crawl_config = crawl_config
+        self.headers = dict(headers or {})
+        self._transport = transport
+        self.http_cache: Optional[HTTPCache] = None
+        if crawl_config.http_cache_bytes > 0:
+            self.http_cache = HTTPCache(
+                pathlib.Path(crawl_config.cache_dir) / "http",
+                max_bytes=crawl_config.http_cache_bytes,
+            )
+        self.cassette: Optional[CassetteTransport] = None
+        if crawl_config.cassette:
+            self.cassette = CassetteTransport(
+                crawl_config.cassette, crawl_config.cassette_mode
+            )
+        # Process-wide, so every transport and run shares the learned rates
+        self.rate_limiter: Optional[RateLimiter] = None
+        if crawl_config.rate_limit > 0:
+            self.rate_limiter = RateLimiter(crawl_config, HOSTS)
+        self._client: Optional[AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def limits(self) -> Limits:
+        """The connection pool limits."""
+        return Limits(
+            max_connections=self.crawl_config.max_connections,
+            max_keepalive_connections=self.crawl_config.max_keepalive_connections,
+            keepalive_expiry=self.crawl_config.keepalive_expiry,
+        )
+
+    @property
+    def client(self) -> AsyncClient:
+        """
+        The client of the running event loop, created on first access.
+
+        Raises:
+            RuntimeError: If there is no running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            # The connections belong to a finished loop and cannot be reused
+            logger.debug("Event loop changed, opening a new connection pool.")
+            self._client = None
+        if self._client is None:
+            self._client = AsyncClient(
+                headers=self.headers,
+                follow_redirects=True,
+                timeout=Timeout(
+                    self.crawl_config.timeout,
+                    connect=self.crawl_config.connect_timeout,
+                ),
+                transport=self._build_transport(),
+            )
+            self._loop = loop
+        return self._client
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """
+        The request slots of the running event loop, created on first access.
+
+        Every scraper of the transport holds one per request, so the engines
+        sharing the transport, e.g. the searches of a batch, keep together
+        to ``max_concurrency`` requests in flight.
+
+        Raises:
+            RuntimeError: If there is no running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(
+                max(self.crawl_config.max_concurrency, 1)
+            )
+            self._slots_loop = loop
+        return self._slots
+
+    def _build_transport(self) -> AsyncBaseTransport:
+        transport = self._transport or AsyncHTTPTransport(
+            http2=self.crawl_config.http2, limits=self.limits
+        )
+        if self.rate_limiter is not None:
+            # Cache hits and replayed responses are not limited
+            transport = RateLimitedTransport(transport, self.rate_limiter)
+        if self.http_cache is not None:
+            transport = CachingTransport(transport, self.http_cache)
+        if self.cassette is not None:
+            # Above the cache, so it records the responses the client sees,
+            # not the conditional requests of the cache and their 304s.
+            # The recording outlives the pool, only its network side is new
+            self.cassette.transport = transport
+            transport = self.cassette
+        return transport
+
+    async def aclose(self) -> None:
+        """Close the connections of the pool, if it was opened."""
+        if (
+            self._client is not None
+            and self._loop is asyncio.get_running_loop()
+        ):
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    async def __aenter__(self) -> "Transport":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        await self.aclose()
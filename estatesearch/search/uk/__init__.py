@@ -1,7 +1,23 @@
 """
 Base package for scraping UK real estate from Rightmove.
+
+Rightmove is imported on first access; the data classes and parsers of the
+package do not need the HTTP client.
 """
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .rightmove import Rightmove
+
+__all__ = ['Rightmove']
+
+_LAZY = {'Rightmove': 'estatesearch.search.uk.rightmove'}
 
-from .rightmove import Rightmove
 
-__all__ = ['Rightmove']
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,237 @@
+"""
+Persistent cache of Rightmove location identifiers.
+
+Rightmove needs a location identifier (e.g. ``REGION^87490``) for every
+search, resolved through https://los.rightmove.co.uk/typeahead. The same
+location always resolves to the same identifier, so the answers are kept
+on disk between runs, with a time to live and least-recently-used eviction.
+"""
+
+import json
+import logging
+import os
+import pathlib
+import re
+import time
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from httpx import AsyncClient
+
+from estatesearch.search.scraper import Scraper
+from estatesearch.search.searchConfig import CrawlConfig
+
+logger = logging.getLogger(__name__)
+
+TYPEAHEAD_URL = "https://los.rightmove.co.uk/typeahead?query="
+
+# Characters the typeahead treats as separators.
+SEPARATORS = re.compile(r"[\s,.\-_()&+]+")
+
+LocationIdent = Tuple[str, str]
+
+
+def _read_json(path: pathlib.Path) -> Dict[str, dict]:
+    """Read a JSON state file, empty if it is missing or unreadable."""
+    if path.exists():
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable file {path}.")
+    return {}
+
+
+def _write_json_atomic(path: pathlib.Path, data: Dict[str, dict]) -> None:
+    """Write a JSON state file so readers never see it half written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def normalise_location(location: str) -> str:
+    """
+    Normalise a location string so equivalent spellings share a cache key.
+
+    ``"SY3 9EB"``, ``"sy3-9eb"`` and ``" Sy3  9eb "`` all become ``"sy3 9eb"``.
+
+    Args:
+        location (str): The location as given by the user.
+
+    Returns:
+        str: The normalised location.
+    """
+    return SEPARATORS.sub(" ", location).strip().lower()
+
+
+def typeahead_url(location: str) -> str:
+    """
+    Get the typeahead URL that resolves a location.
+
+    Args:
+        location (str): The location to resolve.
+
+    Returns:
+        str: The typeahead URL.
+    """
+    return TYPEAHEAD_URL + normalise_location(location).replace(" ", "+")
+
+
+def parse_typeahead(text: str) -> Optional[LocationIdent]:
+    """
+    Get the best match from a typeahead response.
+
+    Args:
+        text (str): The body of the typeahead response.
+
+    Returns:
+        Optional[LocationIdent]: The location type and ID, None if there is
+        no match or the response is not a typeahead answer.
+    """
+    try:
+        matches = json.loads(text)["matches"]
+        if not matches:
+            return None
+        return matches[0]["type"], matches[0]["id"]
+    except (ValueError, LookupError, TypeError) as exc:
+        logger.warning(f"Malformed typeahead response: {exc!r}")
+        return None
+
+
+class LocationCache:
+    """
+    On-disk cache of location identifiers keyed on the normalised location.
+
+    Entries older than ``ttl`` seconds are treated as missing, and once more
+    than ``max_entries`` are stored the least recently used are dropped. The
+    file is loaded on first use and written back with ``save``.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path] = "cache/locations.json",
+        ttl: float = 30 * 24 * 3600,
+        max_entries: int = 10000,
+    ) -> None:
+        """
+        Initialize the location cache.
+
+        Args:
+            path (Union[str, Path]): The JSON file backing the cache.
+            ttl (float): The time to live of an entry, in seconds.
+            max_entries (int): The maximum number of entries kept.
+        """
+        self.path = pathlib.Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Optional[Dict[str, dict]] = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        """The cached entries, loaded from disk on first access."""
+        if self._entries is None:
+            self._entries = _read_json(self.path)
+        return self._entries
+
+    def get(self, location: str) -> Optional[LocationIdent]:
+        """
+        Get the cached identifier of a location.
+
+        Args:
+            location (str): The location to look up.
+
+        Returns:
+            Optional[LocationIdent]: The location type and ID, None if the
+            location is not cached or its entry has expired.
+        """
+        key = normalise_location(location)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        now = time.time()
+        if now - entry["stored"] > self.ttl:
+            del self.entries[key]
+            self._dirty = True
+            return None
+        entry["used"] = now
+        self._dirty = True
+        return entry["type"], entry["id"]
+
+    def set(self, location: str, ident: LocationIdent) -> None:
+        """
+        Store the identifier of a location.
+
+        Args:
+            location (str): The location that was resolved.
+            ident (LocationIdent): The location type and ID.
+        """
+        now = time.time()
+        self.entries[normalise_location(location)] = {
+            "type": ident[0],
+            "id": ident[1],
+            "stored": now,
+            "used": now,
+        }
+        self._dirty = True
+        if len(self.entries) > self.max_entries:
+            by_use = sorted(self.entries, key=lambda k: self.entries[k]["used"])
+            for key in by_use[: len(self.entries) - self.max_entries]:
+                del self.entries[key]
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed since it was loaded."""
+        if not self._dirty:
+            return
+        _write_json_atomic(self.path, self.entries)
+        self._dirty = False
+
+
+async def resolve_locations(
+    locations: Iterable[str],
+    client: AsyncClient,
+    cache: LocationCache,
+    config: CrawlConfig = CrawlConfig(),
+) -> Dict[str, LocationIdent]:
+    """
+    Resolve many locations, querying the typeahead once per uncached location.
+
+    Uncached locations are resolved in one concurrent pass and added to the
+    cache, which is then saved, also when resolving fails, so the lookups
+    and their recency are never lost. Locations the typeahead does not know are
+    logged and left out of the result.
+
+    Args:
+        locations (Iterable[str]): The locations to resolve.
+        client (AsyncClient): The HTTP client used for the typeahead.
+        cache (LocationCache): The cache to read from and update.
+        config (CrawlConfig): Concurrency and retry settings.
+
+    Returns:
+        Dict[str, LocationIdent]: The location type and ID of each resolved
+        location, keyed on the location as given.
+    """
+    resolved: Dict[str, LocationIdent] = {}
+    to_resolve: Dict[str, list] = {}
+    for location in locations:
+        ident = cache.get(location)
+        if ident is not None:
+            resolved[location] = ident
+        else:
+            url = typeahead_url(location)
+            to_resolve.setdefault(url, []).append(location)
+
+    try:
+        async for result in Scraper(client, config).scrape(to_resolve):
+            ident = parse_typeahead(result.response.text) if result.ok else None
+            if ident is None:
+                logger.warning(
+                    f"Invalid location: {to_resolve[result.url]} "
+                    f"({result.error})"
+                )
+                continue
+            for location in to_resolve[result.url]:
+                cache.set(location, ident)
+                resolved[location] = ident
+    finally:
+        cache.save()
+    return resolved
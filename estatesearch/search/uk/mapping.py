@@ -0,0 +1,161 @@
+"""
+Mapping of Rightmove PAGE_MODEL objects to PropertyDetails records.
+
+The PAGE_MODEL of a listing page is several tens of KB of JSON, most of it
+page furniture (ad targeting, map URLs, mortgage calculator settings...).
+The fields of PropertyDetails are picked out with a single jmespath
+expression, compiled once at import time, so the rest of the payload can
+be dropped as soon as a page is parsed.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import jmespath
+
+from .details import PropertyDetails
+from .pagemodel import extract_page_model
+
+ORIGIN = "Rightmove"
+
+# jmespath path of every PropertyDetails field, relative to the PAGE_MODEL.
+# origin and url are not in the payload and are filled in by the caller.
+FIELD_PATHS: Dict[str, str] = {
+    "id": "propertyData.id",
+    "published": "propertyData.status.published",
+    "archived": "propertyData.status.archived",
+    "propertyPhrase": "propertyData.text.propertyPhrase",
+    "description": "propertyData.text.description",
+    "pageTitle": "propertyData.text.pageTitle",
+    "text": "propertyData.text",
+    "primaryPrice": "propertyData.prices.primaryPrice",
+    "secondaryPrice": "propertyData.prices.secondaryPrice",
+    "displayPriceQualifier": "propertyData.prices.displayPriceQualifier",
+    "pricePerSqFt": "propertyData.prices.pricePerSqFt",
+    "address": "propertyData.address.displayAddress",
+    "postcode": "analyticsInfo.analyticsProperty.postcode",
+    "keyFeatures": "propertyData.keyFeatures",
+    "images": "propertyData.images[].{url: url, caption: caption}",
+    "broschures": "propertyData.brochures",
+    "floorplans": "propertyData.floorplans[].url",
+    "video": "propertyData.virtualTours[].url",
+    "sellerInfo": "propertyData.customer",
+    "rooms": "propertyData.rooms",
+    "latitude": "propertyData.location.latitude",
+    "longitude": "propertyData.location.longitude",
+    "pinType": "propertyData.location.pinType",
+    "nearestAirports": "propertyData.nearestAirports",
+    "nearestStations": "propertyData.nearestStations",
+    "sizings": "propertyData.sizings",
+    "epcGraphs": "propertyData.epcGraphs",
+    "bedrooms": "propertyData.bedrooms",
+    "bathrooms": "propertyData.bathrooms",
+    "transactionType": "propertyData.transactionType",
+    "tags": "propertyData.tags",
+    "listingHistory": "propertyData.listingHistory",
+    "feesApply": "propertyData.feesApply",
+    "contactInfo": "propertyData.contactInfo",
+    "lettings": "propertyData.lettings",
+    "tenureType": "propertyData.tenure.tenureType",
+    "yearsRemainingOnLease": "propertyData.tenure.yearsRemainingOnLease",
+    "propertyType": "analyticsInfo.analyticsProperty.propertyType",
+    "propertySubType": "propertyData.propertySubType",
+    "businessForSale": "propertyData.businessForSale",
+    "comercial": "propertyData.commercial",
+    "affordableBuyingScheme": "propertyData.affordableBuyingScheme",
+    "sharedOwnership": "propertyData.sharedOwnership",
+    "retirement": "analyticsInfo.analyticsProperty.retirement",
+    "councilTaxExempt": "propertyData.livingCosts.councilTaxExempt",
+    "councilTaxIncluded": "propertyData.livingCosts.councilTaxIncluded",
+    "annualGroundRent": "propertyData.livingCosts.annualGroundRent",
+    "groundRentReviewPeriodInYears": (
+        "propertyData.livingCosts.groundRentReviewPeriodInYears"
+    ),
+    "groundRentPercentageIncrease": (
+        "propertyData.livingCosts.groundRentPercentageIncrease"
+    ),
+    "annualServiceCharge": "propertyData.livingCosts.annualServiceCharge",
+    "councilTaxBand": "propertyData.livingCosts.councilTaxBand",
+    "domesticRates": "propertyData.livingCosts.domesticRates",
+    "features": "propertyData.features",
+    "EPC": "propertyData.epcGraphs[0].url",
+    "isAuthenticated": "isAuthenticated",
+    "added": "analyticsInfo.analyticsProperty.added",
+    "auctionOnly": "analyticsInfo.analyticsProperty.auctionOnly",
+    "preOwned": "analyticsInfo.analyticsProperty.preOwned",
+}
+
+# One multi-select hash evaluates every field in a single pass.
+PROPERTY_DETAILS = jmespath.compile(
+    "{" + ", ".join(f"{k}: {v}" for k, v in FIELD_PATHS.items()) + "}"
+)
+
+
+def parse_page_model(
+    page_model: dict, url: str = "", origin: str = ORIGIN
+) -> PropertyDetails:
+    """
+    Map a PAGE_MODEL object to a PropertyDetails record.
+
+    Args:
+        page_model (dict): The PAGE_MODEL of a listing page.
+        url (str): The URL of the listing page.
+        origin (str): The name of the portal the listing comes from.
+
+    Returns:
+        PropertyDetails: The property details; missing fields are None.
+    """
+    return PropertyDetails(
+        origin=origin, url=url, **PROPERTY_DETAILS.search(page_model)
+    )
+
+
+def parse_page_models(
+    pages: Iterable[Tuple[str, Optional[dict]]], origin: str = ORIGIN
+) -> List[PropertyDetails]:
+    """
+    Map a batch of PAGE_MODEL objects to PropertyDetails records.
+
+    Args:
+        pages (Iterable[Tuple[str, Optional[dict]]]): (url, PAGE_MODEL)
+            pairs; pairs without a PAGE_MODEL are skipped.
+        origin (str): The name of the portal the listings come from.
+
+    Returns:
+        List[PropertyDetails]: The property details, in input order.
+    """
+    search = PROPERTY_DETAILS.search
+    return [
+        PropertyDetails(origin=origin, url=url, **search(page_model))
+        for url, page_model in pages
+        if page_model
+    ]
+
+
+def parse_listing_pages(
+    pages: Iterable[Tuple[str, str]], origin: str = ORIGIN
+) -> List[Optional[PropertyDetails]]:
+    """
+    Extract and map a batch of listing pages.
+
+    This is the CPU-bound part of a crawl. It is a module-level function
+    taking and returning plain data so that batches can be sent to worker
+    processes.
+
+    Args:
+        pages (Iterable[Tuple[str, str]]): (url, html) pairs.
+        origin (str): The name of the portal the listings come from.
+
+    Returns:
+        List[Optional[PropertyDetails]]: The property details, in input
+        order; None for pages without a PAGE_MODEL.
+    """
+    search = PROPERTY_DETAILS.search
+    properties: List[Optional[PropertyDetails]] = []
+    for url, html in pages:
+        page_model = extract_page_model(html)
+        properties.append(
+            PropertyDetails(origin=origin, url=url, **search(page_model))
+            if page_model
+            else None
+        )
+    return properties
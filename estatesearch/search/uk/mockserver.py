@@ -0,0 +1,396 @@
+"""
+Local mock of the Rightmove endpoints used by the crawler.
+
+MockRightmove serves a synthetic set of listings through the three
+endpoints a crawl touches:
+
+- ``/typeahead``: resolves any location to a region;
+- ``/api/_search``: pages through the listings matching the channel,
+  price, bedrooms and property type filters, refusing offsets above
+  API_LIMIT like the real API;
+- ``/properties/<id>``: a listing page embedding its PAGE_MODEL, padded to
+  a realistic size.
+
+Responses can be slowed down and a share of them replaced by server errors
+or 429s, to load-test the crawler on one machine. The mock is served
+either in-process, as an httpx transport, or over HTTP on a local port;
+RerouteTransport sends the crawler's requests for rightmove.co.uk there.
+"""
+
+import asyncio
+import collections
+import http.server
+import json
+import random
+import threading
+import time
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from httpx import (
+    URL,
+    AsyncBaseTransport,
+    AsyncHTTPTransport,
+    MockTransport,
+    Request,
+    Response,
+)
+
+from estatesearch.search.searchConfig import PROPERTY_TYPES
+
+from .queryplan import CHANNELS
+from .rightmove import API_LIMIT
+
+# Price range of the listings of each channel
+PRICE_RANGES = {"BUY": (50_000, 2_000_000), "RENT": (400, 6_000)}
+
+_PROPERTY_TYPES = sorted(PROPERTY_TYPES)
+_FILLER = '<div class="filler">' + "x" * 1000 + "</div>\n"
+
+
+class MockListing(NamedTuple):
+    """
+    A synthetic listing.
+
+    Attributes:
+        id (int): The property ID.
+        price (int): The asking price, or the monthly rent.
+        bedrooms (int): The number of bedrooms, 0 for studios.
+        property_type (str): One of the search property types.
+    """
+
+    id: int
+    price: int
+    bedrooms: int
+    property_type: str
+
+
+class MockRightmove:
+    """Synthetic Rightmove site with configurable latency and faults."""
+
+    def __init__(
+        self,
+        listings: int = 10_000,
+        buy_rent: str = "rent",
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        page_bytes: int = 100_000,
+        seed: int = 0,
+    ) -> None:
+        """
+        Initialize the mock site.
+
+        Args:
+            listings (int): The number of listings.
+            buy_rent (str): Whether the listings are for "buy" or "rent".
+            latency (float): The delay of every response, in seconds.
+            error_rate (float): The share of responses replaced by a 503.
+            rate_limit_rate (float): The share of responses replaced by a
+                429.
+            retry_after (int): The Retry-After of the 429s, in seconds.
+            page_bytes (int): The approximate size of a listing page.
+            seed (int): The seed of the listings and of the faults.
+        """
+        self.channel = CHANNELS[buy_rent][1]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.padding = _FILLER * (page_bytes // len(_FILLER))
+        low, high = PRICE_RANGES[self.channel]
+        rng = random.Random(seed)
+        self.listings: List[MockListing] = [
+            MockListing(
+                id=100_000_000 + i,
+                price=int(round(rng.uniform(low, high), -1)),
+                bedrooms=rng.randint(0, 6),
+                property_type=rng.choice(_PROPERTY_TYPES),
+            )
+            for i in range(listings)
+        ]
+        self.by_id = {listing.id: listing for listing in self.listings}
+        # Responses served, by endpoint and status
+        self.requests: collections.Counter = collections.Counter()
+        self._faults = random.Random(seed + 1)
+        self._lock = threading.Lock()
+
+    def handle(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer a GET request, without the latency.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: The status, headers and body.
+        """
+        parts = urlsplit(url)
+        query = {
+            key: values[0] for key, values in parse_qs(parts.query).items()
+        }
+        if parts.path == "/typeahead":
+            endpoint, response = "typeahead", self.typeahead(query)
+        elif parts.path == "/api/_search":
+            endpoint, response = "search", self.search(query)
+        elif parts.path.startswith("/properties/"):
+            endpoint, response = "listing", self.listing(parts.path)
+        else:
+            endpoint, response = "other", (404, {}, b"Not Found")
+        with self._lock:
+            draw = self._faults.random()
+        if draw < self.rate_limit_rate:
+            response = (429, {"Retry-After": str(self.retry_after)}, b"")
+        elif draw < self.rate_limit_rate + self.error_rate:
+            response = (503, {}, b"Service Unavailable")
+        with self._lock:
+            self.requests[endpoint, response[0]] += 1
+        return response
+
+    def typeahead(self, query: Dict[str, str]) -> Tuple[int, dict, bytes]:
+        """Resolve any location to a region."""
+        location = query.get("query", "")
+        region = {
+            "type": "REGION",
+            "id": str(zlib.crc32(location.encode()) % 100_000),
+            "displayName": location.title(),
+        }
+        return _json({"matches": [region] if location else []})
+
+    def search(self, query: Dict[str, str]) -> Tuple[int, dict, bytes]:
+        """Get a page of the listings matching the search filters."""
+        index = int(query.get("index", 0))
+        if index > API_LIMIT:
+            return 400, {}, b"Bad Request"
+        page_size = int(query.get("numberOfPropertiesPerPage", 24))
+        matches = self.matching(query)
+        return _json(
+            {
+                "resultCount": f"{len(matches):,}",
+                "properties": [
+                    self.summary(listing)
+                    for listing in matches[index : index + page_size]
+                ],
+            }
+        )
+
+    def matching(self, query: Dict[str, str]) -> List[MockListing]:
+        """
+        Get the listings matching the filters of a search query.
+
+        Args:
+            query (Dict[str, str]): The query parameters of the search.
+
+        Returns:
+            List[MockListing]: The matching listings.
+        """
+        if query.get("channel", self.channel) != self.channel:
+            return []
+        min_price = int(query.get("minPrice") or 0)
+        max_price = int(query.get("maxPrice") or 10**12)
+        min_bedrooms = int(query.get("minBedrooms") or 0)
+        max_bedrooms = int(query.get("maxBedrooms") or 10**3)
+        types = query.get("propertyTypes")
+        types = set(types.split(",")) if types else None
+        return [
+            listing
+            for listing in self.listings
+            if min_price <= listing.price <= max_price
+            and min_bedrooms <= listing.bedrooms <= max_bedrooms
+            and (types is None or listing.property_type in types)
+        ]
+
+    def summary(self, listing: MockListing) -> dict:
+        """Get a listing as returned by the search API."""
+        return {
+            "id": listing.id,
+            "bedrooms": listing.bedrooms,
+            "propertySubType": listing.property_type.title(),
+            "price": {"amount": listing.price, "currencyCode": "GBP"},
+            "propertyUrl": f"/properties/{listing.id}#/?channel={self.channel}",
+            "listingUpdate": {
+                "listingUpdateReason": "new",
+                "listingUpdateDate": "2025-03-29T00:00:00Z",
+            },
+        }
+
+    def listing(self, path: str) -> Tuple[int, dict, bytes]:
+        """Get the page of a listing, embedding its PAGE_MODEL."""
+        property_id = path.rsplit("/", 1)[-1]
+        listing = (
+            self.by_id.get(int(property_id)) if property_id.isdigit() else None
+        )
+        if listing is None:
+            return 404, {}, b"Not Found"
+        page = (
+            "<html><head><title>Rightmove</title></head><body>\n"
+            f"{self.padding}"
+            "<script>window.PAGE_MODEL = "
+            f"{json.dumps(self.page_model(listing))}"
+            "</script>\n</body></html>"
+        )
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, page.encode()
+
+    def page_model(self, listing: MockListing) -> dict:
+        """Get the PAGE_MODEL of a listing."""
+        price = f"£{listing.price:,}" + (
+            " pcm" if self.channel == "RENT" else ""
+        )
+        kind = (
+            "studio" if listing.bedrooms == 0 else f"{listing.bedrooms} bedroom"
+        )
+        phrase = f"{kind} {listing.property_type}"
+        postcode = f"ME{listing.id % 20} {listing.id % 10}AA"
+        return {
+            "propertyData": {
+                "id": str(listing.id),
+                "status": {"published": True, "archived": False},
+                "text": {
+                    "description": f"A {phrase} in Kent.",
+                    "propertyPhrase": phrase,
+                    "pageTitle": f"{phrase} in Kent",
+                },
+                "prices": {"primaryPrice": price, "secondaryPrice": None},
+                "address": {
+                    "displayAddress": f"{listing.id % 500} High Street, Kent",
+                    "outcode": postcode.split()[0],
+                    "incode": postcode.split()[1],
+                },
+                "keyFeatures": ["Garden", "Parking"],
+                "images": [],
+                "location": {
+                    "latitude": 51.2 + (listing.id % 1000) / 5000,
+                    "longitude": 0.5 + (listing.id % 997) / 5000,
+                },
+                "bedrooms": listing.bedrooms,
+                "bathrooms": 1,
+                "transactionType": self.channel,
+                "propertySubType": listing.property_type.title(),
+            },
+            "analyticsInfo": {
+                "analyticsProperty": {
+                    "postcode": postcode,
+                    "propertyType": listing.property_type,
+                    "added": "20250329",
+                }
+            },
+            "isAuthenticated": False,
+        }
+
+    def transport(self) -> AsyncBaseTransport:
+        """
+        Serve the mock in-process.
+
+        Returns:
+            AsyncBaseTransport: A transport answering every request from the
+            mock, whatever its host.
+        """
+
+        async def handler(request: Request) -> Response:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            status, headers, body = self.handle(str(request.url))
+            return Response(status, headers=headers, content=body)
+
+        return MockTransport(handler)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "MockServer":
+        """
+        Serve the mock over HTTP from a background thread.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on, any free port if 0.
+
+        Returns:
+            MockServer: The running server; close it when done.
+        """
+        return MockServer(self, host, port)
+
+
+class MockServer(http.server.ThreadingHTTPServer):
+    """HTTP server for a MockRightmove, one thread per connection."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, site: MockRightmove, host: str, port: int) -> None:
+        self.site = site
+        super().__init__((host, port), _Handler)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self) -> None:
+        """Stop the server and wait for its thread."""
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "MockServer":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Answer GET requests from the MockRightmove of the server."""
+
+    # Keep-alive, so the crawler's connection pool is exercised
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        site = self.server.site
+        if site.latency:
+            time.sleep(site.latency)
+        status, headers, body = site.handle(self.path)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class RerouteTransport(AsyncBaseTransport):
+    """Send every request to another server, keeping its path and query."""
+
+    def __init__(
+        self, base_url: str, transport: Optional[AsyncBaseTransport] = None
+    ) -> None:
+        """
+        Initialize the transport.
+
+        Args:
+            base_url (str): The scheme, host and port to send requests to.
+            transport (AsyncBaseTransport): The transport sending the
+                rerouted requests, a new HTTP/1.1 transport if None.
+        """
+        self.base_url = URL(base_url)
+        self.transport = transport or AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: Request) -> Response:
+        request.url = request.url.copy_with(
+            scheme=self.base_url.scheme,
+            host=self.base_url.host,
+            port=self.base_url.port,
+        )
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _json(data: dict) -> Tuple[int, Dict[str, str], bytes]:
+    return 200, {"Content-Type": "application/json"}, json.dumps(data).encode()
@@ -0,0 +1,76 @@
+"""
+Extraction of the PAGE_MODEL object from Rightmove listing pages.
+
+Every listing page embeds its data as ``window.PAGE_MODEL = {...}`` in a
+script tag. Finding the assignment with a plain string search and decoding
+the object in place is much cheaper than building the DOM of the whole
+~400 KB page, so the parsel based extraction is only used as a fallback.
+"""
+
+import json
+import re
+from typing import Optional
+
+MARKER = "PAGE_MODEL"
+
+_decoder = json.JSONDecoder()
+_assignment = re.compile(r"\s*=\s*")
+
+
+def extract_page_model(html: str) -> Optional[dict]:
+    """
+    Get the PAGE_MODEL object of a listing page.
+
+    The object is decoded straight from the page text, starting at the
+    assignment, so no substring is copied and nothing after the object is
+    parsed. Pages the fast path cannot read fall back to a full parse.
+
+    Args:
+        html (str): The listing page.
+
+    Returns:
+        Optional[dict]: The PAGE_MODEL object, None if the page has none.
+    """
+    pos = html.find(MARKER)
+    while pos != -1:
+        assignment = _assignment.match(html, pos + len(MARKER))
+        if assignment and assignment.end() > pos + len(MARKER):
+            try:
+                data, _ = _decoder.raw_decode(html, assignment.end())
+            except ValueError:
+                break
+            if isinstance(data, dict):
+                return data
+            break
+        pos = html.find(MARKER, pos + 1)
+    return extract_page_model_parsel(html)
+
+
+def extract_page_model_parsel(html: str) -> Optional[dict]:
+    """
+    Get the PAGE_MODEL object of a listing page through a full HTML parse.
+
+    Args:
+        html (str): The listing page.
+
+    Returns:
+        Optional[dict]: The PAGE_MODEL object, None if the page has none.
+    """
+    # Only needed for the pages the fast path cannot read
+    from parsel import Selector
+
+    script = (
+        Selector(html)
+        .xpath("//script[contains(.,'PAGE_MODEL = ')]/text()")
+        .get()
+    )
+    if not script:
+        return None
+    start = script.find("{", script.find("PAGE_MODEL = "))
+    while start != -1:
+        try:
+            data, _ = _decoder.raw_decode(script, start)
+            return data
+        except ValueError:
+            start = script.find("{", start + 1)
+    return None
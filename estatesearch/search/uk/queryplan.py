@@ -0,0 +1,195 @@
+"""
+Compiled Rightmove query plans.
+
+A QueryPlan is built once per search from validated SearchParams and the
+resolved location identifier. It holds the encoded filters and the URL
+templates of the HTML search and the API, so building the URL of any page
+is a string format instead of a typeahead request plus query rebuild.
+"""
+
+from typing import NamedTuple, Optional, Tuple
+
+from estatesearch.search.searchConfig import SearchParams
+
+BASE_URL = "https://www.rightmove.co.uk/"
+API_URL = "https://www.rightmove.co.uk/api/_search?"
+
+CHANNELS = {
+    "buy": ("property-for-sale", "BUY"),
+    "rent": ("property-to-rent", "RENT"),
+}
+
+
+class QueryPlan(NamedTuple):
+    """
+    Immutable, precomputed form of a Rightmove search.
+
+    Attributes:
+        location (str): The location as given in the search parameters.
+        location_type (str): The resolved location type (e.g. "REGION").
+        location_id (str): The resolved location ID.
+        buy_or_rent (str): The URL section of the search channel.
+        channel (str): The API channel ("BUY" or "RENT").
+        filters (str): The encoded filter part of the query string.
+        properties_per_page (int): The page size used by the API.
+        html_template (str): The HTML search URL, formatted with the page index.
+        api_template (str): The API search URL, formatted with the page index.
+    """
+
+    location: str
+    location_type: str
+    location_id: str
+    buy_or_rent: str
+    channel: str
+    filters: str
+    properties_per_page: int
+    html_template: str
+    api_template: str
+
+    @property
+    def location_identifier(self) -> str:
+        """The location identifier as sent to Rightmove."""
+        return f"{self.location_type}^{self.location_id}"
+
+    @property
+    def html_url(self) -> str:
+        """The URL of the first page of the HTML search."""
+        return self.html_page_url(0)
+
+    @property
+    def api_url(self) -> str:
+        """The API search URL without paging parameters."""
+        return self.api_template.split("&index=", 1)[0]
+
+    def html_page_url(self, index: int) -> str:
+        """
+        Get the HTML search URL of the page starting at ``index``.
+
+        Args:
+            index (int): The offset of the first result of the page.
+
+        Returns:
+            str: The URL of the page.
+        """
+        return self.html_template.format(index=index)
+
+    def api_page_url(self, index: int) -> str:
+        """
+        Get the API URL of the results page starting at ``index``.
+
+        Args:
+            index (int): The offset of the first result of the page.
+
+        Returns:
+            str: The URL of the page.
+        """
+        return self.api_template.format(index=index)
+
+
+def encode_filters(params: SearchParams) -> str:
+    """
+    Encode the optional search filters as a query string fragment.
+
+    Args:
+        params (SearchParams): The search parameters.
+
+    Returns:
+        str: The filters, each prefixed with "&"; empty if none are set.
+    """
+    filters = [
+        ("radius", params.radius),
+        # 0 is a valid bound (e.g. a [0, mid] price shard), keep the prices
+        # and the maximum bedrooms (studios only) as truthy strings
+        ("minPrice", _optional_str(params.min_price)),
+        ("maxPrice", _optional_str(params.max_price)),
+        ("minBedrooms", params.min_bedrooms),
+        (
+            "maxBedrooms",
+            _optional_str(params.max_bedrooms),
+        ),
+        (
+            "propertyTypes",
+            "%2C".join(params.property_type) if params.property_type else None,
+        ),
+        ("maxDaysSinceAdded", params.max_days_since_added),
+        ("includeSSTC", params.include_sstc),
+        (
+            "mustHave",
+            "%2C".join(params.must_have) if params.must_have else None,
+        ),
+        (
+            "dontShow",
+            "%2C".join(params.dont_show) if params.dont_show else None,
+        ),
+    ]
+    return "".join(f"&{name}={value}" for name, value in filters if value)
+
+
+def compile_query_plan(
+    params: SearchParams,
+    location_ident: Tuple[str, str],
+    properties_per_page: int = 499,
+) -> QueryPlan:
+    """
+    Compile validated search parameters into a query plan.
+
+    Args:
+        params (SearchParams): The validated search parameters.
+        location_ident (Tuple[str, str]): The location type and ID.
+        properties_per_page (int): The page size used by the API.
+
+    Returns:
+        QueryPlan: The compiled plan.
+    """
+    buy_or_rent, channel = CHANNELS[params.buy_rent]
+    location_type, location_id = location_ident
+    identifier = f"{location_type}^{location_id}"
+    filters = encode_filters(params)
+    html_template = (
+        f"{BASE_URL}{buy_or_rent}/find.html?"
+        f"searchLocation={params.location}"
+        f"&useLocationIdentifier=true"
+        f"&locationIdentifier={identifier}"
+        f"&sortType=2"
+        f"&numberOfPropertiesPerPage=1000"
+        f"&index=[index]"
+        f"{filters}"
+        f"&furnishTypes=&keywords="
+    ).replace(" ", "%20")
+    api_template = (
+        f"{API_URL}"
+        f"locationIdentifier={identifier}"
+        f"&channel={channel}"
+        f"&sortType=2"
+        f"{filters}"
+        f"&viewType=LIST&areaSizeUnit=sqft&currencyCode=GBP&isFetching=false&viewport="
+        f"&index=[index]"
+        f"&numberOfPropertiesPerPage={properties_per_page}"
+    )
+    return QueryPlan(
+        location=params.location,
+        location_type=location_type,
+        location_id=location_id,
+        buy_or_rent=buy_or_rent,
+        channel=channel,
+        filters=filters,
+        properties_per_page=properties_per_page,
+        html_template=_as_template(html_template),
+        api_template=_as_template(api_template),
+    )
+
+
+def _as_template(url: str) -> str:
+    """
+    Turn a URL with an ``[index]`` marker into a str.format template.
+
+    Braces already in the URL are escaped so only the page index is filled in.
+    """
+    return (
+        url.replace("{", "{{").replace("}", "}}").replace("[index]", "{index}")
+    )
+
+
+def _optional_str(value: Optional[int]) -> Optional[str]:
+    """Turn a number into a string, so 0 is kept by encode_filters."""
+    return None if value is None else str(value)
@@ -12,39 +12,72 @@ and the robots.txt file at: https://www.rightmove.co.uk/robots.txt
 """
 
 import asyncio
+import functools
 import json
-from typing import Any, List
+import logging
+import multiprocessing
+import pathlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+)
 
-import jmespath
-import requests
-from httpx import AsyncClient, Response
-from parsel import Selector
+from httpx import Response
 
-from estatesearch.search.searchConfig import SearchParams
+from estatesearch import metrics
+from estatesearch.search.checkpoint import (
+    Checkpoint,
+    CheckpointState,
+    checkpoint_path,
+)
+from estatesearch.search.engine import SearchEngine, register_engine
+from estatesearch.search.scraper import ScrapeResult, Scraper
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.transport import Transport
 
 from .details import PropertyDetails
+from .locations import LocationCache, resolve_locations
+from .mapping import parse_listing_pages, parse_page_model
+from .pagemodel import extract_page_model
+from .queryplan import QueryPlan, compile_query_plan
+from .seenstate import SeenState
+from .sharding import plan_shards
 
-client = AsyncClient(
-    headers={
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/62.0.3202.94 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Accept-Language": "en-US,en;q=0.9,lt;q=0.8,et;q=0.7,de;q=0.6",
-    },
-    follow_redirects=True,
-    http2=True,  # enable http2 to reduce block chance
-    timeout=200,
-)
+logger = logging.getLogger(__name__)
+
+# The API returns no results for page offsets above this value.
+API_LIMIT = 1247
+
+T = TypeVar("T")
 
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/62.0.3202.94 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "en-US,en;q=0.9,lt;q=0.8,et;q=0.7,de;q=0.6",
+}
 
-class Rightmove:
+
+@register_engine
+class Rightmove(SearchEngine):
     """
     The Rightmove class is used to search for properties
     """
 
+    name = "Rightmove"
+
     def __init__(
         self,
         SearchParams: SearchParams = SearchParams(),
+        crawl_config: CrawlConfig = CrawlConfig(),
+        transport: Optional[Transport] = None,
     ):
         """
         Initialize the Rightmove class with the following parameters:
@@ -70,6 +103,11 @@ class Rightmove:
                                 sharedOwnership, auction).
         :param dont_show: list: The features that the property must not have.
                                 (newHome, retirement, sharedOwnership).
+        :param crawl_config: CrawlConfig: Concurrency and retry settings
+                                for fetching the property pages.
+        :param transport: Transport: The connection pool shared by every
+                                request of the search; one is created from
+                                crawl_config if not given.
         """
 
         self.url = "https://www.rightmove.co.uk/"
@@ -102,6 +140,22 @@ class Rightmove:
         self.limit = SearchParams.limit
         self.verbose = SearchParams.verbose
         self.properties_per_page = 499
+        self.params = SearchParams
+        self._plan: Optional[QueryPlan] = None
+        self.crawl_config = crawl_config
+        self.transport = transport or Transport(crawl_config, HEADERS)
+        self.location_cache = LocationCache(
+            pathlib.Path(crawl_config.cache_dir) / "locations.json",
+            ttl=crawl_config.location_ttl,
+        )
+        self.failed_urls: List[str] = []
+        self.seen_state = SeenState(
+            pathlib.Path(crawl_config.cache_dir) / "seen.json"
+        )
+        # Unchanged listings reused by an incremental crawl, and the API
+        # listing of each URL to fetch
+        self.unchanged: List[PropertyDetails] = []
+        self._listings: Dict[str, dict] = {}
         if location:
             self.location = location
         else:
@@ -120,41 +174,66 @@ class Rightmove:
                 "Options:  'buy' or 'rent'.\n"
                 "Default: 'buy'."
             )
+        SearchParams.validate()
         self.properties_details = None
 
     def get_location_id(self):
         """
         Get the location ID from the
         https://los.rightmove.co.uk/typeahead?query=[location]
-        page.
+        page, or from the location cache if it was resolved before.
 
         :return: str: Type of location ID.
         :return: str: The location ID.
         """
-        location_string = self.location
-        for ch in [" ", ",", ".", "-", "_", "(", ")", "&"]:
-            location_string = location_string.replace(ch, "+")
+        return self.run(self.get_location_id_async())
 
-        search_url = (
-            f"https://los.rightmove.co.uk/typeahead?query={location_string}"
+    async def get_location_id_async(self):
+        """
+        Get the location ID without blocking the event loop.
+
+        :return: str: Type of location ID.
+        :return: str: The location ID.
+        """
+        resolved = await resolve_locations(
+            [self.location],
+            self.transport.client,
+            self.location_cache,
+            self.crawl_config,
         )
-        response = requests.get(search_url)
-        if response.status_code != 200:
-            raise UserWarning(
-                f"Invalid location: {self.location}", response.status_code
+        if self.location not in resolved:
+            raise UserWarning(f"Invalid location: {self.location}")
+        return resolved[self.location]
+
+    @property
+    def plan(self) -> QueryPlan:
+        """
+        The compiled query plan of the search.
+
+        The location is resolved and the query encoded on first access only;
+        every later URL is built from the plan.
+
+        :return: QueryPlan: The query plan.
+        """
+        if self._plan is None:
+            self._plan = compile_query_plan(
+                self.params, self.get_location_id(), self.properties_per_page
             )
+        return self._plan
 
-        data = json.loads(response.text)["matches"]
+    async def get_plan_async(self) -> QueryPlan:
+        """
+        Get the compiled query plan without blocking the event loop.
 
-        # if data is empty, raise user warning, invalid location
-        if not data:
-            raise UserWarning(
-                f"Invalid location: {self.location}", response.status_code
+        :return: QueryPlan: The query plan.
+        """
+        if self._plan is None:
+            self._plan = compile_query_plan(
+                self.params,
+                await self.get_location_id_async(),
+                self.properties_per_page,
             )
-        data = data[0]
-        location_type = data["type"]
-        location_id = data["id"]
-        return location_type, location_id
+        return self._plan
 
     @property
     def search_url(self):
@@ -163,53 +242,16 @@ class Rightmove:
 
         :return: str: The search URL.
         """
-        # TODO: #8 change the way the url is created to improve readability
-        location_ident = self.get_location_id()
-        property_types = (
-            "%2C".join(self.property_types) if self.property_types else None
-        )
-        must_have = "%2C".join(self.must_have) if self.must_have else None
-        dont_show = "%2C".join(self.dont_show) if self.dont_show else None
-        search_url = (
-            f"{self.url}"
-            f"{self.buy_or_rent}/"
-            f"find.html?"
-            f"searchLocation={self.location}"
-            f"&useLocationIdentifier=true"
-            f"&locationIdentifier={location_ident[0]}^{location_ident[1]}"
-            f"&sortType=2"
-            f"&numberOfPropertiesPerPage=1000"
-            f"&index=0"
-        )
-        if self.radius:
-            search_url += f"&radius={self.radius}"
-        if self.min_price:
-            search_url += f"&minPrice={self.min_price}"
-        if self.max_price:
-            search_url += f"&maxPrice={self.max_price}"
-        if self.min_bedrooms:
-            search_url += f"&minBedrooms={self.min_bedrooms}"
-        if self.max_bedrooms:
-            search_url += f"&maxBedrooms={self.max_bedrooms}"
-        if self.property_types:
-            search_url += f"&propertyTypes={property_types}"
-        if self.max_days_since_added:
-            search_url += f"&maxDaysSinceAdded={self.max_days_since_added}"
-        if self.include_sstc:
-            search_url += f"&includeSSTC={self.include_sstc}"
-        if self.must_have:
-            search_url += f"&mustHave={must_have}"
-        if self.dont_show:
-            search_url += f"&dontShow={dont_show}"
-
-        search_url += "&furnishTypes=&keywords="
-        search_url = search_url.replace(" ", "%20")
-        return search_url
+        return self.plan.html_url
 
     def search_properties(self):
         """Requests the search URL and returns the response."""
-        response = requests.get(self.search_url)
-        return response
+        search_url = self.search_url
+
+        async def get() -> Response:
+            return await self.transport.client.get(search_url)
+
+        return self.run(get())
 
     @property
     def search_url_api(self):
@@ -218,99 +260,192 @@ class Rightmove:
 
         :return: str: The search URL.
         """
-        # TODO: #9 change the way the url is created to improve readability
-        location_ident = self.get_location_id()
-        property_types = (
-            "%2C".join(self.property_types) if self.property_types else None
-        )
-        must_have = "%2C".join(self.must_have) if self.must_have else None
-        dont_show = "%2C".join(self.dont_show) if self.dont_show else None
-        search_url = (
-            f"{self.api_url}"
-            f"locationIdentifier={location_ident[0]}^{location_ident[1]}"
-            f"&channel={self.channel}"
-            f"&sortType=2"
-        )
-        if self.radius:
-            search_url += f"&radius={self.radius}"
-        if self.min_price:
-            search_url += f"&minPrice={self.min_price}"
-        if self.max_price:
-            search_url += f"&maxPrice={self.max_price}"
-        if self.min_bedrooms:
-            search_url += f"&minBedrooms={self.min_bedrooms}"
-        if self.max_bedrooms:
-            search_url += f"&maxBedrooms={self.max_bedrooms}"
-        if self.property_types:
-            search_url += f"&propertyTypes={property_types}"
-        if self.max_days_since_added:
-            search_url += f"&maxDaysSinceAdded={self.max_days_since_added}"
-        if self.include_sstc:
-            search_url += f"&includeSSTC={self.include_sstc}"
-        if self.must_have:
-            search_url += f"&mustHave={must_have}"
-        if self.dont_show:
-            search_url += f"&dontShow={dont_show}"
-        search_url += "&viewType=LIST&areaSizeUnit=sqft&currencyCode=GBP&isFetching=false&viewport="
-        return search_url
+        return self.plan.api_url
+
+    def page_indexes(self, total_results: int) -> List[int]:
+        """
+        Get the result offsets of the API pages after the first one.
+
+        The API refuses offsets above API_LIMIT, so those pages are skipped.
+
+        :param total_results: int: The resultCount of the first page.
+        :return: list: The offsets of the remaining pages.
+        """
+        return [
+            index
+            for index in range(
+                self.properties_per_page,
+                total_results,
+                self.properties_per_page,
+            )
+            if index <= API_LIMIT
+        ]
 
     def search_properties_api(self) -> List[dict[str, Any]]:
         """
         Search for properties using the API.
 
         :return: list: The properties."""
+        return self.run(self.search_properties_api_async())
 
-        url = f"{self.search_url_api}&index=0&numberOfPropertiesPerPage={self.properties_per_page}"
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"No properties found for the search: {self.search_url_api}")
-            return []
-        total_results = int(
-            json.loads(response.text)["resultCount"].replace(",", "")
+    async def search_properties_api_async(self) -> List[dict[str, Any]]:
+        """
+        Search for properties using the API, fetching the pages concurrently.
+
+        Searches with more results than the API returns are split into
+        shards that each fit (see ``sharding``), all sharing the location of
+        the plan. The first page of a shard gives its number of results,
+        after which every remaining page offset is known, so the pages of
+        all the shards are fetched together through the scraper. Both the
+        shard probes and the pages keep to ``max_concurrency``.
+
+        :return: list: The properties, in shard and page order, without
+                                duplicates."""
+
+        plan = await self.get_plan_async()
+        # plan_shards probes sibling shards concurrently, at every level;
+        # the slots of the transport keep the probes to max_concurrency
+        scraper = Scraper(
+            self.transport.client, self.crawl_config, self.transport.slots
         )
-        properties = json.loads(response.text)["properties"]
+        location_ident = (plan.location_type, plan.location_id)
 
-        if total_results > self.properties_per_page:
-            API_LIMIT = 1247
-            for i in range(
-                self.properties_per_page,
-                total_results,
-                self.properties_per_page,
-            ):
-
-                lower_limit = i
-                upper_limit = self.properties_per_page
-                if i > API_LIMIT:
-                    break
-                url = f"{self.search_url_api}&index={lower_limit}&numberOfPropertiesPerPage={upper_limit}"
-                response = requests.get(url)
-                properties += json.loads(response.text)["properties"]
+        def shard_plan(params: SearchParams) -> QueryPlan:
+            if params is self.params:
+                return plan
+            return compile_query_plan(
+                params, location_ident, self.properties_per_page
+            )
+
+        async def first_page(params: SearchParams) -> Optional[dict]:
+            page = await scraper.fetch(shard_plan(params).api_page_url(0))
+            if not page.ok:
+                logger.warning(f"Failed to fetch {page.url}: {page.error}")
+                return None
+            return page.response.json()
+
+        shards = await plan_shards(self.params, first_page, API_LIMIT)
+        if not shards:
+            print(f"No properties found for the search: {plan.api_url}")
+            return []
+        if len(shards) > 1:
+            logger.info(f"Search split in {len(shards)} shards.")
+
+        shard_urls = [
+            [
+                shard_plan(shard.params).api_page_url(index)
+                for index in self.page_indexes(shard.total)
+            ]
+            for shard in shards
+        ]
+        pages = {
+            page.url: page
+            async for page in scraper.scrape(
+                url for urls in shard_urls for url in urls
+            )
+        }
+        results = []
+        for shard, urls in zip(shards, shard_urls):
+            results.append(shard.first_page["properties"])
+            for page in (pages[url] for url in urls):
+                if not page.ok:
+                    logger.warning(f"Failed to fetch {page.url}: {page.error}")
+                    continue
+                results.append(page.response.json()["properties"])
+
+        # Shards do not overlap, but a listing can move between shards
+        # (e.g. a price change) while they are fetched
+        properties = list(
+            {
+                property_data["id"]: property_data
+                for page_properties in results
+                for property_data in page_properties
+            }.values()
+        )
+        total_results = sum(shard.total for shard in shards)
         if total_results > len(properties):
             print(
                 f"\nWarning: {total_results} total results but it was only possible to get {len(properties)} results."
             )
         return properties
 
+    @staticmethod
+    def listing_url(property_data: dict[str, Any]) -> str:
+        """
+        Get the listing page URL of a property returned by the API.
+
+        :param property_data: dict: The property returned by the API.
+        :return: str: The URL of the listing page.
+        """
+        return f"https://www.rightmove.co.uk{property_data['propertyUrl']}"
+
+    @staticmethod
+    def urls_from_search(data: List[dict[str, Any]]) -> List[str]:
+        """
+        Get the unique property URLs from the API search results.
+
+        :param data: list: The properties returned by the API.
+        :return: list: The URLs for the properties.
+        """
+        return list(
+            {Rightmove.listing_url(property_data) for property_data in data}
+        )
+
+    def select_changed(
+        self, data: List[dict[str, Any]], urls: List[str]
+    ) -> List[str]:
+        """
+        Split the listings to crawl into new or changed and unchanged ones.
+
+        Unchanged listings, whose update marker and price match the
+        seen-state, are kept in ``self.unchanged`` with their stored details.
+
+        :param data: list: The properties returned by the API.
+        :param urls: list: The URLs of the listing pages to crawl.
+        :return: list: The URLs of the new or changed listings.
+        """
+        wanted = set(urls)
+        self.unchanged = []
+        self._listings = {}
+        changed = []
+        for property_data in data:
+            url = self.listing_url(property_data)
+            if url not in wanted or url in self._listings:
+                continue
+            self._listings[url] = property_data
+            property_details = self.seen_state.unchanged(property_data)
+            if property_details is None:
+                changed.append(url)
+            else:
+                self.unchanged.append(property_details)
+        logger.info(
+            f"Incremental crawl: {len(changed)} new or changed listings, "
+            f"{len(self.unchanged)} unchanged."
+        )
+        return changed
+
     def get_urls_for_properties_in_search(self) -> List[str]:
         """
         Get the URLs for the properties in the search.
 
         :return: list: The URLs for the properties.
         """
-        data = self.search_properties_api()
-        urls: List[str] = []
-        for property_data in data:
-            urls.append(
-                f"https://www.rightmove.co.uk{property_data['propertyUrl']}"
-            )
-        urls = list(set(urls))
-        return urls
+        return self.urls_from_search(self.search_properties_api())
 
     @staticmethod
-    def parse_property(data):
-        """Parse data to only necessary fields."""
-        # TODO: #10 Parse the data to match the PropertyDetails class using jmespath
-        return data
+    def parse_property(data: dict, url: str = "") -> PropertyDetails:
+        """
+        Parse a PAGE_MODEL to only necessary fields.
+
+        :param data: dict: The PAGE_MODEL of a listing page, as returned by
+                    extract_property, or only its propertyData, in which
+                    case the analytics fields (postcode, added...) are None.
+        :param url: str: The URL of the listing page.
+        :return: PropertyDetails: The property details.
+        """
+        if data and "propertyData" not in data:
+            data = {"propertyData": data}
+        return parse_page_model(data, url)
 
     @staticmethod
     def find_json_objects(text: str, decoder=json.JSONDecoder()):
@@ -321,47 +456,361 @@ class Rightmove:
             if match == -1:
                 break
             try:
-                result, index = decoder.raw_decode(text[match:])
+                # Decode in place: slicing text[match:] copies the rest of
+                # the text at every "{" tried
+                result, pos = decoder.raw_decode(text, match)
                 yield result
-                pos = match + index
             except ValueError:
                 pos = match + 1
 
     @staticmethod
     def extract_property(response: Response) -> dict:
-        """Extract property data from rightmove PAGE_MODEL javascript variable."""
-        selector = Selector(response.text)
-        data = selector.xpath(
-            "//script[contains(.,'PAGE_MODEL = ')]/text()"
-        ).get()
-        if not data:
+        """
+        Extract the rightmove PAGE_MODEL javascript variable of a listing page.
+
+        :param response: Response: The listing page.
+        :return: dict: The PAGE_MODEL, ready for parse_property; empty if
+                    the page is not a property listing page.
+        """
+        page_model = extract_page_model(response.text)
+        if not page_model:
             print(f"page {response.url} is not a property listing page")
             return {}
-        json_data = list(Rightmove.find_json_objects(data))[0]
-        return json_data["propertyData"]
+        return page_model
 
-    async def scrape_properties(self, urls: List[str]) -> List[dict]:
-        """Scrape Rightmove property listings for property data"""
-        to_scrape = [client.get(url) for url in urls]
-        properties = []
-        for response in asyncio.as_completed(to_scrape):
-            response = await response
-            properties.append(
-                Rightmove.parse_property(Rightmove.extract_property(response))
+    async def discover(self) -> List[str]:
+        """
+        Find the listing pages matching the search.
+
+        :return: list: The URLs of the listing pages.
+        """
+        with metrics.STAGE_SECONDS.time(stage="search"):
+            return await self.get_property_urls_async()
+
+    async def fetch(self, urls: List[str]) -> AsyncIterator[ScrapeResult]:
+        """
+        Download listing pages with bounded concurrency and retries.
+
+        URLs that still fail after the retries are logged and kept in
+        ``self.failed_urls`` instead of failing the run.
+
+        :param urls: list: The URLs of the listing pages.
+        :return: ScrapeResult: One result per URL, in completion order.
+        """
+        scraper = Scraper(
+            self.transport.client, self.crawl_config, self.transport.slots
+        )
+        self.failed_urls = []
+        async for result in scraper.scrape(urls):
+            if not result.ok:
+                logger.warning(
+                    f"Failed to fetch {result.url} after "
+                    f"{result.attempts} attempts: {result.error}"
+                )
+                self.failed_urls.append(result.url)
+            yield result
+
+    def parse(self, result: ScrapeResult) -> Optional[PropertyDetails]:
+        """
+        Parse a downloaded listing page.
+
+        :param result: ScrapeResult: The successful fetch of a listing page.
+        :return: PropertyDetails: The property details, None if the page is
+                                not a property listing page.
+        """
+        with metrics.PARSE_SECONDS.time(engine=self.name):
+            page_model = extract_page_model(result.response.text)
+            if not page_model:
+                print(f"page {result.url} is not a property listing page")
+                return None
+            return Rightmove.parse_property(page_model, result.url)
+
+    async def parse_on_loop(
+        self, results: AsyncIterator[ScrapeResult]
+    ) -> AsyncIterator[PropertyDetails]:
+        """
+        Parse downloaded listing pages one by one on the event loop.
+
+        :param results: async iterator: The fetched listing pages.
+        :return: PropertyDetails: The property details.
+        """
+        async for result in results:
+            if not result.ok:
+                continue
+            property_details = self.parse(result)
+            if property_details is not None:
+                yield property_details
+
+    async def parse_in_pool(
+        self, results: AsyncIterator[ScrapeResult]
+    ) -> AsyncIterator[PropertyDetails]:
+        """
+        Parse downloaded listing pages in a pool of worker processes.
+
+        Pages are sent in batches of ``parse_batch_size``, so fetching goes
+        on while earlier batches are parsed on the other cores. At most two
+        batches per worker are in flight, which bounds the pages held in
+        memory.
+
+        :param results: async iterator: The fetched listing pages.
+        :return: PropertyDetails: The property details, in completion order.
+        """
+        loop = asyncio.get_running_loop()
+        workers = self.crawl_config.parse_workers
+        batch_size = max(self.crawl_config.parse_batch_size, 1)
+        batch: List[tuple] = []
+        # The pages of each batch being parsed
+        in_flight: Dict[asyncio.Future, List[tuple]] = {}
+
+        def collect(done: set) -> List[PropertyDetails]:
+            properties = []
+            for future in done:
+                pages = in_flight.pop(future)
+                for (url, _), property_details in zip(pages, future.result()):
+                    if property_details is None:
+                        print(f"page {url} is not a property listing page")
+                    else:
+                        properties.append(property_details)
+            metrics.QUEUE_DEPTH.set(len(in_flight), queue="parse")
+            return properties
+
+        # Spawned workers do not inherit the event loop or the HTTP client
+        pool = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            async for result in results:
+                if result.ok:
+                    batch.append((result.url, result.response.text))
+                if len(batch) >= batch_size:
+                    future = loop.run_in_executor(
+                        pool, parse_listing_pages, batch
+                    )
+                    in_flight[future] = batch
+                    batch = []
+                metrics.QUEUE_DEPTH.set(len(in_flight), queue="parse")
+                if len(in_flight) >= 2 * workers:
+                    done, _ = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    done = {future for future in in_flight if future.done()}
+                for property_details in collect(done):
+                    yield property_details
+            if batch:
+                future = loop.run_in_executor(pool, parse_listing_pages, batch)
+                in_flight[future] = batch
+            while in_flight:
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for property_details in collect(done):
+                    yield property_details
+        finally:
+            # On an early close or a cancellation, drop the queued batches
+            # and wait for the running ones off the event loop
+            await loop.run_in_executor(
+                None, functools.partial(pool.shutdown, cancel_futures=True)
             )
-        return properties
 
-    def get_properties_details(self) -> List[dict]:
+    async def iter_properties(
+        self, urls: List[str]
+    ) -> AsyncIterator[PropertyDetails]:
         """
-        Get the property details for the properties in the search.
+        Scrape Rightmove property listings, yielding each as it is parsed.
+
+        In an incremental crawl the unchanged listings come first, then the
+        fetched ones, which are recorded in the seen-state for the next run.
+
+        :param urls: list: The URLs of the listing pages.
+        :return: PropertyDetails: The property details, in completion order.
+        """
+        for property_details in self.unchanged:
+            yield property_details
+        if self.crawl_config.parse_workers > 0:
+            parsed = self.parse_in_pool(self.fetch(urls))
+        else:
+            parsed = self.parse_on_loop(self.fetch(urls))
+        # Only the fetch and parse work, not the time the consumer takes
+        timed = metrics.time_iteration(
+            parsed, metrics.STAGE_SECONDS, stage="scrape"
+        )
+        try:
+            async for property_details in timed:
+                property_data = self._listings.get(property_details.url)
+                if property_data is not None:
+                    self.seen_state.record(property_data, property_details)
+                yield property_details
+        finally:
+            await timed.aclose()
+            self.seen_state.save()
+
+    async def stream_properties(
+        self, resume: bool = False
+    ) -> AsyncIterator[PropertyDetails]:
+        """
+        Search for properties and yield their details as they are parsed.
+
+        Progress is recorded in a checkpoint file as properties are parsed.
+        The checkpoint is deleted once every URL has been fetched, and kept
+        if the crawl stops early or some URLs failed, so that a run with
+        ``resume`` can pick up from it.
+
+        :param resume: bool: Continue from the checkpoint of an interrupted
+                                run instead of searching again.
+        :return: PropertyDetails: The property details.
+        """
+        checkpoint = Checkpoint(
+            checkpoint_path(self.crawl_config.cache_dir, self.name, self.params)
+        )
+        state = checkpoint.load() if resume else None
+        if state is None:
+            if resume:
+                logger.info("No checkpoint to resume from, starting afresh.")
+            urls = await self.discover()
+            checkpoint.start(urls)
+            state = CheckpointState(urls, {})
+        else:
+            logger.info(
+                f"Resuming from {checkpoint.path}: {len(state.done)} done, "
+                f"{len(state.pending)} pending."
+            )
+            self.unchanged = []
+            checkpoint.resume()
+        try:
+            for details in state.done.values():
+                yield PropertyDetails(**details)
+            async for property_details in self.iter_properties(state.pending):
+                checkpoint.record(
+                    property_details.url, property_details._asdict()
+                )
+                yield property_details
+        finally:
+            checkpoint.close()
+        if self.transport.http_cache is not None:
+            logger.info(f"HTTP cache: {self.transport.http_cache.stats()}")
+        if self.failed_urls:
+            logger.warning(
+                f"{len(self.failed_urls)} URLs failed, resume to retry them."
+            )
+        else:
+            checkpoint.finish()
+
+    async def scrape_properties(
+        self,
+        urls: List[str],
+        on_property: Optional[Callable[[PropertyDetails], None]] = None,
+    ) -> List[PropertyDetails]:
+        """
+        Scrape Rightmove property listings for property data.
 
+        :param urls: list: The URLs of the listing pages.
+        :param on_property: callable: Called with each property as soon as
+                                it is parsed, e.g. to write it to disk.
         :return: list: The property details.
         """
-        urls = self.get_urls_for_properties_in_search()
+        properties = []
+        async for property_details in self.iter_properties(urls):
+            if on_property is not None:
+                on_property(property_details)
+            properties.append(property_details)
+        return properties
+
+    async def get_property_urls_async(self) -> List[str]:
+        """
+        Search for properties and get the URLs of their listing pages.
+
+        In incremental mode only the new or changed listings are returned;
+        see ``select_changed``.
+
+        :return: list: The URLs, cut to the search limit if one is set.
+        """
+        data = await self.search_properties_api_async()
+        urls = self.urls_from_search(data)
         if self.limit:
             urls = urls[: self.limit]
         if not urls:
-            print(f"No properties found for the search: {self.search_url_api}")
+            print(f"No properties found for the search: {self.plan.api_url}")
+        self.unchanged = []
+        self._listings = {}
+        if self.crawl_config.incremental:
+            urls = self.select_changed(data, urls)
+        return urls
+
+    async def get_properties_details_async(
+        self,
+        on_property: Optional[Callable[[PropertyDetails], None]] = None,
+        resume: bool = False,
+    ) -> List[dict]:
+        """
+        Search for properties and scrape their details on one event loop.
+
+        :param on_property: callable: Called with each property as soon as
+                                it is parsed.
+        :param resume: bool: Continue from the checkpoint of an interrupted
+                                run; see ``stream_properties``.
+        :return: list: The property details.
+        """
+        properties = []
+        async for property_details in self.stream_properties(resume):
+            if on_property is not None:
+                on_property(property_details)
+            properties.append(property_details._asdict())
+        return properties
+
+    def get_properties_details(
+        self,
+        on_property: Optional[Callable[[PropertyDetails], None]] = None,
+        resume: bool = False,
+    ) -> List[dict]:
+        """
+        Get the property details for the properties in the search.
+
+        :param on_property: callable: Called with each property as soon as
+                                it is parsed.
+        :param resume: bool: Continue from the checkpoint of an interrupted
+                                run instead of starting again.
+        :return: list: The property details.
+        """
+        return self.run(self.get_properties_details_async(on_property, resume))
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """
+        Run a coroutine on a new event loop from synchronous code.
+
+        The connection pool is opened for the run and closed at its end.
+        Called from a running event loop (a Jupyter notebook, async code),
+        where ``asyncio.run`` cannot nest, the new loop runs on a helper
+        thread and the caller blocks until it is done, as it did with a
+        blocking HTTP client. Async code should await the ``*_async``
+        methods instead.
+
+        :param coroutine: coroutine: The work to run.
+        :return: The result of the coroutine.
+        """
+
+        async def main() -> T:
+            try:
+                return await coroutine
+            finally:
+                await self.transport.aclose()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(main())
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, main()).result()
+
+    def share(self, other: "Rightmove") -> None:
+        """
+        Use the connection pool and location cache of another search.
+
+        :param other: Rightmove: The search to share with.
+        """
+        self.transport = other.transport
+        self.location_cache = other.location_cache
 
-        data = asyncio.run(self.scrape_properties(urls))
-        return data
+    async def aclose(self) -> None:
+        """Close the connection pool of the search."""
+        await self.transport.aclose()
@@ -0,0 +1,123 @@
+"""Seen-state of Rightmove listings for incremental crawls.
+
+Every listing in the search API payload carries its id, its price and a
+``listingUpdate`` marker that changes when the listing is edited, reduced
+or relisted. Keeping those, together with the details parsed last time,
+lets a repeat crawl fetch only the listing pages that are new or changed
+and reuse the stored details for the rest.
+"""
+
+import logging
+import pathlib
+import time
+from typing import Any, Dict, Optional, Union
+
+from .details import PropertyDetails
+from .locations import _read_json, _write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def listing_marker(listing: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the fields of an API listing that change when the listing does.
+
+    Args:
+        listing (dict): A property of the search API payload.
+
+    Returns:
+        dict: The last update date and reason and the price amount.
+    """
+    update = listing.get("listingUpdate") or {}
+    return {
+        "updated": update.get("listingUpdateDate"),
+        "reason": update.get("listingUpdateReason"),
+        "price": (listing.get("price") or {}).get("amount"),
+    }
+
+
+class SeenState:
+    """
+    On-disk record of the listings seen by previous crawls, keyed on id.
+
+    Each entry holds the listing marker and the parsed details. Entries not
+    seen for ``ttl`` seconds, such as let or sold listings, are dropped when
+    the state is saved. The file is loaded on first use and written back
+    with ``save``.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path] = "cache/seen.json",
+        ttl: float = 90 * 24 * 3600,
+    ) -> None:
+        """
+        Initialize the seen-state.
+
+        Args:
+            path (Union[str, Path]): The JSON file backing the state.
+            ttl (float): How long an unseen listing is kept, in seconds.
+        """
+        self.path = pathlib.Path(path)
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, dict]] = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        """The stored entries, loaded from disk on first access."""
+        if self._entries is None:
+            self._entries = _read_json(self.path)
+        return self._entries
+
+    def unchanged(self, listing: Dict[str, Any]) -> Optional[PropertyDetails]:
+        """
+        Get the stored details of a listing if it has not changed.
+
+        Args:
+            listing (dict): A property of the search API payload.
+
+        Returns:
+            Optional[PropertyDetails]: The details parsed by a previous
+            crawl, None if the listing is new or changed.
+        """
+        entry = self.entries.get(str(listing.get("id")))
+        if entry is None or entry["marker"] != listing_marker(listing):
+            return None
+        try:
+            details = PropertyDetails(**entry["details"])
+        except TypeError:
+            # Stored by a version with different fields, fetch it again
+            return None
+        entry["seen"] = time.time()
+        self._dirty = True
+        return details
+
+    def record(self, listing: Dict[str, Any], details: PropertyDetails) -> None:
+        """
+        Store the marker and the freshly parsed details of a listing.
+
+        Args:
+            listing (dict): A property of the search API payload.
+            details (PropertyDetails): The details parsed from its page.
+        """
+        self.entries[str(listing.get("id"))] = {
+            "marker": listing_marker(listing),
+            "details": details._asdict(),
+            "seen": time.time(),
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """Drop expired entries and write the state if it changed."""
+        if not self._dirty:
+            return
+        now = time.time()
+        for key in [
+            key
+            for key, entry in self.entries.items()
+            if now - entry["seen"] > self.ttl
+        ]:
+            del self.entries[key]
+        _write_json_atomic(self.path, self.entries)
+        self._dirty = False
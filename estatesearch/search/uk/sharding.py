@@ -0,0 +1,155 @@
+"""Shard planner for Rightmove searches above the API result ceiling.
+
+The search API stops paging at API_LIMIT, so a search matching more
+listings than that silently loses the rest. The planner splits such a
+search into non-overlapping sub-searches, recursively, until each one
+fits under the limit. Splits are tried in this order:
+
+1. price band, halving the band (or doubling an open upper bound);
+2. bedrooms, halving the range;
+3. property type, halving the list of types.
+
+Price and bedroom bounds are inclusive, so the halves are ``[low, mid]``
+and ``[mid + 1, high]``. Listings without a price ("POA") or without the
+filtered attribute may be missed by a filtered shard; that is the price of
+getting past the ceiling.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from estatesearch.search.searchConfig import PROPERTY_TYPES, SearchParams
+
+logger = logging.getLogger(__name__)
+
+# First split point of a price band with no upper bound, by channel
+PRICE_PIVOTS = {"buy": 500_000, "rent": 2_000}
+
+# Highest bedroom filter accepted by Rightmove ("5+")
+MAX_BEDROOMS = 5
+
+
+class Shard(NamedTuple):
+    """
+    A sub-search that fits under the API limit.
+
+    Attributes:
+        params (SearchParams): The search parameters of the shard.
+        total (int): The number of results of the shard.
+        first_page (dict): The first API page of the shard.
+    """
+
+    params: SearchParams
+    total: int
+    first_page: Dict[str, Any]
+
+
+def split_price(params: SearchParams) -> Optional[List[SearchParams]]:
+    """Split the price band of a search in two, None if it is one price."""
+    low = params.min_price or 0
+    high = params.max_price
+    if high is None:
+        mid = max(2 * low, PRICE_PIVOTS.get(params.buy_rent, 500_000))
+    elif high > low:
+        mid = (low + high) // 2
+    else:
+        return None
+    return [
+        params._replace(min_price=low or None, max_price=mid),
+        params._replace(min_price=mid + 1, max_price=high),
+    ]
+
+
+def split_bedrooms(params: SearchParams) -> Optional[List[SearchParams]]:
+    """Split the bedroom range of a search in two, None if it is one value."""
+    low = params.min_bedrooms or 0
+    high = params.max_bedrooms
+    top = MAX_BEDROOMS if high is None else high
+    if top <= low:
+        return None
+    mid = (low + top) // 2
+    return [
+        params._replace(min_bedrooms=low, max_bedrooms=mid),
+        params._replace(min_bedrooms=mid + 1, max_bedrooms=high),
+    ]
+
+
+def split_property_types(
+    params: SearchParams,
+) -> Optional[List[SearchParams]]:
+    """Split the property types of a search in two, None if there is one."""
+    types = sorted(params.property_type or PROPERTY_TYPES)
+    if len(types) < 2:
+        return None
+    mid = len(types) // 2
+    return [
+        params._replace(property_type=types[:mid]),
+        params._replace(property_type=types[mid:]),
+    ]
+
+
+SPLITTERS = (split_price, split_bedrooms, split_property_types)
+
+
+def split_params(params: SearchParams) -> Optional[List[SearchParams]]:
+    """
+    Split a search into non-overlapping sub-searches.
+
+    Args:
+        params (SearchParams): The search parameters.
+
+    Returns:
+        Optional[List[SearchParams]]: The sub-searches, from the first
+        splitter that can split the search; None if none can.
+    """
+    for splitter in SPLITTERS:
+        shards = splitter(params)
+        if shards is not None:
+            return shards
+    return None
+
+
+async def plan_shards(
+    params: SearchParams,
+    first_page: Callable[[SearchParams], Awaitable[Optional[Dict[str, Any]]]],
+    limit: int,
+    max_depth: int = 16,
+) -> List[Shard]:
+    """
+    Split a search until every shard has at most ``limit`` results.
+
+    The first page of every candidate shard is requested to count its
+    results; sibling shards are counted concurrently and the first pages of
+    the final shards are kept so they are not requested twice.
+
+    Args:
+        params (SearchParams): The search parameters.
+        first_page (Callable): Coroutine function fetching the first API
+            page of a search, None if it failed.
+        limit (int): The maximum number of results of a shard.
+        max_depth (int): The maximum number of successive splits.
+
+    Returns:
+        List[Shard]: The shards, with their first page.
+    """
+    page = await first_page(params)
+    if page is None:
+        return []
+    total = int(str(page["resultCount"]).replace(",", ""))
+    if total <= limit:
+        return [Shard(params, total, page)]
+    children = split_params(params) if max_depth > 0 else None
+    if children is None:
+        logger.warning(
+            f"{total} results cannot be split under {limit}: {params}"
+        )
+        return [Shard(params, total, page)]
+    logger.info(f"Splitting a search with {total} results in {len(children)}.")
+    nested = await asyncio.gather(
+        *(
+            plan_shards(child, first_page, limit, max_depth - 1)
+            for child in children
+        )
+    )
+    return [shard for shards in nested for shard in shards]
@@ -0,0 +1,199 @@
+"""Multi-process crawl coordinator for the estate search application.
+
+A single event loop parses every listing on one core. The coordinator
+runs discovery once, puts the listing URLs in a durable WorkQueue and
+starts worker processes that each lease a batch of URLs, fetch and parse
+them on their own event loop and acknowledge the results. Leases expire
+after ``CrawlConfig.lease_timeout``, so the work of a crashed worker is
+picked up by the others. Each worker limits its own requests, so the
+per-host rate limit is split between them.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import pathlib
+from typing import List, Optional, Type, Union
+
+from estatesearch.search.engine import SearchEngine, get_engine
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.workqueue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+# Leases of a URL that failed without a response. The Scraper already
+# retried it, another lease gives a second chance, maybe on another worker
+LEASE_ATTEMPTS = 2
+
+
+def crawl_distributed(
+    params: SearchParams,
+    engine: Union[str, Type[SearchEngine]] = "Rightmove",
+    workers: Optional[int] = None,
+    crawl_config: CrawlConfig = CrawlConfig(),
+    queue_path: Optional[Union[str, pathlib.Path]] = None,
+) -> List[dict]:
+    """
+    Crawl a search with several worker processes.
+
+    Args:
+        params (SearchParams): The search parameters.
+        engine (Union[str, Type[SearchEngine]]): The search engine, or its
+            registered name.
+        workers (int): The number of worker processes, one per CPU if None.
+        crawl_config (CrawlConfig): The crawl settings of every worker.
+            The incremental mode is not supported and is turned off.
+        queue_path (Union[str, Path]): The queue database, in the cache
+            directory if None.
+
+    Returns:
+        List[dict]: The property details, in discovery order.
+    """
+    engine_cls = get_engine(engine) if isinstance(engine, str) else engine
+    workers = workers or os.cpu_count() or 1
+    if crawl_config.incremental:
+        # The unchanged listings are not queued and the workers do not
+        # record what they parse, so they would be lost
+        logger.warning("Incremental mode is not supported by the workers.")
+        crawl_config = crawl_config._replace(incremental=False)
+    if queue_path is None:
+        queue_path = (
+            pathlib.Path(crawl_config.cache_dir) / f"queue-{engine_cls.name}.db"
+        )
+
+    urls = asyncio.run(_discover(engine_cls(params, crawl_config)))
+    with WorkQueue(queue_path) as queue:
+        queue.clear()
+        queue.put(urls)
+    logger.info(f"Queued {len(urls)} URLs for {workers} workers.")
+
+    # Spawned workers start with a fresh interpreter, HTTP client and loop
+    context = multiprocessing.get_context("spawn")
+    worker_config = split_rate_limit(crawl_config, workers)
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(engine_cls, params, worker_config, str(queue_path), f"w{i}"),
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with WorkQueue(queue_path) as queue:
+        counts = queue.counts()
+        if queue.unfinished():
+            # Every worker died; finish the leftovers here
+            run_worker(engine_cls, params, crawl_config, queue_path, "main")
+            counts = queue.counts()
+        logger.info(f"Crawl finished: {counts}")
+        for url in queue.failed_urls():
+            logger.warning(f"Failed to crawl {url}.")
+        return list(queue.results())
+
+
+def split_rate_limit(crawl_config: CrawlConfig, workers: int) -> CrawlConfig:
+    """
+    Share the per-host rate limit between worker processes.
+
+    The rate limiters of a process are not seen by the others, so each
+    worker gets its share of the starting rate and of the bounds, and
+    together they keep to the budget of a single process.
+
+    Args:
+        crawl_config (CrawlConfig): The crawl settings of the crawl.
+        workers (int): The number of worker processes.
+
+    Returns:
+        CrawlConfig: The crawl settings of each worker.
+    """
+    if workers <= 1 or crawl_config.rate_limit <= 0:
+        return crawl_config
+    return crawl_config._replace(
+        rate_limit=crawl_config.rate_limit / workers,
+        rate_limit_min=crawl_config.rate_limit_min / workers,
+        rate_limit_max=crawl_config.rate_limit_max / workers,
+    )
+
+
+def run_worker(
+    engine_cls: Type[SearchEngine],
+    params: SearchParams,
+    crawl_config: CrawlConfig,
+    queue_path: Union[str, pathlib.Path],
+    worker: str,
+) -> None:
+    """
+    Work through the queue until no item is pending or leased.
+
+    Runs in a worker process; arguments are pickled, so the engine is
+    passed as a class.
+
+    Args:
+        engine_cls (Type[SearchEngine]): The search engine class.
+        params (SearchParams): The search parameters.
+        crawl_config (CrawlConfig): The crawl settings.
+        queue_path (Union[str, Path]): The queue database.
+        worker (str): The name of the worker, recorded on its leases.
+    """
+    engine_instance = engine_cls(params, crawl_config)
+    with WorkQueue(queue_path) as queue:
+        asyncio.run(_work(engine_instance, queue, crawl_config, worker))
+
+
+async def _discover(engine_instance: SearchEngine) -> List[str]:
+    """Find the listing pages, then close the engine's connections."""
+    try:
+        return await engine_instance.discover()
+    finally:
+        await engine_instance.aclose()
+
+
+async def _work(
+    engine_instance: SearchEngine,
+    queue: WorkQueue,
+    crawl_config: CrawlConfig,
+    worker: str,
+) -> None:
+    """Lease, fetch, parse and acknowledge batches of URLs."""
+    batch_size = max(crawl_config.max_concurrency, 1)
+    try:
+        while True:
+            urls = queue.lease(batch_size, worker, crawl_config.lease_timeout)
+            if not urls:
+                if not queue.unfinished():
+                    return
+                # Other workers hold the remaining leases; wait in case one of
+                # them crashes and its lease expires
+                await asyncio.sleep(min(crawl_config.lease_timeout / 10, 1.0))
+                continue
+            async for result in engine_instance.fetch(urls):
+                if not result.ok:
+                    # An HTTP error status survived the Scraper's retries and
+                    # would again; only transport errors get another lease
+                    queue.fail(
+                        result.url,
+                        str(result.error),
+                        1 if result.status is not None else LEASE_ATTEMPTS,
+                    )
+                    continue
+                try:
+                    property_details = engine_instance.parse(result)
+                except Exception as exc:
+                    # The same page would fail the same way
+                    logger.exception(f"Failed to parse {result.url}")
+                    queue.fail(result.url, repr(exc), 1)
+                    continue
+                queue.ack(
+                    result.url,
+                    (
+                        None
+                        if property_details is None
+                        else property_details._asdict()
+                    ),
+                )
+    finally:
+        await engine_instance.aclose()
@@ -0,0 +1,177 @@
+"""Durable SQLite work queue shared by crawl worker processes.
+
+Each item is a listing URL that moves through these states:
+
+    pending --lease--> leased --ack--> done
+                         |
+                         +--fail--> pending (retry) or failed
+
+A lease is only valid for a visibility timeout: if the worker holding it
+crashes, the item becomes leasable again once the timeout has passed, so no
+work is lost. Leases are taken with a single UPDATE statement, which SQLite
+runs atomically across processes.
+"""
+
+import json
+import logging
+import pathlib
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue:
+    """
+    Queue of URLs to crawl, stored in a SQLite database in WAL mode.
+
+    Every process opens its own WorkQueue on the same file.
+    """
+
+    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+        """
+        Open the queue, creating it if needed.
+
+        Args:
+            path (Union[str, Path]): The database file.
+        """
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(
+            self.path, timeout=60, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "url TEXT PRIMARY KEY, status TEXT NOT NULL DEFAULT 'pending', "
+            "worker TEXT, lease_until REAL, attempts INTEGER DEFAULT 0, "
+            "error TEXT, result TEXT)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS items_status ON items (status)"
+        )
+
+    def put(self, urls: Iterable[str]) -> None:
+        """
+        Add URLs to the queue, ignoring those already queued.
+
+        Args:
+            urls (Iterable[str]): The URLs to crawl.
+        """
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO items (url) VALUES (?)",
+                ((url,) for url in urls),
+            )
+
+    def lease(
+        self, n: int, worker: str, visibility_timeout: float
+    ) -> List[str]:
+        """
+        Lease up to ``n`` items that are pending or whose lease expired.
+
+        Args:
+            n (int): The maximum number of items.
+            worker (str): The name of the leasing worker.
+            visibility_timeout (float): How long the lease lasts, in seconds.
+
+        Returns:
+            List[str]: The leased URLs.
+        """
+        now = time.time()
+        rows = self.connection.execute(
+            "UPDATE items SET status = 'leased', worker = ?, "
+            "lease_until = ?, attempts = attempts + 1 "
+            "WHERE url IN (SELECT url FROM items WHERE status = 'pending' "
+            "OR (status = 'leased' AND lease_until < ?) LIMIT ?) "
+            "RETURNING url",
+            (worker, now + visibility_timeout, now, n),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def ack(self, url: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark an item as done.
+
+        Args:
+            url (str): The URL of the item.
+            result (dict): The parsed details, None if the page had none.
+        """
+        self.connection.execute(
+            "UPDATE items SET status = 'done', lease_until = NULL, "
+            "result = ? WHERE url = ?",
+            (None if result is None else json.dumps(result), url),
+        )
+
+    def fail(self, url: str, error: str, max_attempts: int) -> None:
+        """
+        Release an item after a failure.
+
+        The item goes back to pending until it has been leased
+        ``max_attempts`` times, after which it is marked as failed.
+
+        Args:
+            url (str): The URL of the item.
+            error (str): The description of the failure.
+            max_attempts (int): The number of leases before giving up.
+        """
+        self.connection.execute(
+            "UPDATE items SET status = CASE WHEN attempts >= ? "
+            "THEN 'failed' ELSE 'pending' END, lease_until = NULL, "
+            "error = ? WHERE url = ?",
+            (max_attempts, error, url),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of items in each state."""
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        for status, count in self.connection.execute(
+            "SELECT status, COUNT(*) FROM items GROUP BY status"
+        ):
+            counts[status] = count
+        return counts
+
+    def unfinished(self) -> int:
+        """Get the number of items that are pending or leased."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM items "
+            "WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def results(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the results of the done items.
+
+        Yields:
+            dict: The parsed details of an item.
+        """
+        for (result,) in self.connection.execute(
+            "SELECT result FROM items "
+            "WHERE status = 'done' AND result IS NOT NULL ORDER BY rowid"
+        ):
+            yield json.loads(result)
+
+    def failed_urls(self) -> List[str]:
+        """Get the URLs of the items that failed for good."""
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT url FROM items WHERE status = 'failed'"
+            )
+        ]
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self.connection.execute("DELETE FROM items")
+
+    def close(self) -> None:
+        """Close the database."""
+        self.connection.close()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
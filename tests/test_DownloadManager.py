@@ -1,9 +1,14 @@
+import importlib.util
 import json
 import pathlib
 import unittest
 from unittest.mock import mock_open, patch
 
 from estatesearch.download.download import DownloadManager
+from estatesearch.download.records import flatten_properties, parse_price
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
 
 
 class TestDownloadManager(unittest.TestCase):
@@ -67,5 +72,70 @@ class TestDownloadManager(unittest.TestCase):
         test_file.unlink()
 
 
+class TestColumnarExport(unittest.TestCase):
+    def setUp(self):
+        # Raw propertyData, as saved before the PropertyDetails mapping
+        property_data = json.loads(
+            (EXAMPLES_DIR / "pageMODEL.json").read_text()
+        )["propertyData"]
+        self.search_results = {
+            "Version": "1.0",
+            "SearchResults": {
+                "Rightmove": {"properties": [property_data, property_data]}
+            },
+        }
+        self.filename = "test_results.json"
+        self.filepath = "results"
+
+    def tearDown(self):
+        test_file = pathlib.Path(self.filepath) / "test_results.parquet"
+        if test_file.exists():
+            test_file.unlink()
+
+    def test_parse_price(self):
+        self.assertEqual(parse_price("£325,000"), 325000)
+        self.assertEqual(parse_price("£1,250 pcm"), 1250)
+        self.assertIsNone(parse_price("POA"))
+        self.assertIsNone(parse_price(None))
+
+    def test_flatten_properties(self):
+        rows = list(flatten_properties(self.search_results))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["engine"], "Rightmove")
+        self.assertEqual(rows[0]["id"], "159073889")
+        self.assertEqual(rows[0]["postcode"], "DA7 4NY")
+        self.assertEqual(rows[0]["price"], 325000)
+        self.assertEqual(rows[0]["agent"], "RE/MAX Select, Bexleyheath")
+        # Nested fields are kept as JSON strings
+        self.assertIsInstance(json.loads(rows[0]["rooms"]), list)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_to_arrow(self):
+        import pyarrow as pa
+
+        table = DownloadManager(
+            self.search_results, self.filename, self.filepath
+        ).to_arrow()
+        self.assertEqual(table.num_rows, 2)
+        self.assertTrue(
+            pa.types.is_dictionary(table.schema.field("agent").type)
+        )
+        self.assertTrue(
+            pa.types.is_dictionary(table.schema.field("postcode").type)
+        )
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_to_parquet(self):
+        import pyarrow.parquet as pq
+
+        file_path = DownloadManager(
+            self.search_results, self.filename, self.filepath
+        ).to_parquet()
+        self.assertEqual(file_path.name, "test_results.parquet")
+        table = pq.read_table(file_path, columns=["id", "price"])
+        self.assertEqual(table.column_names, ["id", "price"])
+        self.assertEqual(table.column("price").to_pylist(), [325000, 325000])
+
+
 if __name__ == "__main__":
     unittest.main()
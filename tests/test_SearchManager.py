@@ -0,0 +1,134 @@
+"""Offline tests for the SearchManager."""
+
+import asyncio
+import json
+import pathlib
+import tempfile
+import unittest
+
+from estatesearch.download.jsonl import JSONLWriter, read_jsonl
+from estatesearch.search.engine import ENGINES, get_engine
+from estatesearch.search.search import SearchManager
+from estatesearch.search.searchConfig import SearchParams
+from estatesearch.search.uk.mapping import parse_page_model
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+PAGE_MODEL = json.loads((EXAMPLES_DIR / "pageMODEL.json").read_text())
+
+
+class FakeEngine:
+    """Search engine that yields the example listing ``n`` times."""
+
+    def __init__(self, n: int, origin: str = "Rightmove", delay: float = 0):
+        self.n = n
+        self.origin = origin
+        self.delay = delay
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+    async def stream_properties(self, resume=False):
+        for i in range(self.n):
+            await asyncio.sleep(self.delay)
+            yield parse_page_model(
+                PAGE_MODEL, f"https://example.com/{i}", origin=self.origin
+            )
+
+
+class BrokenEngine:
+    """Search engine that fails after its first property."""
+
+    async def aclose(self):
+        pass
+
+    async def stream_properties(self, resume=False):
+        yield parse_page_model(PAGE_MODEL, origin="Broken")
+        raise ConnectionError("blocked")
+
+
+class TestSearchManager(unittest.IsolatedAsyncioTestCase):
+    """Test case for SearchManager with a fake engine."""
+
+    def setUp(self):
+        self.search_manager = SearchManager(SearchParams(location="Kent"))
+        self.search_manager.search_engines = {"Rightmove": FakeEngine(3)}
+
+    async def test_search_stream(self):
+        """Typed records are yielded one by one."""
+        urls = [
+            property_details.url
+            async for property_details in self.search_manager.search_stream()
+        ]
+        self.assertEqual(len(urls), 3)
+
+    def test_search_returns_plain_objects(self):
+        """search() returns a dict ready to be saved, not a JSON string."""
+        search_results = self.search_manager.search()
+        self.assertIsInstance(search_results, dict)
+        self.assertEqual(search_results["Version"], "1.0")
+        self.assertEqual(search_results["SearchParams"]["location"], "Kent")
+        properties = search_results["SearchResults"]["Rightmove"]["properties"]
+        self.assertEqual(len(properties), 3)
+        self.assertEqual(properties[0]["id"], "159073889")
+        # The results serialise as they are
+        json.dumps(search_results)
+
+    def test_search_with_sink(self):
+        """Every property reaches the sink."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with JSONLWriter(
+                "results.jsonl", tmp_dir, self.search_manager.metadata()
+            ) as sink:
+                search_results = self.search_manager.search(sink)
+            stored = read_jsonl(sink.file_path)
+        # The properties are only in the sink, memory stays flat
+        self.assertEqual(search_results["SearchResults"], {})
+        self.assertEqual(stored["Footer"]["count"], 3)
+        self.assertEqual(
+            len(stored["SearchResults"]["Rightmove"]["properties"]), 3
+        )
+
+    def test_registry(self):
+        """Rightmove is registered and used by default."""
+        self.assertIn("Rightmove", ENGINES)
+        self.assertEqual(get_engine("Rightmove").name, "Rightmove")
+        with self.assertRaises(KeyError):
+            get_engine("Zoopla")
+        self.assertEqual(
+            list(SearchManager(SearchParams(location="Kent")).search_engines),
+            ["Rightmove"],
+        )
+
+    async def test_engines_run_concurrently(self):
+        """Properties from several engines arrive interleaved."""
+        self.search_manager.search_engines = {
+            "A": FakeEngine(3, "A", delay=0.01),
+            "B": FakeEngine(3, "B", delay=0.01),
+        }
+        origins = [
+            property_details.origin
+            async for property_details in self.search_manager.search_stream()
+        ]
+        self.assertEqual(sorted(origins), ["A"] * 3 + ["B"] * 3)
+        # Sequential engines would give AAABBB
+        self.assertNotEqual(origins, ["A"] * 3 + ["B"] * 3)
+
+    def test_failing_engine_does_not_stop_others(self):
+        """An engine that raises keeps what it found; the others finish."""
+        self.search_manager.search_engines = {
+            "Broken": BrokenEngine(),
+            "Rightmove": FakeEngine(3),
+        }
+        with self.assertLogs("estatesearch.search.search", "ERROR"):
+            search_results = self.search_manager.search()
+        self.assertEqual(
+            len(search_results["SearchResults"]["Rightmove"]["properties"]), 3
+        )
+        self.assertEqual(
+            len(search_results["SearchResults"]["Broken"]["properties"]), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""Test the batch search runner."""
+
+import asyncio
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from estatesearch.search.batch import BatchSearch, load_searches
+from estatesearch.search.engine import SearchEngine
+from estatesearch.search.scraper import ScrapeResult
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.transport import Transport
+from estatesearch.search.uk.mapping import parse_page_model
+from estatesearch.search.uk.queryplan import compile_query_plan
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+PAGE_MODEL = json.loads((EXAMPLES_DIR / "pageMODEL.json").read_text())
+
+# Listings found by each location; 3 and 4 are found by both
+LISTINGS = {"Kent": range(0, 5), "Canterbury": range(3, 8)}
+
+
+class FakeEngine(SearchEngine):
+    """Engine finding overlapping listings and counting the fetches."""
+
+    name = "Fake"
+    fetched = []
+    closed = 0
+    discovering = 0
+    peak = 0
+
+    def __init__(self, params, crawl_config):
+        self.params = params
+        self.shared_with = None
+
+    def share(self, other):
+        self.shared_with = other
+
+    async def discover(self):
+        FakeEngine.discovering += 1
+        FakeEngine.peak = max(FakeEngine.peak, FakeEngine.discovering)
+        await asyncio.sleep(0)
+        FakeEngine.discovering -= 1
+        if self.params.location == "Nowhere":
+            raise ConnectionError("blocked")
+        return [
+            f"https://example.com/{i}" for i in LISTINGS[self.params.location]
+        ]
+
+    async def fetch(self, urls):
+        for url in urls:
+            FakeEngine.fetched.append(url)
+            yield ScrapeResult(url, httpx.Response(200), attempts=1)
+
+    def parse(self, result):
+        return parse_page_model(PAGE_MODEL, result.url, origin=self.name)
+
+    async def aclose(self):
+        FakeEngine.closed += 1
+
+
+class TestBatchSearch(unittest.TestCase):
+    """Test case for the BatchSearch class."""
+
+    def setUp(self):
+        FakeEngine.fetched = []
+        FakeEngine.closed = 0
+        FakeEngine.peak = 0
+        patcher = patch(
+            "estatesearch.search.search.load_engines",
+            return_value={"Fake": FakeEngine},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_listings_are_fetched_once(self):
+        batch = BatchSearch(
+            [
+                SearchParams(location="Kent"),
+                SearchParams(location="Canterbury"),
+                SearchParams(location="Nowhere"),
+            ]
+        )
+        with self.assertLogs("estatesearch.search.batch", "ERROR"):
+            kent, canterbury, nowhere = batch.search()
+
+        self.assertEqual(len(FakeEngine.fetched), 8)
+        self.assertEqual(len(set(FakeEngine.fetched)), 8)
+        self.assertEqual((batch.discovered, batch.fetched), (10, 8))
+        self.assertEqual(FakeEngine.closed, 3)
+        # Concurrent discoveries, all sharing the first search's engine
+        self.assertEqual(FakeEngine.peak, 3)
+        first, *others = [
+            manager.search_engines["Fake"] for manager in batch.managers
+        ]
+        self.assertIsNone(first.shared_with)
+        self.assertTrue(all(other.shared_with is first for other in others))
+        self.assertEqual(
+            [p["url"] for p in kent["SearchResults"]["Fake"]["properties"]],
+            [f"https://example.com/{i}" for i in range(0, 5)],
+        )
+        self.assertEqual(
+            [
+                p["url"]
+                for p in canterbury["SearchResults"]["Fake"]["properties"]
+            ],
+            [f"https://example.com/{i}" for i in range(3, 8)],
+        )
+        self.assertEqual(canterbury["SearchParams"]["location"], "Canterbury")
+        self.assertEqual(nowhere["SearchResults"], {})
+
+
+class TestRightmoveBatch(unittest.TestCase):
+    """Test case for the batches of Rightmove searches."""
+
+    def test_connections_and_caches_are_shared(self):
+        batch = BatchSearch(
+            [SearchParams(location="Kent"), SearchParams(location="Leeds")],
+            ["Rightmove"],
+        )
+        kent, leeds = [
+            manager.search_engines["Rightmove"] for manager in batch.managers
+        ]
+        self.assertIs(leeds.transport, kent.transport)
+        self.assertIs(leeds.location_cache, kent.location_cache)
+
+    def test_concurrent_discovery_keeps_to_max_concurrency(self):
+        """The searches discover together within one request budget."""
+        in_flight = peak = 0
+        locations = set()
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            if not request.url.path.startswith("/api"):
+                return httpx.Response(404)
+            index = int(request.url.params["index"])
+            locations.add(request.url.params["locationIdentifier"])
+            properties = [
+                {"id": i, "propertyUrl": f"/properties/{i}"}
+                for i in range(index, min(index + 499, 1200))
+            ]
+            body = {"resultCount": "1,200", "properties": properties}
+            return httpx.Response(200, text=json.dumps(body))
+
+        config = CrawlConfig(
+            max_concurrency=2, http_cache_bytes=0, rate_limit=0, max_retries=0
+        )
+        batch = BatchSearch(
+            [SearchParams(location="Kent"), SearchParams(location="Leeds")],
+            ["Rightmove"],
+            config,
+        )
+        transport = Transport(config, transport=httpx.MockTransport(handler))
+        for region, manager in enumerate(batch.managers):
+            rightmove = manager.search_engines["Rightmove"]
+            rightmove.transport = transport
+            rightmove._plan = compile_query_plan(
+                rightmove.params, ("REGION", str(region))
+            )
+        with self.assertLogs("estatesearch", "WARNING"):
+            batch.search()
+        self.assertEqual(locations, {"REGION^0", "REGION^1"})
+        self.assertEqual(peak, 2)
+
+
+class TestLoadSearches(unittest.TestCase):
+    """Test case for the load_searches function."""
+
+    def write(self, text):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = pathlib.Path(tmp_dir.name) / "searches.jsonl"
+        path.write_text(text)
+        return path
+
+    def test_load_searches(self):
+        path = self.write(
+            '{"location": "Kent", "buy_rent": "rent", "radius": 5}\n'
+            "\n"
+            '{"location": "Canterbury", "property_type": ["flat"]}\n'
+        )
+        self.assertEqual(
+            load_searches(path),
+            [
+                SearchParams(location="Kent", buy_rent="rent", radius=5),
+                SearchParams(location="Canterbury", property_type=["flat"]),
+            ],
+        )
+
+    def test_unknown_parameter(self):
+        path = self.write('{"location": "Kent", "bedrooms": 2}\n')
+        with self.assertRaisesRegex(UserWarning, "line 1"):
+            load_searches(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+"""Test the record/replay HTTP transport."""
+
+import asyncio
+import pathlib
+import tempfile
+import unittest
+
+import httpx
+
+from estatesearch.search.cassette import CassetteTransport
+from estatesearch.search.searchConfig import CrawlConfig
+from estatesearch.search.transport import Transport
+
+
+class TestCassetteTransport(unittest.TestCase):
+    """Test case for the CassetteTransport class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = pathlib.Path(self.tmp_dir.name) / "cassette.jsonl"
+        self.sent = []
+
+    def handler(self, request):
+        self.sent.append(str(request.url))
+        count = len(self.sent)
+        if request.url.path == "/image":
+            return httpx.Response(200, content=b"\xff\xd8\xff")
+        return httpx.Response(
+            200, headers={"ETag": f'"{count}"'}, text=f"page {count}"
+        )
+
+    def get(self, cassette, *urls):
+        async def get_all():
+            async with httpx.AsyncClient(transport=cassette) as client:
+                return [await client.get(url) for url in urls]
+
+        return asyncio.run(get_all())
+
+    def test_record_then_replay(self):
+        recorder = CassetteTransport(
+            self.path, "record", httpx.MockTransport(self.handler)
+        )
+        recorded = self.get(
+            recorder,
+            "https://example.com/a",
+            "https://example.com/a",
+            "https://example.com/image",
+        )
+        self.assertEqual(recorder.recorded, 3)
+
+        player = CassetteTransport(self.path, "replay")
+        replayed = self.get(
+            player,
+            "https://example.com/a",
+            "https://example.com/a",
+            "https://example.com/a",
+            "https://example.com/image",
+        )
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(
+            [response.text for response in replayed[:3]],
+            ["page 1", "page 2", "page 2"],
+        )
+        self.assertEqual(
+            replayed[1].headers["ETag"], recorded[1].headers["ETag"]
+        )
+        self.assertEqual(replayed[3].content, b"\xff\xd8\xff")
+
+    def test_replay_miss(self):
+        with self.assertRaises(httpx.TransportError):
+            self.get(
+                CassetteTransport(self.path, "replay"), "https://example.com/"
+            )
+
+    def test_once_records_missing_responses(self):
+        self.get(
+            CassetteTransport(
+                self.path, "record", httpx.MockTransport(self.handler)
+            ),
+            "https://example.com/a",
+        )
+        cassette = CassetteTransport(
+            self.path, "once", httpx.MockTransport(self.handler)
+        )
+        self.get(cassette, "https://example.com/a", "https://example.com/b")
+        self.assertEqual((cassette.replayed, cassette.recorded), (1, 1))
+        self.assertEqual(len(self.path.read_text().splitlines()), 2)
+
+    def test_recording_spans_event_loops(self):
+        """A new pool on a new loop appends to the same recording."""
+        transport = Transport(
+            CrawlConfig(
+                http_cache_bytes=0,
+                cassette=str(self.path),
+                cassette_mode="record",
+            ),
+            transport=httpx.MockTransport(self.handler),
+        )
+
+        async def get(url):
+            async with transport:
+                await transport.client.get(url)
+
+        asyncio.run(get("https://example.com/a"))
+        asyncio.run(get("https://example.com/b"))
+        self.assertEqual(len(self.path.read_text().splitlines()), 2)
+
+    def test_replay_does_not_need_the_http_cache(self):
+        """A recording made with a warm cache replays with a cold one."""
+
+        def handler(request):
+            self.sent.append(str(request.url))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, headers={"ETag": '"v1"'}, text="page")
+
+        def get(cache_dir, **config):
+            transport = Transport(
+                CrawlConfig(cache_dir=cache_dir, rate_limit=0, **config),
+                transport=httpx.MockTransport(handler),
+            )
+
+            async def get():
+                async with transport:
+                    return await transport.client.get("https://example.com/a")
+
+            return asyncio.run(get())
+
+        warm = str(pathlib.Path(self.tmp_dir.name) / "warm")
+        cold = str(pathlib.Path(self.tmp_dir.name) / "cold")
+        get(warm)
+        recorded = get(warm, cassette=str(self.path), cassette_mode="record")
+        replayed = get(cold, cassette=str(self.path), cassette_mode="replay")
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual((recorded.status_code, recorded.text), (200, "page"))
+        self.assertEqual((replayed.status_code, replayed.text), (200, "page"))
+
+    def test_304_is_not_recorded(self):
+        def handler(request):
+            return httpx.Response(304)
+
+        cassette = CassetteTransport(
+            self.path, "record", httpx.MockTransport(handler)
+        )
+        self.assertEqual(
+            self.get(cassette, "https://example.com/a")[0].status_code, 304
+        )
+        self.assertEqual(cassette.recorded, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
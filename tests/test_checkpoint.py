@@ -0,0 +1,58 @@
+"""Test the crawl checkpoint file."""
+
+import pathlib
+import tempfile
+import unittest
+
+from estatesearch.search.checkpoint import Checkpoint, checkpoint_path
+from estatesearch.search.searchConfig import SearchParams
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Test case for the Checkpoint class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint = Checkpoint(
+            pathlib.Path(self.tmp_dir.name) / "checkpoint.jsonl"
+        )
+
+    def tearDown(self):
+        self.checkpoint.close()
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        self.checkpoint.start(["a", "b", "c"])
+        self.checkpoint.record("a", {"id": "1"})
+        self.checkpoint.close()
+        state = self.checkpoint.load()
+        self.assertEqual(state.done, {"a": {"id": "1"}})
+        self.assertEqual(state.pending, ["b", "c"])
+
+    def test_line_cut_by_a_crash_is_ignored(self):
+        """A torn last line is skipped and appending carries on cleanly."""
+        self.checkpoint.start(["a", "b"])
+        self.checkpoint.record("a", {"id": "1"})
+        self.checkpoint.close()
+        with open(self.checkpoint.path, "a") as f:
+            f.write('{"type": "done", "url": "b", "da')
+        self.checkpoint.resume()
+        self.checkpoint.record("b", {"id": "2"})
+        self.checkpoint.close()
+        self.assertEqual(self.checkpoint.load().pending, [])
+
+    def test_missing_checkpoint(self):
+        self.assertIsNone(self.checkpoint.load())
+        self.checkpoint.finish()
+
+    def test_path_depends_on_the_search(self):
+        kent = checkpoint_path("cache", "Rightmove", SearchParams("Kent"))
+        leeds = checkpoint_path("cache", "Rightmove", SearchParams("Leeds"))
+        self.assertNotEqual(kent, leeds)
+        self.assertEqual(
+            kent, checkpoint_path("cache", "Rightmove", SearchParams("Kent"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
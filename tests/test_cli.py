@@ -0,0 +1,116 @@
+"""Test the command line interface and the lazy imports of the package."""
+
+import json
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from estatesearch import cli
+from estatesearch.download.jsonl import read_jsonl
+from estatesearch.search.searchConfig import SearchParams
+from estatesearch.search.uk.mapping import parse_page_model
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+PAGE_MODEL = json.loads((EXAMPLES_DIR / "pageMODEL.json").read_text())
+
+
+class FakeEngine:
+    """Search engine that yields the example listing twice."""
+
+    def __init__(self, params, crawl_config):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def stream_properties(self, resume=False):
+        for i in range(2):
+            yield parse_page_model(
+                PAGE_MODEL, f"https://example.com/{i}", origin="Fake"
+            )
+
+
+class TestLazyImports(unittest.TestCase):
+    """The bare import must not load the engines."""
+
+    def test_import_does_not_load_the_engines(self):
+        code = (
+            "import sys, estatesearch; "
+            "print(sorted(m for m in ('httpx', 'parsel', 'jmespath', "
+            "'estatesearch.search.uk.rightmove') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=pathlib.Path(__file__).parent.parent,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_lazy_attribute(self):
+        import estatesearch
+        from estatesearch.search.uk.rightmove import Rightmove
+
+        self.assertIs(estatesearch.Rightmove, Rightmove)
+        with self.assertRaises(AttributeError):
+            estatesearch.Zoopla
+
+
+class TestCli(unittest.TestCase):
+    """Test case for the estatesearch command."""
+
+    def test_search_params(self):
+        args = cli.build_parser().parse_args(
+            [
+                "search",
+                "Kent",
+                "--buy-rent",
+                "rent",
+                "--property-type",
+                "flat",
+                "--property-type",
+                "terraced",
+                "--max-days-since-added",
+                "7",
+            ]
+        )
+        self.assertEqual(
+            cli.search_params(args),
+            SearchParams(
+                location="Kent",
+                buy_rent="rent",
+                property_type=["flat", "terraced"],
+                max_days_since_added=7,
+            ),
+        )
+
+    def test_invalid_choice(self):
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            cli.build_parser().parse_args(
+                ["search", "Kent", "--max-days-since-added", "2"]
+            )
+
+    def test_search_to_jsonl(self):
+        with (
+            tempfile.TemporaryDirectory() as tmp_dir,
+            patch(
+                "estatesearch.search.search.load_engines",
+                return_value={"Fake": FakeEngine},
+            ),
+            patch.object(cli, "configure_logging"),
+        ):
+            status = cli.main(
+                ["search", "Kent", "--format", "jsonl", "--output", tmp_dir]
+            )
+            (path,) = pathlib.Path(tmp_dir).glob("*.jsonl")
+            results = read_jsonl(path)
+        self.assertEqual(status, 0)
+        self.assertEqual(len(results["SearchResults"]["Fake"]["properties"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
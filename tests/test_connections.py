@@ -98,9 +98,8 @@ class UKSearchEngines(unittest.TestCase):
         search_manager = SearchManager(search)
         search_results = search_manager.search()
         self.assertIsInstance(
-            search_results, str, "SearchManager is not a string."
+            search_results, dict, "SearchManager is not a dict."
         )
-        search_results = json.loads(search_results)
         self.assertIn(
             "SearchResults", search_results, "SearchResults not found."
         )
@@ -0,0 +1,117 @@
+"""Test the conditional HTTP cache without touching the network."""
+
+import gzip
+import tempfile
+import time
+import unittest
+
+import httpx
+
+from estatesearch.search.httpcache import CachingTransport, HTTPCache
+
+URL = "https://example.com/properties/1"
+
+
+class TestCachingTransport(unittest.IsolatedAsyncioTestCase):
+    """Test case for the CachingTransport class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = HTTPCache(self.tmp_dir.name)
+        self.requests = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def handler(self, request):
+        """Serve a gzipped page with an ETag, honouring If-None-Match."""
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(
+            200,
+            headers={
+                "ETag": '"v1"',
+                "Content-Type": "text/html",
+                "Content-Encoding": "gzip",
+            },
+            content=gzip.compress(b"<html>listing</html>"),
+        )
+
+    def client(self, cache=None):
+        transport = CachingTransport(
+            httpx.MockTransport(self.handler), cache or self.cache
+        )
+        return httpx.AsyncClient(transport=transport)
+
+    async def test_revalidates_and_serves_304_from_disk(self):
+        """The second request is conditional and answered from the cache."""
+        async with self.client() as client:
+            first = await client.get(URL)
+            second = await client.get(URL)
+        self.assertEqual(first.text, "<html>listing</html>")
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.text, "<html>listing</html>")
+        self.assertNotIn("If-None-Match", self.requests[0].headers)
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    async def test_cache_persists_between_runs(self):
+        """A new cache on the same directory reuses the stored pages."""
+        async with self.client() as client:
+            await client.get(URL)
+        cache = HTTPCache(self.tmp_dir.name)
+        async with self.client(cache) as client:
+            response = await client.get(URL)
+        self.assertEqual(response.text, "<html>listing</html>")
+        self.assertEqual(cache.hits, 1)
+
+    async def test_responses_without_validators_are_not_stored(self):
+        """Only responses with an ETag or Last-Modified are cached."""
+
+        def handler(request):
+            return httpx.Response(200, text="no validators")
+
+        transport = CachingTransport(httpx.MockTransport(handler), self.cache)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get(URL)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+class TestHTTPCache(unittest.TestCase):
+    """Test case for the HTTPCache class."""
+
+    def test_evicts_least_recently_used(self):
+        """Old entries are evicted once the size limit is exceeded."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = HTTPCache(tmp_dir, max_bytes=25)
+            response = httpx.Response(200, headers={"ETag": '"x"'})
+            cache.put("https://example.com/a", response, b"a" * 10)
+            cache.put("https://example.com/b", response, b"b" * 10)
+            cache.get("https://example.com/a")
+            cache.put("https://example.com/c", response, b"c" * 10)
+            self.assertIsNotNone(cache.get("https://example.com/a"))
+            self.assertIsNone(cache.get("https://example.com/b"))
+            self.assertEqual(cache.evictions, 1)
+            self.assertLessEqual(cache.size, 25)
+
+    def test_recency_survives_restarts(self):
+        """A new cache evicts by last use, not by insertion order."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = HTTPCache(tmp_dir, max_bytes=25)
+            response = httpx.Response(200, headers={"ETag": '"x"'})
+            cache.put("https://example.com/a", response, b"a" * 10)
+            cache.put("https://example.com/b", response, b"b" * 10)
+            time.sleep(0.01)
+            cache.get("https://example.com/a")
+
+            cache = HTTPCache(tmp_dir, max_bytes=25)
+            self.assertEqual(cache.size, 20)
+            cache.put("https://example.com/c", response, b"c" * 10)
+            self.assertIsNotNone(cache.get("https://example.com/a"))
+            self.assertIsNone(cache.get("https://example.com/b"))
+            self.assertEqual(cache.size, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
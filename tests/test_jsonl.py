@@ -0,0 +1,76 @@
+"""Test the streaming JSON Lines sink."""
+
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from estatesearch.download.jsonl import JSONLWriter, read_jsonl
+
+
+class TestJSONLWriter(unittest.TestCase):
+    """Test case for JSONLWriter and read_jsonl."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.metadata = {"Version": "1.0", "SearchParams": {"location": "Kent"}}
+
+    def test_records_are_written_as_they_arrive(self):
+        """Each property is on disk before the writer is closed."""
+        writer = JSONLWriter(
+            "results.jsonl", self.tmp_dir.name, metadata=self.metadata
+        ).open()
+        writer.write({"id": "1"}, "Rightmove")
+        lines = writer.file_path.read_text().splitlines()
+        self.assertEqual(json.loads(lines[0])["type"], "header")
+        self.assertEqual(
+            json.loads(lines[1]),
+            {"type": "property", "engine": "Rightmove", "data": {"id": "1"}},
+        )
+        writer.close()
+
+    def test_fsync_batching(self):
+        """The file is synced once per batch, not once per property."""
+        with patch("estatesearch.download.jsonl.os.fsync") as fsync:
+            with JSONLWriter(
+                "results.jsonl", self.tmp_dir.name, fsync_every=10
+            ) as writer:
+                for i in range(25):
+                    writer.write({"id": str(i)}, "Rightmove")
+        # header, two full batches and the footer
+        self.assertEqual(fsync.call_count, 4)
+
+    def test_read_back(self):
+        """The file loads back into the search results structure."""
+        with JSONLWriter(
+            "results.jsonl", self.tmp_dir.name, metadata=self.metadata
+        ) as writer:
+            writer.write({"id": "1"}, "Rightmove")
+            writer.write({"id": "2"}, "Rightmove")
+        search_results = read_jsonl(writer.file_path)
+        self.assertEqual(search_results["Version"], "1.0")
+        self.assertEqual(
+            search_results["SearchResults"]["Rightmove"]["properties"],
+            [{"id": "1"}, {"id": "2"}],
+        )
+        self.assertEqual(search_results["Footer"]["count"], 2)
+        self.assertEqual(search_results["Footer"]["status"], "complete")
+
+    def test_failed_run(self):
+        """A run that raises keeps its records and is marked as failed."""
+        file_path = pathlib.Path(self.tmp_dir.name) / "results.jsonl"
+        with self.assertRaises(RuntimeError):
+            with JSONLWriter("results.jsonl", self.tmp_dir.name) as writer:
+                writer.write({"id": "1"}, "Rightmove")
+                raise RuntimeError("connection lost")
+        search_results = read_jsonl(file_path)
+        self.assertEqual(search_results["Footer"]["status"], "failed")
+        self.assertEqual(
+            len(search_results["SearchResults"]["Rightmove"]["properties"]), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
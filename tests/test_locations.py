@@ -0,0 +1,120 @@
+"""Test the persistent location identifier cache."""
+
+import json
+import pathlib
+import tempfile
+import unittest
+
+import httpx
+
+from estatesearch.search.uk.locations import (
+    LocationCache,
+    normalise_location,
+    resolve_locations,
+)
+
+
+class TestLocationCache(unittest.IsolatedAsyncioTestCase):
+    """Test case for LocationCache and resolve_locations."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = pathlib.Path(self.tmp_dir.name) / "locations.json"
+
+    def test_normalise_location(self):
+        """Equivalent spellings share a key."""
+        self.assertEqual(normalise_location("SY3 9EB"), "sy3 9eb")
+        self.assertEqual(normalise_location("sy3-9eb"), "sy3 9eb")
+        self.assertEqual(normalise_location(" Sy3  9eb "), "sy3 9eb")
+
+    def test_persists_across_instances(self):
+        """Saved entries are read back by a new cache."""
+        cache = LocationCache(self.path)
+        cache.set("W1A 1AA", ("POSTCODE", "912358"))
+        cache.save()
+        self.assertEqual(
+            LocationCache(self.path).get("w1a-1aa"), ("POSTCODE", "912358")
+        )
+
+    def test_ttl(self):
+        """Expired entries are treated as missing."""
+        cache = LocationCache(self.path, ttl=-1)
+        cache.set("london", ("REGION", "87490"))
+        self.assertIsNone(cache.get("london"))
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first."""
+        cache = LocationCache(self.path, max_entries=2)
+        cache.set("leeds", ("REGION", "787"))
+        cache.set("bristol", ("REGION", "219"))
+        cache.entries["leeds"]["used"] = 0  # leeds is now the oldest
+        cache.set("cardiff", ("REGION", "281"))
+        self.assertIsNone(cache.get("leeds"))
+        self.assertIsNotNone(cache.get("bristol"))
+        self.assertIsNotNone(cache.get("cardiff"))
+
+    async def test_resolve_locations(self):
+        """Only uncached locations reach the typeahead, once per key."""
+        queries = []
+
+        def handler(request):
+            query = request.url.params["query"]
+            queries.append(query)
+            if query == "nowhere":
+                return httpx.Response(200, text=json.dumps({"matches": []}))
+            body = {"matches": [{"type": "REGION", "id": query.upper()}]}
+            return httpx.Response(200, text=json.dumps(body))
+
+        cache = LocationCache(self.path)
+        cache.set("london", ("REGION", "87490"))
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            resolved = await resolve_locations(
+                ["london", "Leeds", "leeds", "nowhere"], client, cache
+            )
+        self.assertEqual(sorted(queries), ["leeds", "nowhere"])
+        self.assertEqual(resolved["london"], ("REGION", "87490"))
+        self.assertEqual(resolved["Leeds"], ("REGION", "LEEDS"))
+        self.assertEqual(resolved["leeds"], ("REGION", "LEEDS"))
+        self.assertNotIn("nowhere", resolved)
+        # The new entries were saved to disk
+        self.assertIsNotNone(LocationCache(self.path).get("leeds"))
+
+    async def test_malformed_typeahead(self):
+        """A malformed answer leaves the location unresolved."""
+
+        def handler(request):
+            if request.url.params["query"] == "html":
+                return httpx.Response(200, text="<html></html>")
+            return httpx.Response(200, text=json.dumps({"matches": [{}]}))
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            with self.assertLogs("estatesearch.search.uk.locations", "WARNING"):
+                resolved = await resolve_locations(
+                    ["html", "partial"], client, LocationCache(self.path)
+                )
+        self.assertEqual(resolved, {})
+
+    async def test_cache_hits_are_saved(self):
+        """The recency of a cache hit is written back to disk."""
+        cache = LocationCache(self.path)
+        cache.set("london", ("REGION", "87490"))
+        cache.entries["london"]["used"] = 0
+        cache.save()
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(500))
+        ) as client:
+            await resolve_locations(
+                ["london"], client, LocationCache(self.path)
+            )
+        stored = json.loads(self.path.read_text())
+        self.assertGreater(stored["london"]["used"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
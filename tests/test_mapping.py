@@ -0,0 +1,70 @@
+"""Test the PAGE_MODEL to PropertyDetails mapping."""
+
+import json
+import pathlib
+import unittest
+
+from estatesearch.search.uk.details import PropertyDetails
+from estatesearch.search.uk.mapping import (
+    FIELD_PATHS,
+    parse_listing_pages,
+    parse_page_model,
+    parse_page_models,
+)
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+
+
+class TestMapping(unittest.TestCase):
+    """Test case for the jmespath mapping."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.page_model = json.loads(
+            (EXAMPLES_DIR / "pageMODEL.json").read_text()
+        )
+
+    def test_every_field_is_mapped(self):
+        """Every PropertyDetails field has a path, except origin and url."""
+        self.assertEqual(
+            set(FIELD_PATHS) | {"origin", "url"}, set(PropertyDetails._fields)
+        )
+
+    def test_parse_page_model(self):
+        """The example listing maps to the expected values."""
+        details = parse_page_model(self.page_model, "https://example.com/1")
+        self.assertIsInstance(details, PropertyDetails)
+        self.assertEqual(details.origin, "Rightmove")
+        self.assertEqual(details.url, "https://example.com/1")
+        self.assertEqual(details.id, "159073889")
+        self.assertEqual(details.primaryPrice, "£325,000")
+        self.assertEqual(details.postcode, "DA7 4NY")
+        self.assertEqual(details.bedrooms, 2)
+        self.assertEqual(details.tenureType, "LEASEHOLD")
+        self.assertAlmostEqual(details.latitude, 51.462772)
+        self.assertIsNone(details.EPC)
+
+    def test_missing_fields_are_none(self):
+        """A sparse payload maps without errors."""
+        details = parse_page_model({"propertyData": {"id": "1"}})
+        self.assertEqual(details.id, "1")
+        self.assertIsNone(details.primaryPrice)
+
+    def test_parse_page_models_skips_empty_pages(self):
+        """Pages without a PAGE_MODEL are left out of a batch."""
+        batch = parse_page_models(
+            [("a", self.page_model), ("b", None), ("c", self.page_model)]
+        )
+        self.assertEqual([details.url for details in batch], ["a", "c"])
+
+    def test_parse_listing_pages_keeps_positions(self):
+        """HTML batches are parsed in order, with None for non-listings."""
+        html = next(EXAMPLES_DIR.glob("*.html")).read_text()
+        batch = parse_listing_pages([("a", html), ("b", "<html></html>")])
+        self.assertEqual(batch[0].url, "a")
+        self.assertEqual(batch[0].id, "159073889")
+        self.assertIsNone(batch[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+"""Test the metrics registry and the instrumentation of the crawler."""
+
+import asyncio
+import json
+import pathlib
+import tempfile
+import unittest
+
+import httpx
+
+from estatesearch import metrics
+from estatesearch.metrics import Registry, endpoint
+from estatesearch.search.httpcache import CachingTransport, HTTPCache
+from estatesearch.search.scraper import Scraper
+from estatesearch.search.searchConfig import CrawlConfig
+
+
+class TestRegistry(unittest.TestCase):
+    """Test case for the Registry class."""
+
+    def setUp(self):
+        self.registry = Registry()
+        self.requests = self.registry.counter("requests_total", "Requests.")
+        self.depth = self.registry.gauge("queue_depth", "Depth.")
+        self.latency = self.registry.histogram(
+            "latency_seconds", "Latency.", buckets=(0.1, 1.0)
+        )
+
+    def test_counter_and_gauge(self):
+        self.requests.inc(endpoint="a", status=200)
+        self.requests.inc(2, endpoint="a", status=200)
+        self.depth.set(5, queue="scrape")
+        self.depth.inc(-2, queue="scrape")
+        self.assertEqual(self.requests.value(endpoint="a", status="200"), 3)
+        self.assertEqual(self.requests.value(endpoint="b", status="200"), 0)
+        self.assertEqual(self.depth.value(queue="scrape"), 3)
+
+    def test_histogram_quantiles(self):
+        for value in (0.05, 0.05, 0.5, 0.5, 2.0):
+            self.latency.observe(value)
+        self.assertEqual(self.latency.count(), 5)
+        self.assertAlmostEqual(self.latency.quantile(0.2), 0.075)
+        self.assertAlmostEqual(self.latency.quantile(0.6), 0.55)
+        self.assertEqual(self.latency.quantile(1.0), 2.0)
+        self.assertIsNone(self.latency.quantile(0.5, endpoint="other"))
+
+    def test_to_prometheus(self):
+        self.requests.inc(endpoint='a"b', status=200)
+        self.latency.observe(0.5, endpoint="a")
+        text = self.registry.to_prometheus()
+        self.assertIn("# TYPE estatesearch_requests_total counter", text)
+        self.assertIn(
+            'estatesearch_requests_total{endpoint="a\\"b",status="200"} 1',
+            text,
+        )
+        self.assertIn(
+            'estatesearch_latency_seconds_bucket{endpoint="a",le="0.1"} 0',
+            text,
+        )
+        self.assertIn(
+            'estatesearch_latency_seconds_bucket{endpoint="a",le="+Inf"} 1',
+            text,
+        )
+        self.assertIn(
+            'estatesearch_latency_seconds_count{endpoint="a"} 1', text
+        )
+
+    def test_write(self):
+        self.latency.observe(0.5)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = self.registry.write(pathlib.Path(tmp_dir) / "run.json")
+            prom_path = self.registry.write(pathlib.Path(tmp_dir) / "run.prom")
+            summary = json.loads(json_path.read_text())
+            self.assertEqual(
+                prom_path.read_text(), self.registry.to_prometheus()
+            )
+        (series,) = summary["estatesearch_latency_seconds"]["series"]
+        self.assertEqual((series["count"], series["max"]), (1, 0.5))
+        self.assertEqual(summary["estatesearch_queue_depth"]["series"], [])
+
+    def test_bound_labels(self):
+        requests = self.requests.labels(endpoint="a", status=200)
+        requests.inc()
+        requests.inc(2)
+        self.depth.labels(queue="scrape").set(4)
+        self.latency.labels(endpoint="a").observe(0.5)
+        self.assertEqual(self.requests.value(endpoint="a", status="200"), 3)
+        self.assertEqual(self.depth.value(queue="scrape"), 4)
+        self.assertEqual(self.latency.count(endpoint="a"), 1)
+
+    def test_reset_and_duplicates(self):
+        self.requests.inc()
+        self.registry.reset()
+        self.assertEqual(self.requests.value(), 0)
+        with self.assertRaises(UserWarning):
+            self.registry.counter("requests_total", "Requests.")
+
+    def test_endpoint(self):
+        self.assertEqual(
+            endpoint("https://www.rightmove.co.uk/properties/1#/?channel=RENT"),
+            "www.rightmove.co.uk/properties",
+        )
+        self.assertEqual(
+            endpoint("https://los.rightmove.co.uk/typeahead?query=Kent"),
+            "los.rightmove.co.uk/typeahead",
+        )
+
+
+class TestScraperMetrics(unittest.IsolatedAsyncioTestCase):
+    """Test case for the metrics recorded by the Scraper."""
+
+    def setUp(self):
+        metrics.REGISTRY.reset()
+        self.addCleanup(metrics.REGISTRY.reset)
+
+    async def test_requests_are_recorded(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url)
+            if len(calls) == 1:
+                return httpx.Response(503)
+            # Streamed like a network response, so the bytes are counted
+            return httpx.Response(200, stream=httpx.ByteStream(b"x" * 10))
+
+        config = CrawlConfig(max_retries=2, backoff_base=0)
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            result = await Scraper(client, config).fetch(
+                "https://example.com/properties/1"
+            )
+
+        self.assertTrue(result.ok)
+        labels = {"endpoint": "example.com/properties"}
+        self.assertEqual(metrics.HTTP_RESPONSES.value(status=503, **labels), 1)
+        self.assertEqual(metrics.HTTP_RESPONSES.value(status=200, **labels), 1)
+        self.assertEqual(metrics.HTTP_RETRIES.value(**labels), 1)
+        self.assertEqual(metrics.HTTP_DOWNLOADED_BYTES.value(**labels), 10)
+        self.assertEqual(metrics.HTTP_REQUEST_SECONDS.count(**labels), 2)
+        self.assertEqual(metrics.HTTP_IN_FLIGHT.value(), 0)
+
+    async def test_bytes_are_counted_through_the_http_cache(self):
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(
+                200,
+                headers={"ETag": '"v1"'},
+                stream=httpx.ByteStream(b"x" * 10),
+            )
+
+        url = "https://example.com/properties/1"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            transport = CachingTransport(
+                httpx.MockTransport(handler), HTTPCache(tmp_dir)
+            )
+            async with httpx.AsyncClient(transport=transport) as client:
+                scraper = Scraper(client, CrawlConfig(backoff_base=0))
+                first = await scraper.fetch(url)
+                second = await scraper.fetch(url)
+
+        self.assertTrue(first.ok and second.ok)
+        self.assertEqual(
+            metrics.HTTP_DOWNLOADED_BYTES.value(
+                endpoint="example.com/properties"
+            ),
+            10,
+        )
+
+
+class TestTimeIteration(unittest.IsolatedAsyncioTestCase):
+    """Test case for the time_iteration function."""
+
+    async def test_consumer_time_is_excluded(self):
+        registry = Registry()
+        seconds = registry.counter("stage_seconds_total", "Seconds.")
+
+        async def producer():
+            for i in range(3):
+                await asyncio.sleep(0.01)
+                yield i
+
+        items = []
+        async for item in metrics.time_iteration(
+            producer(), seconds, stage="scrape"
+        ):
+            items.append(item)
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(items, [0, 1, 2])
+        self.assertGreaterEqual(seconds.value(stage="scrape"), 0.03)
+        self.assertLess(seconds.value(stage="scrape"), 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
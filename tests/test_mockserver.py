@@ -0,0 +1,82 @@
+"""Crawl the local mock of Rightmove end to end."""
+
+import tempfile
+import unittest
+
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.transport import Transport
+from estatesearch.search.uk.mockserver import MockRightmove, RerouteTransport
+from estatesearch.search.uk.rightmove import HEADERS, Rightmove
+
+
+class TestMockRightmove(unittest.TestCase):
+    """Test case for the MockRightmove class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.config = CrawlConfig(
+            cache_dir=self.tmp_dir.name,
+            http_cache_bytes=0,
+            backoff_base=0,
+            rate_limit=0,
+        )
+
+    def crawl(
+        self, transport, params=SearchParams(location="Kent", buy_rent="rent")
+    ):
+        rightmove = Rightmove(
+            params, self.config, Transport(self.config, HEADERS, transport)
+        )
+        return rightmove.get_properties_details()
+
+    def test_full_crawl(self):
+        """Searches above the API limit are sharded and every page parsed."""
+        site = MockRightmove(listings=3000, buy_rent="buy", page_bytes=1000)
+        properties = self.crawl(
+            site.transport(),
+            SearchParams(location="Kent", buy_rent="buy"),
+        )
+        self.assertEqual(len(properties), 3000)
+        self.assertEqual(site.requests["listing", 200], 3000)
+        self.assertGreater(site.requests["search", 200], 7)
+        self.assertTrue(properties[0]["primaryPrice"].startswith("£"))
+
+    def test_filters(self):
+        site = MockRightmove(listings=500)
+        status, _, _ = site.handle(
+            "https://www.rightmove.co.uk/api/_search?channel=RENT&index=1500"
+        )
+        self.assertEqual(status, 400)
+        matches = site.matching(
+            {
+                "channel": "RENT",
+                "maxPrice": "1000",
+                "minBedrooms": "2",
+                "propertyTypes": "flat,terraced",
+            }
+        )
+        self.assertTrue(matches)
+        for listing in matches:
+            self.assertLessEqual(listing.price, 1000)
+            self.assertGreaterEqual(listing.bedrooms, 2)
+            self.assertIn(listing.property_type, {"flat", "terraced"})
+        self.assertEqual(site.matching({"channel": "BUY"}), [])
+
+    def test_faults_are_retried(self):
+        site = MockRightmove(
+            listings=50, rate_limit_rate=0.2, retry_after=0, page_bytes=1000
+        )
+        properties = self.crawl(site.transport())
+        self.assertEqual(len(properties), 50)
+        self.assertGreater(site.requests["listing", 429], 0)
+
+    def test_http_server(self):
+        site = MockRightmove(listings=20, page_bytes=1000)
+        with site.serve() as server:
+            properties = self.crawl(RerouteTransport(server.url))
+        self.assertEqual(len(properties), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Test the PAGE_MODEL extraction against the committed example page."""
+
+import json
+import pathlib
+import unittest
+
+import httpx
+
+from estatesearch.search.uk.pagemodel import (
+    extract_page_model,
+    extract_page_model_parsel,
+)
+from estatesearch.search.uk.rightmove import Rightmove
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+
+
+class TestPageModel(unittest.TestCase):
+    """Test case for the PAGE_MODEL extractors."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.page = next(EXAMPLES_DIR.glob("*.html")).read_text()
+        cls.page_model = json.loads(
+            (EXAMPLES_DIR / "pageMODEL.json").read_text()
+        )
+
+    def test_fast_path_matches_example(self):
+        """The fast extractor returns the documented PAGE_MODEL."""
+        self.assertEqual(extract_page_model(self.page), self.page_model)
+
+    def test_parsel_path_matches_example(self):
+        """The parsel fallback returns the documented PAGE_MODEL."""
+        self.assertEqual(extract_page_model_parsel(self.page), self.page_model)
+
+    def test_not_a_listing_page(self):
+        """Pages without a PAGE_MODEL give None."""
+        self.assertIsNone(extract_page_model("<html><body></body></html>"))
+
+    def test_marker_without_assignment(self):
+        """Mentions of PAGE_MODEL that are not the assignment are skipped."""
+        html = (
+            '<script>if (PAGE_MODEL) {}; window.PAGE_MODEL = {"a": 1}</script>'
+        )
+        self.assertEqual(extract_page_model(html), {"a": 1})
+
+    def test_find_json_objects(self):
+        """Every JSON object in the text is decoded, in order."""
+        text = 'x = {"a": 1}; y = {"b": [2]}; z = {broken'
+        self.assertEqual(
+            list(Rightmove.find_json_objects(text)), [{"a": 1}, {"b": [2]}]
+        )
+
+    def test_extract_then_parse_property(self):
+        """The extracted PAGE_MODEL parses to the full property details."""
+        url = "https://www.rightmove.co.uk/properties/1"
+        response = httpx.Response(
+            200, text=self.page, request=httpx.Request("GET", url)
+        )
+        page_model = Rightmove.extract_property(response)
+        self.assertEqual(page_model, self.page_model)
+        details = Rightmove.parse_property(page_model, url)
+        self.assertEqual(details.id, self.page_model["propertyData"]["id"])
+        self.assertIsNotNone(details.postcode)
+        self.assertIsNotNone(details.primaryPrice)
+        # The propertyData alone still parses, without the analytics fields
+        partial = Rightmove.parse_property(page_model["propertyData"], url)
+        self.assertEqual(partial.primaryPrice, details.primaryPrice)
+
+
+if __name__ == "__main__":
+    unittest.main()
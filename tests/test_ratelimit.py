@@ -0,0 +1,125 @@
+"""Test the adaptive per-host rate limiter."""
+
+import unittest
+
+import httpx
+
+from estatesearch.search.ratelimit import (
+    HOSTS,
+    HostLimiter,
+    RateLimitedTransport,
+    RateLimiter,
+)
+from estatesearch.search.searchConfig import CrawlConfig
+from estatesearch.search.transport import Transport
+
+
+class TestHostLimiter(unittest.TestCase):
+    """Test case for the HostLimiter class."""
+
+    def setUp(self):
+        self.limiter = HostLimiter("example.com", rate=10.0, max_rate=20.0)
+
+    def feedback(self, status, elapsed=0.1, headers=None):
+        self.limiter.feedback(httpx.Response(status, headers=headers), elapsed)
+
+    def test_requests_are_spaced(self):
+        self.assertEqual(self.limiter.reserve(), 0)
+        self.assertAlmostEqual(self.limiter.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(self.limiter.reserve(), 0.2, places=2)
+
+    def test_additive_increase(self):
+        for _ in range(10):
+            self.feedback(200)
+        # Ten requests are a second of traffic at 10 per second
+        self.assertAlmostEqual(self.limiter.rate, 11.0, places=1)
+        for _ in range(1000):
+            self.feedback(200)
+        self.assertEqual(self.limiter.rate, 20.0)
+
+    def test_multiplicative_decrease(self):
+        self.feedback(429)
+        self.assertEqual(self.limiter.rate, 5.0)
+        # The requests in flight at the old rate do not cut it again
+        self.feedback(429)
+        self.feedback(403)
+        self.assertEqual(self.limiter.rate, 5.0)
+        self.limiter._last_backoff -= self.limiter.cooldown
+        self.feedback(403)
+        self.assertEqual(self.limiter.rate, 2.5)
+
+    def test_slow_responses_back_off(self):
+        self.feedback(200, elapsed=self.limiter.slow + 1)
+        self.assertEqual(self.limiter.rate, 5.0)
+        # Errors that are not throttling leave the rate alone
+        self.limiter._last_backoff -= self.limiter.cooldown
+        self.feedback(404)
+        self.assertEqual(self.limiter.rate, 5.0)
+
+    def test_retry_after_pauses_the_host(self):
+        self.feedback(429, headers={"Retry-After": "30"})
+        self.assertGreater(self.limiter.reserve(), 29)
+
+
+class TestRateLimitedTransport(unittest.IsolatedAsyncioTestCase):
+    """Test case for the RateLimitedTransport class."""
+
+    async def test_feedback_per_host(self):
+        def handler(request):
+            if request.url.host == "blocked.example.com":
+                return httpx.Response(429)
+            return httpx.Response(200)
+
+        limiter = RateLimiter(CrawlConfig(rate_limit=10.0))
+        async with httpx.AsyncClient(
+            transport=RateLimitedTransport(
+                httpx.MockTransport(handler), limiter
+            )
+        ) as client:
+            await client.get("https://blocked.example.com/")
+            await client.get("https://ok.example.com/")
+
+        self.assertEqual(limiter.hosts["blocked.example.com"].rate, 5.0)
+        self.assertGreater(limiter.hosts["ok.example.com"].rate, 10.0)
+
+    async def test_disabled(self):
+        transport = Transport(
+            CrawlConfig(http_cache_bytes=0, rate_limit=0),
+            transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+        )
+        self.assertIsNone(transport.rate_limiter)
+        self.assertIsNotNone(Transport(CrawlConfig()).rate_limiter)
+
+    async def test_shared_across_transports(self):
+        """Two transports send to a host through the same limiter."""
+        first = Transport(CrawlConfig(http_cache_bytes=0))
+        second = Transport(CrawlConfig(http_cache_bytes=0, rate_limit=2.0))
+        host = "shared.example.com"
+        self.addCleanup(HOSTS.pop, host, None)
+        self.assertIs(
+            first.rate_limiter.host(host), second.rate_limiter.host(host)
+        )
+        self.assertIs(HOSTS[host], first.rate_limiter.host(host))
+
+    async def test_later_configuration_is_applied(self):
+        """A shared host takes the bounds of each new configuration."""
+        host = "configured.example.com"
+        self.addCleanup(HOSTS.pop, host, None)
+        first = Transport(CrawlConfig(http_cache_bytes=0, rate_limit=10.0))
+        limiter = first.rate_limiter.host(host)
+        second = Transport(
+            CrawlConfig(
+                http_cache_bytes=0,
+                rate_limit=2.0,
+                rate_limit_max=4.0,
+                slow_response=1.0,
+            )
+        )
+        with self.assertLogs("estatesearch.search.ratelimit", "INFO"):
+            self.assertIs(second.rate_limiter.host(host), limiter)
+        self.assertEqual((limiter.max_rate, limiter.slow), (4.0, 1.0))
+        self.assertEqual(limiter.rate, 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
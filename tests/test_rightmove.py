@@ -0,0 +1,331 @@
+"""Offline tests for the Rightmove search engine."""
+
+import asyncio
+import json
+import pathlib
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import httpx
+
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.transport import Transport
+from estatesearch.search.uk.details import PropertyDetails
+from estatesearch.search.uk.queryplan import compile_query_plan
+from estatesearch.search.uk.rightmove import Rightmove
+
+EXAMPLE_PAGE = next(
+    (pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example").glob(
+        "*.html"
+    )
+).read_text()
+
+
+def api_handler(total_results: int, requested: list):
+    """Build a mock API that serves ``total_results`` fake properties."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        index = int(request.url.params["index"])
+        per_page = int(request.url.params["numberOfPropertiesPerPage"])
+        requested.append(index)
+        properties = [
+            {"id": i, "propertyUrl": f"/properties/{i}"}
+            for i in range(index, min(index + per_page, total_results))
+        ]
+        body = {"resultCount": f"{total_results:,}", "properties": properties}
+        return httpx.Response(200, text=json.dumps(body))
+
+    return handler
+
+
+class TestRightmoveOffline(unittest.IsolatedAsyncioTestCase):
+    """Test the Rightmove class against a mocked API."""
+
+    def setUp(self):
+        self.rightmove = Rightmove(
+            SearchParams(location="Kent"), CrawlConfig(backoff_base=0)
+        )
+        # Skip the typeahead: the plan is compiled with a known location
+        self.rightmove._plan = compile_query_plan(
+            self.rightmove.params, ("REGION", "1")
+        )
+
+    def mock_client(self, handler, **config):
+        """Send the requests of the search to ``handler``."""
+        self.transport = Transport(
+            CrawlConfig(http_cache_bytes=0, rate_limit=0, **config),
+            transport=httpx.MockTransport(handler),
+        )
+        self.rightmove.transport = self.transport
+        return self.transport
+
+    def test_plan_is_reused(self):
+        """URLs come from the compiled plan, without new typeahead calls."""
+        with patch.object(Rightmove, "get_location_id") as get_location_id:
+            self.assertIn(
+                "locationIdentifier=REGION^1", self.rightmove.search_url
+            )
+            self.assertIn("channel=BUY", self.rightmove.search_url_api)
+            get_location_id.assert_not_called()
+        self.assertEqual(
+            self.rightmove.plan.api_page_url(499),
+            self.rightmove.search_url_api
+            + "&index=499&numberOfPropertiesPerPage=499",
+        )
+
+    def test_invalid_params(self):
+        """Invalid search parameters are rejected before any request."""
+        for params in (
+            SearchParams(location="Kent", property_type=["castle"]),
+            SearchParams(location="Kent", max_days_since_added=2),
+            SearchParams(location="Kent", min_price=10, max_price=5),
+            SearchParams(location="Kent", max_bedrooms=9),
+        ):
+            with self.assertRaises(UserWarning):
+                Rightmove(params)
+
+    def test_page_indexes_respect_api_limit(self):
+        """Page offsets stop at the API limit."""
+        self.assertEqual(self.rightmove.page_indexes(100), [])
+        self.assertEqual(self.rightmove.page_indexes(1200), [499, 998])
+        self.assertEqual(self.rightmove.page_indexes(5000), [499, 998])
+
+    async def test_search_properties_api_async(self):
+        """All pages are fetched and returned in page order."""
+        requested = []
+        self.mock_client(api_handler(1200, requested))
+        properties = await self.rightmove.search_properties_api_async()
+        self.assertEqual(sorted(requested), [0, 499, 998])
+        self.assertEqual([p["id"] for p in properties], list(range(1200)))
+
+    async def test_sync_helpers_inside_an_event_loop(self):
+        """The sync helpers also work inside a running loop, as in Jupyter."""
+        requested = []
+        self.mock_client(api_handler(10, requested))
+        properties = self.rightmove.search_properties_api()
+        self.assertEqual(len(properties), 10)
+        self.assertEqual(requested, [0])
+
+    async def test_search_properties_api_async_single_page(self):
+        """A single page of results needs a single request."""
+        requested = []
+        self.mock_client(api_handler(10, requested))
+        properties = await self.rightmove.search_properties_api_async()
+        self.assertEqual(requested, [0])
+        self.assertEqual(len(properties), 10)
+        self.assertEqual(len(Rightmove.urls_from_search(properties)), 10)
+
+    async def test_search_properties_api_async_shards(self):
+        """Searches above the API limit are split and fully covered."""
+        prices = {i: i * 397 % 1_000_000 for i in range(3000)}
+
+        def handler(request):
+            params = request.url.params
+            index = int(params["index"])
+            per_page = int(params["numberOfPropertiesPerPage"])
+            low = int(params.get("minPrice", 0))
+            high = int(params.get("maxPrice", 10**9))
+            matches = [
+                {"id": i, "propertyUrl": f"/properties/{i}"}
+                for i, price in prices.items()
+                if low <= price <= high
+            ]
+            # Like the real API, pages past the limit are empty
+            page = matches[index : index + per_page] if index <= 1247 else []
+            body = {"resultCount": f"{len(matches):,}", "properties": page}
+            return httpx.Response(200, text=json.dumps(body))
+
+        self.mock_client(handler)
+        properties = await self.rightmove.search_properties_api_async()
+        self.assertEqual(
+            sorted(p["id"] for p in properties), sorted(prices.keys())
+        )
+
+    async def test_search_properties_api_async_concurrency(self):
+        """Shard probes and pages keep to max_concurrency."""
+        prices = {i: i * 397 % 1_000_000 for i in range(3000)}
+        in_flight = peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            params = request.url.params
+            index = int(params["index"])
+            low = int(params.get("minPrice", 0))
+            high = int(params.get("maxPrice", 10**9))
+            matches = [
+                {"id": i, "propertyUrl": f"/properties/{i}"}
+                for i, price in prices.items()
+                if low <= price <= high
+            ]
+            page = matches[index : index + 499] if index <= 1247 else []
+            body = {"resultCount": f"{len(matches):,}", "properties": page}
+            return httpx.Response(200, text=json.dumps(body))
+
+        self.rightmove.crawl_config = CrawlConfig(max_concurrency=2)
+        # The slots of the transport bound the requests of every scraper
+        self.mock_client(handler, max_concurrency=2)
+        properties = await self.rightmove.search_properties_api_async()
+        self.assertEqual(len(properties), 3000)
+        self.assertEqual(peak, 2)
+
+    def test_zero_price_bounds_are_encoded(self):
+        """A [0, 0] price band is not turned into an unbounded search."""
+        plan = compile_query_plan(
+            SearchParams(location="Kent", min_price=0, max_price=0),
+            ("REGION", "1"),
+        )
+        self.assertIn("&minPrice=0&maxPrice=0", plan.api_url)
+
+    async def test_resume_fetches_only_pending_urls(self):
+        """A resumed crawl reuses the checkpoint instead of searching again."""
+        broken = True
+        requested = []
+
+        def handler(request):
+            requested.append(request.url.path)
+            if request.url.path.startswith("/api"):
+                properties = [
+                    {"id": i, "propertyUrl": f"/properties/{i}"}
+                    for i in range(3)
+                ]
+                body = {"resultCount": "3", "properties": properties}
+                return httpx.Response(200, text=json.dumps(body))
+            if broken and request.url.path == "/properties/2":
+                return httpx.Response(503)
+            return httpx.Response(200, text=EXAMPLE_PAGE)
+
+        self.mock_client(handler)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config = CrawlConfig(
+                backoff_base=0, max_retries=0, cache_dir=cache_dir
+            )
+            first = Rightmove(
+                SearchParams(location="Kent"), config, self.transport
+            )
+            first._plan = self.rightmove._plan
+            self.assertEqual(len(await first.get_properties_details_async()), 2)
+
+            broken = False
+            requested.clear()
+            second = Rightmove(
+                SearchParams(location="Kent"), config, self.transport
+            )
+            properties = await second.get_properties_details_async(resume=True)
+            checkpoints = list(pathlib.Path(cache_dir).rglob("*.jsonl"))
+        self.assertEqual(len(properties), 3)
+        self.assertEqual(requested, ["/properties/2"])
+        # The checkpoint of a completed crawl is removed
+        self.assertEqual(checkpoints, [])
+
+    async def test_scrape_properties(self):
+        """Listing pages are parsed and failed pages are recorded."""
+
+        def handler(request):
+            if request.url.path == "/properties/404":
+                return httpx.Response(404)
+            return httpx.Response(200, text=EXAMPLE_PAGE)
+
+        self.mock_client(handler)
+        urls = [
+            "https://www.rightmove.co.uk/properties/159073889",
+            "https://www.rightmove.co.uk/properties/404",
+        ]
+        properties = await self.rightmove.scrape_properties(urls)
+        self.assertEqual(len(properties), 1)
+        self.assertIsInstance(properties[0], PropertyDetails)
+        self.assertEqual(properties[0].url, urls[0])
+        self.assertEqual(self.rightmove.failed_urls, [urls[1]])
+
+    async def test_incremental_crawl(self):
+        """A repeat crawl only fetches the new or changed listings."""
+        prices = {1: 100000, 2: 200000, 3: 300000}
+        fetched = []
+
+        def handler(request):
+            if request.url.path.startswith("/api"):
+                properties = [
+                    {
+                        "id": i,
+                        "propertyUrl": f"/properties/{i}",
+                        "price": {"amount": price},
+                        "listingUpdate": {"listingUpdateReason": "new"},
+                    }
+                    for i, price in prices.items()
+                ]
+                body = {"resultCount": "3", "properties": properties}
+                return httpx.Response(200, text=json.dumps(body))
+            fetched.append(request.url.path)
+            return httpx.Response(200, text=EXAMPLE_PAGE)
+
+        self.mock_client(handler)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config = CrawlConfig(
+                backoff_base=0, cache_dir=cache_dir, incremental=True
+            )
+            first = Rightmove(
+                SearchParams(location="Kent"), config, self.transport
+            )
+            first._plan = self.rightmove._plan
+            self.assertEqual(len(await first.get_properties_details_async()), 3)
+            self.assertEqual(len(fetched), 3)
+
+            fetched.clear()
+            prices[2] = 190000
+            second = Rightmove(
+                SearchParams(location="Kent"), config, self.transport
+            )
+            second._plan = self.rightmove._plan
+            properties = await second.get_properties_details_async()
+        self.assertEqual(len(properties), 3)
+        self.assertEqual(fetched, ["/properties/2"])
+        self.assertEqual(len(second.unchanged), 2)
+
+    async def test_scrape_properties_in_process_pool(self):
+        """Pages parsed in worker processes give the same results."""
+        self.mock_client(lambda request: httpx.Response(200, text=EXAMPLE_PAGE))
+        self.rightmove.crawl_config = CrawlConfig(
+            backoff_base=0, parse_workers=2, parse_batch_size=2
+        )
+        urls = [f"https://www.rightmove.co.uk/properties/{i}" for i in range(5)]
+        properties = await self.rightmove.scrape_properties(urls)
+        self.assertEqual(sorted(p.url for p in properties), sorted(urls))
+        self.assertTrue(all(p.id == "159073889" for p in properties))
+
+    async def test_pool_shuts_down_off_the_loop(self):
+        """Closing the parse early shuts the pool down in another thread."""
+        shutdowns = []
+
+        class RecordingPool(ThreadPoolExecutor):
+            def __init__(self, workers, mp_context=None):
+                super().__init__(workers)
+
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                shutdowns.append((threading.get_ident(), cancel_futures))
+                super().shutdown(wait, cancel_futures=cancel_futures)
+
+        self.mock_client(lambda request: httpx.Response(200, text=EXAMPLE_PAGE))
+        self.rightmove.crawl_config = CrawlConfig(
+            backoff_base=0, parse_workers=1, parse_batch_size=1
+        )
+        urls = [f"https://www.rightmove.co.uk/properties/{i}" for i in range(5)]
+        with patch(
+            "estatesearch.search.uk.rightmove.ProcessPoolExecutor",
+            RecordingPool,
+        ):
+            parsed = self.rightmove.parse_in_pool(self.rightmove.fetch(urls))
+            await parsed.__anext__()
+            await parsed.aclose()
+        (thread, cancel_futures), *_ = shutdowns
+        self.assertNotEqual(thread, threading.get_ident())
+        self.assertTrue(cancel_futures)
+
+
+if __name__ == "__main__":
+    unittest.main()
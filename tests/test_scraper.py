@@ -0,0 +1,98 @@
+"""Test the bounded-concurrency Scraper without touching the network."""
+
+import asyncio
+import unittest
+
+import httpx
+
+from estatesearch.search.scraper import Scraper
+from estatesearch.search.searchConfig import CrawlConfig
+
+# No waiting between retries in tests
+config = CrawlConfig(max_concurrency=3, max_retries=2, backoff_base=0)
+
+
+class TestScraper(unittest.IsolatedAsyncioTestCase):
+    """Test case for the Scraper class."""
+
+    async def test_concurrency_cap(self):
+        """No more than max_concurrency requests are in flight."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, text="ok")
+
+        urls = [f"https://example.com/{i}" for i in range(20)]
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            results = [r async for r in Scraper(client, config).scrape(urls)]
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLessEqual(peak, config.max_concurrency)
+
+    async def test_retries_then_succeeds(self):
+        """Throttled requests are retried until they succeed."""
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(429 if calls < 3 else 200)
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            result = await Scraper(client, config).fetch("https://example.com")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 3)
+
+    async def test_error_result_instead_of_exception(self):
+        """Failures become error results and do not stop other URLs."""
+
+        def handler(request):
+            if request.url.path == "/broken":
+                raise httpx.ConnectError("connection refused")
+            if request.url.path == "/missing":
+                return httpx.Response(404)
+            return httpx.Response(200)
+
+        urls = [
+            "https://example.com/broken",
+            "https://example.com/missing",
+            "https://example.com/fine",
+        ]
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            results = {
+                r.url: r async for r in Scraper(client, config).scrape(urls)
+            }
+        self.assertTrue(results["https://example.com/fine"].ok)
+        broken = results["https://example.com/broken"]
+        self.assertFalse(broken.ok)
+        self.assertEqual(broken.attempts, config.max_retries + 1)
+        self.assertIsNone(broken.status)
+        missing = results["https://example.com/missing"]
+        self.assertEqual(missing.error, "HTTP 404")
+        self.assertEqual(missing.status, 404)
+        # 404 is not retried
+        self.assertEqual(missing.attempts, 1)
+
+    def test_backoff_is_bounded(self):
+        """Backoff delays never exceed the exponential bound."""
+        scraper = Scraper(None, CrawlConfig(backoff_base=1, backoff_max=5))
+        for attempt in range(1, 10):
+            delay = scraper.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5, 2 ** (attempt - 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Test the shard planner for searches above the API limit."""
+
+import unittest
+
+from estatesearch.search.searchConfig import SearchParams
+from estatesearch.search.uk.sharding import (
+    plan_shards,
+    split_bedrooms,
+    split_params,
+    split_price,
+)
+
+
+def fake_first_page(prices):
+    """Count the listings whose price falls in the band of a search."""
+
+    async def first_page(params):
+        low = params.min_price or 0
+        high = float("inf") if params.max_price is None else params.max_price
+        matches = [price for price in prices if low <= price <= high]
+        return {"resultCount": f"{len(matches):,}", "properties": []}
+
+    return first_page
+
+
+class TestSplitters(unittest.TestCase):
+    """Test case for the split functions."""
+
+    def test_open_price_band_doubles(self):
+        low, high = split_price(SearchParams(location="Kent"))
+        self.assertEqual((low.min_price, low.max_price), (None, 500_000))
+        self.assertEqual((high.min_price, high.max_price), (500_001, None))
+        low, high = split_price(high)
+        self.assertEqual(low.max_price, 1_000_002)
+
+    def test_closed_price_band_halves(self):
+        params = SearchParams(location="Kent", min_price=100, max_price=200)
+        low, high = split_price(params)
+        self.assertEqual((low.min_price, low.max_price), (100, 150))
+        self.assertEqual((high.min_price, high.max_price), (151, 200))
+
+    def test_bedrooms_after_single_price(self):
+        params = SearchParams(location="Kent", min_price=100, max_price=100)
+        self.assertIsNone(split_price(params))
+        low, high = split_params(params)
+        self.assertEqual((low.min_bedrooms, low.max_bedrooms), (0, 2))
+        self.assertEqual((high.min_bedrooms, high.max_bedrooms), (3, None))
+        self.assertIsNone(
+            split_bedrooms(SearchParams(min_bedrooms=5, max_bedrooms=None))
+        )
+
+    def test_property_types_last(self):
+        params = SearchParams(
+            min_price=1, max_price=1, min_bedrooms=2, max_bedrooms=2
+        )
+        low, high = split_params(params)
+        self.assertEqual(len(low.property_type) + len(high.property_type), 7)
+        self.assertFalse(set(low.property_type) & set(high.property_type))
+
+
+class TestPlanShards(unittest.IsolatedAsyncioTestCase):
+    """Test case for the plan_shards function."""
+
+    async def test_shards_fit_and_cover_every_listing(self):
+        prices = [i * 97 % 2_000_000 for i in range(10_000)]
+        shards = await plan_shards(
+            SearchParams(location="Kent"), fake_first_page(prices), 1247
+        )
+        self.assertGreater(len(shards), 1)
+        self.assertTrue(all(shard.total <= 1247 for shard in shards))
+        self.assertEqual(sum(shard.total for shard in shards), len(prices))
+
+    async def test_small_search_is_not_split(self):
+        shards = await plan_shards(
+            SearchParams(location="Kent"), fake_first_page([1, 2, 3]), 1247
+        )
+        self.assertEqual(len(shards), 1)
+        self.assertEqual(shards[0].total, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Test the vectorised distances and the grid index."""
+
+import unittest
+
+import numpy as np
+
+from estatesearch.process.spatial import GridIndex, add_distances, haversine
+
+LONDON = (51.5074, -0.1278)
+PARIS = (48.8566, 2.3522)
+
+
+class TestHaversine(unittest.TestCase):
+    """Test case for the distance functions."""
+
+    def test_known_distance(self):
+        """London to Paris is about 344 km, or 214 miles."""
+        km = haversine([PARIS[0]], [PARIS[1]], *LONDON, unit="km")
+        miles = haversine([PARIS[0]], [PARIS[1]], *LONDON)
+        self.assertAlmostEqual(km[0], 343.5, delta=1)
+        self.assertAlmostEqual(miles[0], 213.5, delta=1)
+
+    def test_invalid_unit(self):
+        with self.assertRaises(UserWarning):
+            haversine([0], [0], 0, 0, unit="furlong")
+
+    def test_add_distances(self):
+        """Properties without coordinates get no distance."""
+        properties = [
+            {"latitude": PARIS[0], "longitude": PARIS[1]},
+            {"latitude": None, "longitude": None},
+        ]
+        add_distances(properties, *LONDON, unit="km")
+        self.assertAlmostEqual(
+            properties[0]["distanceToSearchPoint"], 343.5, delta=1
+        )
+        self.assertIsNone(properties[1]["distanceToSearchPoint"])
+        self.assertEqual(properties[1]["distanceUnit"], "km")
+
+
+class TestGridIndex(unittest.TestCase):
+    """Test case for the GridIndex class."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.latitudes = rng.uniform(51.2, 51.8, 5000)
+        self.longitudes = rng.uniform(-0.6, 0.4, 5000)
+        self.index = GridIndex(self.latitudes, self.longitudes)
+
+    def test_within_matches_brute_force(self):
+        ids, distances = self.index.within(*LONDON, 2)
+        expected = haversine(self.latitudes, self.longitudes, *LONDON)
+        self.assertEqual(set(ids), set(np.flatnonzero(expected <= 2)))
+        self.assertTrue(np.all(np.diff(distances) >= 0))
+
+    def test_bbox_matches_brute_force(self):
+        ids = self.index.bbox(51.4, -0.2, 51.5, 0.0)
+        expected = np.flatnonzero(
+            (self.latitudes >= 51.4)
+            & (self.latitudes <= 51.5)
+            & (self.longitudes >= -0.2)
+            & (self.longitudes <= 0.0)
+        )
+        self.assertEqual(set(ids), set(expected))
+
+    def test_from_records_skips_missing_coordinates(self):
+        records = [
+            {"id": "a", "latitude": "51.5", "longitude": "-0.12"},
+            {"id": "b", "latitude": None, "longitude": None},
+        ]
+        index = GridIndex.from_records(records)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(list(index.within(51.5, -0.12, 1)[0]), ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
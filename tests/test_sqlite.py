@@ -0,0 +1,90 @@
+"""Test the SQLite property store."""
+
+import json
+import pathlib
+import tempfile
+import unittest
+
+from estatesearch.download.download import DownloadManager
+from estatesearch.download.sqlite import PropertyStore
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+
+
+def search_results(primary_price: str, search_date: str) -> dict:
+    """Build search results holding the example property at a given price."""
+    property_data = json.loads((EXAMPLES_DIR / "pageMODEL.json").read_text())[
+        "propertyData"
+    ]
+    property_data["prices"]["primaryPrice"] = primary_price
+    return {
+        "Version": "1.0",
+        "SearchResults": {"Rightmove": {"properties": [property_data]}},
+        "SearchDate": search_date,
+    }
+
+
+class TestPropertyStore(unittest.TestCase):
+    """Test case for the PropertyStore class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmp_dir.name) / "properties.sqlite"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_upserts_and_appends_price_changes(self):
+        """Repeat runs update one row and only record actual changes."""
+        runs = [
+            ("£325,000", "2025-03-06T08:00:00"),
+            ("£325,000", "2025-03-07T08:00:00"),
+            ("£315,000", "2025-03-08T08:00:00"),
+        ]
+        with PropertyStore(self.path) as store:
+            for price, date in runs:
+                store.upsert_search_results(search_results(price, date))
+            rows = store.query("SELECT * FROM properties")
+            history = store.price_history("159073889")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["price"], 315000)
+        self.assertEqual(rows[0]["postcode"], "DA7 4NY")
+        self.assertEqual(rows[0]["first_seen"], "2025-03-06T08:00:00")
+        self.assertEqual(rows[0]["last_seen"], "2025-03-08T08:00:00")
+        self.assertEqual([row["price"] for row in history], [325000, 315000])
+        self.assertEqual(history[0]["status"], "published")
+
+    def test_wal_mode_and_indexes(self):
+        """The database runs in WAL mode with the query indexes."""
+        with PropertyStore(self.path) as store:
+            mode = store.query("PRAGMA journal_mode")[0][0]
+            indexes = {
+                row["name"]
+                for row in store.query(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+            plan = store.query(
+                "EXPLAIN QUERY PLAN SELECT id FROM properties "
+                "WHERE price BETWEEN 100000 AND 200000"
+            )
+        self.assertEqual(mode, "wal")
+        self.assertIn("properties_postcode", indexes)
+        self.assertIn("properties_location", indexes)
+        self.assertIn("properties_price", plan[0]["detail"])
+
+    def test_download_manager_to_sqlite(self):
+        """DownloadManager stores its results in the shared database."""
+        manager = DownloadManager(
+            search_results("£325,000", "2025-03-06T08:00:00"),
+            filepath=self.tmp_dir.name,
+        )
+        file_path = manager.to_sqlite()
+        self.assertEqual(file_path, self.path)
+        with PropertyStore(file_path) as store:
+            count = store.query("SELECT COUNT(*) FROM properties")[0][0]
+        self.assertEqual(count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
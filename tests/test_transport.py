@@ -0,0 +1,63 @@
+"""Test the lifecycle of the shared HTTP transport."""
+
+import asyncio
+import unittest
+
+import httpx
+
+from estatesearch.search.searchConfig import CrawlConfig
+from estatesearch.search.transport import Transport
+
+
+def handler(request):
+    return httpx.Response(200, text="ok")
+
+
+class TestTransport(unittest.TestCase):
+    """Test case for the Transport class."""
+
+    def setUp(self):
+        self.config = CrawlConfig(http_cache_bytes=0, max_connections=7)
+        self.transport = Transport(
+            self.config,
+            headers={"User-Agent": "test"},
+            transport=httpx.MockTransport(handler),
+        )
+
+    def test_client_is_created_lazily_and_shared(self):
+        self.assertIsNone(self.transport._client)
+
+        async def requests():
+            first = self.transport.client
+            await first.get("https://example.com/")
+            self.assertIs(self.transport.client, first)
+            self.assertEqual(first.headers["User-Agent"], "test")
+            await self.transport.aclose()
+            self.assertIsNone(self.transport._client)
+            return first
+
+        client = asyncio.run(requests())
+        self.assertTrue(client.is_closed)
+
+    def test_new_event_loop_gets_a_new_pool(self):
+        async def get_client():
+            return self.transport.client
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+        self.assertIsNot(first, second)
+
+    def test_limits_come_from_the_crawl_config(self):
+        self.assertEqual(self.transport.limits.max_connections, 7)
+        self.assertEqual(
+            self.transport.limits.keepalive_expiry,
+            self.config.keepalive_expiry,
+        )
+
+    def test_client_needs_a_running_loop(self):
+        with self.assertRaises(RuntimeError):
+            self.transport.client
+
+
+if __name__ == "__main__":
+    unittest.main()
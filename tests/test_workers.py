@@ -0,0 +1,177 @@
+"""Test the SQLite work queue and the multi-process crawl coordinator."""
+
+import collections
+import json
+import pathlib
+import tempfile
+import unittest
+
+import httpx
+
+from estatesearch.search.engine import SearchEngine
+from estatesearch.search.scraper import ScrapeResult
+from estatesearch.search.searchConfig import CrawlConfig, SearchParams
+from estatesearch.search.uk.mapping import parse_page_model
+from estatesearch.search.workers import (
+    LEASE_ATTEMPTS,
+    crawl_distributed,
+    run_worker,
+    split_rate_limit,
+)
+from estatesearch.search.workqueue import WorkQueue
+
+EXAMPLES_DIR = pathlib.Path(__file__).parent.parent / "docs" / "uk" / "example"
+PAGE_MODEL = json.loads((EXAMPLES_DIR / "pageMODEL.json").read_text())
+
+
+class FakeEngine(SearchEngine):
+    """Engine serving the example listing for 20 URLs, one of them broken."""
+
+    name = "Fake"
+    fetched = collections.Counter()
+
+    def __init__(self, params, crawl_config):
+        self.params = params
+        self.crawl_config = crawl_config
+
+    async def discover(self):
+        urls = [f"https://example.com/{i}" for i in range(19)]
+        if self.crawl_config.incremental:
+            # As if the others were unchanged since the last crawl
+            urls = urls[:5]
+        return urls + ["https://example.com/broken"]
+
+    async def fetch(self, urls):
+        for url in urls:
+            FakeEngine.fetched[url] += 1
+            if url.endswith("broken"):
+                yield ScrapeResult(
+                    url, error="HTTP 500", attempts=1, status=500
+                )
+            elif url.endswith("timeout"):
+                yield ScrapeResult(url, error="ConnectTimeout", attempts=1)
+            else:
+                yield ScrapeResult(url, httpx.Response(200), attempts=1)
+
+    def parse(self, result):
+        if result.url.endswith("garbled"):
+            raise ValueError("garbled page")
+        return parse_page_model(PAGE_MODEL, result.url, origin=self.name)
+
+
+class TestWorkQueue(unittest.TestCase):
+    """Test case for the WorkQueue class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue = WorkQueue(pathlib.Path(self.tmp_dir.name) / "queue.db")
+        self.queue.put(["a", "b", "c", "a"])
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp_dir.cleanup()
+
+    def test_lease_is_exclusive(self):
+        first = self.queue.lease(2, "w0", 60)
+        second = self.queue.lease(2, "w1", 60)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(self.queue.lease(2, "w2", 60), [])
+
+    def test_expired_lease_is_released(self):
+        """Items of a crashed worker are leased again after the timeout."""
+        self.queue.lease(3, "crashed", -1)
+        self.assertEqual(len(self.queue.lease(3, "w1", 60)), 3)
+
+    def test_ack_and_fail(self):
+        self.queue.lease(3, "w0", 60)
+        self.queue.ack("a", {"id": "1"})
+        self.queue.fail("b", "HTTP 500", max_attempts=2)
+        self.queue.fail("c", "HTTP 500", max_attempts=1)
+        self.assertEqual(
+            self.queue.counts(),
+            {"pending": 1, "leased": 0, "done": 1, "failed": 1},
+        )
+        self.assertEqual(list(self.queue.results()), [{"id": "1"}])
+        self.assertEqual(self.queue.failed_urls(), ["c"])
+
+
+class TestCrawlDistributed(unittest.TestCase):
+    """Test case for the crawl_distributed function."""
+
+    def test_workers_share_the_queue(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            properties = crawl_distributed(
+                SearchParams(location="Kent"),
+                FakeEngine,
+                workers=2,
+                crawl_config=CrawlConfig(
+                    cache_dir=tmp_dir, max_concurrency=3, max_retries=1
+                ),
+            )
+            with WorkQueue(pathlib.Path(tmp_dir) / "queue-Fake.db") as queue:
+                failed = queue.failed_urls()
+        self.assertEqual(len(properties), 19)
+        self.assertEqual(failed, ["https://example.com/broken"])
+
+    def test_only_transport_errors_are_leased_again(self):
+        """Error statuses and parse errors fail at once."""
+        urls = [
+            "https://example.com/broken",
+            "https://example.com/timeout",
+            "https://example.com/garbled",
+        ]
+        FakeEngine.fetched.clear()
+        config = CrawlConfig(max_retries=3)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            queue_path = pathlib.Path(tmp_dir) / "queue.db"
+            with WorkQueue(queue_path) as queue:
+                queue.put(urls)
+            with self.assertLogs("estatesearch.search.workers", "ERROR"):
+                run_worker(
+                    FakeEngine,
+                    SearchParams(location="Kent"),
+                    config,
+                    queue_path,
+                    "w0",
+                )
+            with WorkQueue(queue_path) as queue:
+                failed = queue.failed_urls()
+        self.assertEqual(sorted(failed), sorted(urls))
+        self.assertEqual(
+            [FakeEngine.fetched[url] for url in urls], [1, LEASE_ATTEMPTS, 1]
+        )
+
+    def test_incremental_is_turned_off(self):
+        """Unchanged listings are crawled again rather than dropped."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with self.assertLogs("estatesearch.search.workers", "WARNING"):
+                properties = crawl_distributed(
+                    SearchParams(location="Kent"),
+                    FakeEngine,
+                    workers=1,
+                    crawl_config=CrawlConfig(
+                        cache_dir=tmp_dir, max_retries=0, incremental=True
+                    ),
+                )
+        self.assertEqual(len(properties), 19)
+
+    def test_rate_limit_is_split_between_workers(self):
+        config = CrawlConfig(rate_limit=4.0, rate_limit_min=1.0)
+        worker_config = split_rate_limit(config, 4)
+        self.assertEqual(
+            (
+                worker_config.rate_limit,
+                worker_config.rate_limit_min,
+                worker_config.rate_limit_max,
+            ),
+            (1.0, 0.25, config.rate_limit_max / 4),
+        )
+        self.assertIs(split_rate_limit(config, 1), config)
+        disabled = CrawlConfig(rate_limit=0)
+        self.assertIs(split_rate_limit(disabled, 4), disabled)
+
+
+if __name__ == "__main__":
+    unittest.main()